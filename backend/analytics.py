@@ -0,0 +1,156 @@
+"""
+Daily analytics rollups.
+
+Signups per user_type, jobs posted and application funnel events per job
+are counted per day in small rollup tables, bumped from the write paths in
+the same transaction as the write itself. Trend endpoints read only these
+rows. backfill() rebuilds a date range from the raw tables (see
+backfill_analytics.py).
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Job, Application, DailySignups, DailyJobPostings, DailyApplicationEvents
+
+FUNNEL_STEPS = ['applied', 'reviewed', 'shortlisted', 'accepted', 'rejected']
+
+
+def _today():
+    return datetime.utcnow().date()
+
+
+def _increment(model, key, amount=1):
+    """count += amount for one rollup row, inserting it on first use"""
+    table = model.__table__
+    # The updates are limited to the current college by tenancy; inserts take it as a default
+    criteria = [table.c[name] == value for name, value in key.items()]
+    result = db.session.execute(
+        table.update().where(*criteria).values(count=table.c['count'] + amount)
+    )
+    if result.rowcount:
+        return
+
+    # First event of the day for this key; a concurrent insert wins the race
+    # and we fall back to the update
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(count=amount, **key))
+    except IntegrityError:
+        db.session.execute(table.update().where(*criteria).values(count=table.c['count'] + amount))
+
+
+def record_signups(user_type, count=1, day=None):
+    _increment(DailySignups, {'day': day or _today(), 'user_type': user_type}, count)
+
+
+def record_job_posted(day=None):
+    _increment(DailyJobPostings, {'day': day or _today()})
+
+
+def record_application_event(job_id, status, day=None):
+    if status not in FUNNEL_STEPS:
+        raise ValueError(f'Unknown funnel step: {status}')
+    _increment(DailyApplicationEvents, {'day': day or _today(), 'job_id': job_id, 'status': status})
+
+
+def parse_range(start, end, default_days=30):
+    """Parse ISO dates, defaulting to the last default_days days"""
+    end = date.fromisoformat(end) if end else _today()
+    start = date.fromisoformat(start) if start else end - timedelta(days=default_days - 1)
+    if start > end:
+        raise ValueError('start must be on or before end')
+    return start, end
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def signups_series(start, end, user_type=None):
+    query = DailySignups.query.filter(DailySignups.day.between(start, end))
+    if user_type:
+        query = query.filter(DailySignups.user_type == user_type)
+
+    series = defaultdict(dict)
+    for row in query.order_by(DailySignups.day).all():
+        series[row.day.isoformat()][row.user_type] = row.count
+    return [{'day': day, **counts} for day, counts in series.items()]
+
+
+def jobs_series(start, end, interval='day'):
+    rows = (DailyJobPostings.query.filter(DailyJobPostings.day.between(start, end))
+            .order_by(DailyJobPostings.day).all())
+
+    buckets = Counter()
+    for row in rows:
+        bucket = week_start(row.day) if interval == 'week' else row.day
+        buckets[bucket] += row.count
+    key = 'week' if interval == 'week' else 'day'
+    return [{key: bucket.isoformat(), 'count': count} for bucket, count in sorted(buckets.items())]
+
+
+def application_funnel(start, end, job_id=None):
+    """Funnel step totals over the range, per job or across all jobs"""
+    query = db.session.query(
+        DailyApplicationEvents.job_id, DailyApplicationEvents.status,
+        db.func.sum(DailyApplicationEvents.count)
+    ).filter(DailyApplicationEvents.day.between(start, end))
+    if job_id:
+        query = query.filter(DailyApplicationEvents.job_id == job_id)
+
+    funnels = defaultdict(lambda: {step: 0 for step in FUNNEL_STEPS})
+    for row_job_id, status, count in query.group_by(DailyApplicationEvents.job_id,
+                                                    DailyApplicationEvents.status).all():
+        funnels[row_job_id][status] = int(count)
+    return [{'job_id': j, 'funnel': funnel} for j, funnel in sorted(funnels.items())]
+
+
+def backfill(start, end):
+    """Rebuild rollup rows for [start, end] from the raw tables
+
+    Only current application statuses are stored, so a backfilled funnel
+    counts each application once under 'applied' (by applied_at) and once
+    under its current status (by updated_at).
+    """
+    low = datetime.combine(start, datetime.min.time())
+    high = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+    for model in (DailySignups, DailyJobPostings, DailyApplicationEvents):
+        model.query.filter(model.day.between(start, end)).delete(synchronize_session=False)
+
+    signup_day = db.func.date(User.created_at)
+    signups = (db.session.query(signup_day, User.user_type, db.func.count(User.id))
+               .filter(User.created_at >= low, User.created_at < high)
+               .group_by(signup_day, User.user_type).all())
+    db.session.add_all(DailySignups(day=_as_date(d), user_type=t, count=c) for d, t, c in signups)
+
+    job_day = db.func.date(Job.created_at)
+    jobs = (db.session.query(job_day, db.func.count(Job.id))
+            .filter(Job.created_at >= low, Job.created_at < high)
+            .group_by(job_day).all())
+    db.session.add_all(DailyJobPostings(day=_as_date(d), count=c) for d, c in jobs)
+
+    events = Counter()
+    applied_day = db.func.date(Application.applied_at)
+    for d, job_id, c in (db.session.query(applied_day, Application.job_id, db.func.count(Application.id))
+                         .filter(Application.applied_at >= low, Application.applied_at < high)
+                         .group_by(applied_day, Application.job_id)):
+        events[(_as_date(d), job_id, 'applied')] += c
+    updated_day = db.func.date(Application.updated_at)
+    for d, job_id, status, c in (db.session.query(updated_day, Application.job_id, Application.status,
+                                                  db.func.count(Application.id))
+                                 .filter(Application.updated_at >= low, Application.updated_at < high,
+                                         Application.status != 'pending')
+                                 .group_by(updated_day, Application.job_id, Application.status)):
+        events[(_as_date(d), job_id, status)] += c
+    db.session.add_all(DailyApplicationEvents(day=d, job_id=j, status=s, count=c)
+                       for (d, j, s), c in events.items())
+
+    db.session.commit()
+    return {'signups': len(signups), 'jobs': len(jobs), 'application_events': len(events)}
+
+
+def _as_date(value):
+    # DATE() comes back as a string on SQLite and a date elsewhere
+    return date.fromisoformat(value) if isinstance(value, str) else value
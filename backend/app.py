@@ -4,37 +4,75 @@ import os
 # IMPORTANT: Load .env file BEFORE importing Config
 load_dotenv()
 
-from flask import Flask, jsonify
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+from flask import Flask, Response, jsonify, request
 from config import Config
-from models import db
-from routes.auth import auth_bp
-from routes.users import users_bp
-from routes.jobs import jobs_bp
-from routes.chat import chat_bp
-from routes.admin import admin_bp
 
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
+
+def register_extensions(app):
+    from flask_cors import CORS
+    from flask_jwt_extended import JWTManager
+    from models import db
+    from authz import register_jwt_callbacks
+    from pool_metrics import engine_options, register_pool_listeners
+    from replicas import replica_binds, remember_write, PIN_HEADER
+    from idempotency import REPLAYED_HEADER
+    from tenancy import tenant_binds, resolve_tenant
+    from compression import compress_response
+    from serializers import FastJSONProvider
+    from metrics import init_metrics
+    from serving import patch_drivers
     
-    # Initialize extensions
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    patch_drivers(app)
+    app.json = FastJSONProvider(app)
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=[PIN_HEADER, REPLAYED_HEADER])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+                                                              app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_BINDS'] = {
+        **replica_binds(app.config['DATABASE_REPLICA_URLS'], app.config['SQLALCHEMY_ENGINE_OPTIONS']),
+        **tenant_binds(app.config, app.config['SQLALCHEMY_ENGINE_OPTIONS']),
+    }
     db.init_app(app)
-    JWTManager(app)
+    if app.config['METRICS_ENABLED']:
+        # Registered first so its after_request runs last and sees the final response
+        init_metrics(app)
+    app.before_request(resolve_tenant)
+    app.after_request(remember_write)
+    app.after_request(compress_response)
+    jwt = JWTManager(app)
+    register_jwt_callbacks(jwt)
+    
+    # Engines are created lazily by SQLAlchemy; this opens no connection
+    with app.app_context():
+        register_pool_listeners(db.engine)
+
+
+def register_blueprints(app):
+    from routes.auth import auth_bp
+    from routes.users import users_bp
+    from routes.jobs import jobs_bp
+    from routes.chat import chat_bp
+    from routes.admin import admin_bp
+    from routes.analytics import analytics_bp
+    from routes.notifications import notifications_bp
+    from routes.batch import batch_bp
     
-    # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     app.register_blueprint(chat_bp, url_prefix='/api/chat')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(analytics_bp, url_prefix='/api/admin/analytics')
+    app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+
+
+def create_app():
+    """Build the app without touching the database; run init_db.py to create the schema"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-        print(f"✅ Using database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    register_extensions(app)
+    register_blueprints(app)
     
     @app.route('/')
     def index():
@@ -48,10 +86,23 @@ def create_app():
     def health():
         return jsonify({'status': 'healthy'})
     
+    @app.route('/metrics')
+    def metrics():
+        from models import db
+        from metrics import render_metrics
+        from authz import request_is_admin
+        token = app.config['METRICS_TOKEN']
+        if token:
+            allowed = request.headers.get('Authorization') == f'Bearer {token}' or request_is_admin()
+        else:
+            # No scrape token: admins only, except on a local debug server
+            allowed = app.debug or request_is_admin()
+        if not allowed:
+            return jsonify({'error': 'Unauthorized'}), 401
+        return Response(render_metrics(db.engine), mimetype='text/plain; version=0.0.4')
+    
     return app
 
-# Create app instance for gunicorn
-app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    create_app().run(debug=True, host='0.0.0.0', port=5001)
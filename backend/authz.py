@@ -0,0 +1,144 @@
+"""
+Claims-based authorization.
+
+Access tokens carry the user's user_type, admin flag, token version and
+college (tenant) as JWT claims, so role checks need no database query.
+Tokens are revoked by bumping the user's row in token_versions; each worker
+keeps the whole (small) table cached for TOKEN_VERSION_CACHE_TTL seconds,
+so revocation takes effect within that window across workers and
+immediately in the one that made the change. token_versions rows belong to
+the user's college and each college's rows are cached separately, so a
+token is only ever checked against versions of the college in its tid claim.
+"""
+
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
+from models import db, User, TokenVersion
+from tenancy import CLAIM as TENANT_CLAIM, current_tenant_id, tenant_context
+
+_lock = threading.Lock()
+_caches = {}  # tenant id -> (loaded_at, user_id -> version)
+
+
+def is_admin_email(email):
+    return email in current_app.config['ADMIN_EMAILS']
+
+
+def _token_versions():
+    """Return the current college's cached user_id -> version map, reloading it when stale"""
+    key = current_tenant_id()
+    ttl = current_app.config['TOKEN_VERSION_CACHE_TTL']
+    now = time.monotonic()
+    loaded_at, versions = _caches.get(key, (None, None))
+    if loaded_at is None or now - loaded_at > ttl:
+        with _lock:
+            loaded_at, versions = _caches.get(key, (None, None))
+            if loaded_at is None or now - loaded_at > ttl:
+                versions = dict(db.session.query(TokenVersion.user_id, TokenVersion.version).all())
+                _caches[key] = (now, versions)
+    return versions
+
+
+def current_token_version(user_id):
+    return _token_versions().get(int(user_id), 0)
+
+
+def bump_token_version(user_id):
+    """Revoke every token issued to a user; commits with the caller's transaction"""
+    row = db.session.get(TokenVersion, user_id)
+    if row is None:
+        row = TokenVersion(user_id=user_id, version=0)
+        db.session.add(row)
+    row.version += 1
+
+    # Force this worker to reload on its next check
+    _caches.pop(current_tenant_id(), None)
+    return row.version
+
+
+def bump_token_versions(user_ids):
+    """Revoke tokens for many users with one UPDATE and one INSERT"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    existing = {r[0] for r in db.session.query(TokenVersion.user_id)
+                .filter(TokenVersion.user_id.in_(user_ids)).all()}
+    if existing:
+        db.session.execute(
+            db.update(TokenVersion)
+            .where(TokenVersion.user_id.in_(existing))
+            .values(version=TokenVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    missing = user_ids - existing
+    if missing:
+        db.session.execute(db.insert(TokenVersion), [{'user_id': i, 'version': 1} for i in missing])
+
+    _caches.pop(current_tenant_id(), None)
+
+
+def user_claims(user):
+    """Claims embedded in a user's access tokens at login/refresh"""
+    return {
+        'user_type': user.user_type,
+        'is_admin': is_admin_email(user.email),
+        'tv': current_token_version(user.id),
+        TENANT_CLAIM: user.tenant_id,
+    }
+
+
+def register_jwt_callbacks(jwt):
+    """Reject tokens issued before the user's current token version"""
+
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        # Runs before the token is stored on the request, so name its college explicitly
+        with tenant_context(jwt_payload.get(TENANT_CLAIM)):
+            return jwt_payload.get('tv', 0) < current_token_version(jwt_payload['sub'])
+
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return jsonify({'error': 'Token has been revoked, please log in again'}), 401
+
+
+def _claims_for_request():
+    claims = get_jwt()
+    if 'user_type' in claims:
+        return claims
+
+    # Tokens issued before claims were added fall back to a lookup
+    user = db.session.get(User, int(get_jwt_identity()))
+    return user_claims(user) if user else None
+
+
+def request_is_admin():
+    """True when the request carries a valid, unrevoked admin access token"""
+    try:
+        verify_jwt_in_request()
+    except Exception:
+        return False
+    claims = _claims_for_request()
+    return bool(claims and claims.get('is_admin'))
+
+
+def role_required(user_type=None, admin=False, message='Access denied'):
+    """Decorator checking the token's role claims without a user query"""
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            claims = _claims_for_request()
+
+            if not claims:
+                return jsonify({'error': message}), 403
+            if user_type and claims.get('user_type') != user_type:
+                return jsonify({'error': message}), 403
+            if admin and not claims.get('is_admin'):
+                return jsonify({'error': message}), 403
+
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
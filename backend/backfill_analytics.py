@@ -0,0 +1,41 @@
+"""
+Analytics backfill script.
+Rebuilds the daily rollup tables for a date range from the raw users, jobs
+and applications tables, for every college or one. Existing rollup rows in
+the range are replaced.
+
+Usage: python backfill_analytics.py [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--tenant ID]
+"""
+
+import argparse
+from app import create_app
+from models import db
+from analytics import backfill, parse_range
+from tenancy import all_tenant_ids, tenant_context
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill analytics rollups')
+    parser.add_argument('--start', help='First day (default: 365 days before --end)')
+    parser.add_argument('--end', help='Last day (default: today)')
+    parser.add_argument('--tenant', type=int, help='Only this college (default: all)')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            start, end = parse_range(args.start, args.end, default_days=365)
+            for tenant_id in [args.tenant] if args.tenant else all_tenant_ids():
+                print(f"Backfilling analytics for college {tenant_id} from {start} to {end}...")
+                with tenant_context(tenant_id):
+                    counts = backfill(start, end)
+                print(f"✅ Rebuilt {counts['signups']} signup rows, {counts['jobs']} job rows "
+                      f"and {counts['application_events']} application event rows")
+        except Exception as e:
+            print(f"❌ Error backfilling analytics: {str(e)}")
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Response compression benchmark.
+Seeds users, jobs and messages with realistic long text fields, then for
+each list endpoint reports bytes on the wire and compression CPU time for
+identity, several gzip levels and (if installed) brotli qualities, plus the
+transfer time that saves on a slow mobile link.
+
+Usage: python benchmarks/bench_compression.py [rows] [repeats] [link_kbps]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway SQLite database so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_file.name
+os.environ['RATELIMIT_ENABLED'] = 'false'
+
+from app import create_app
+from init_db import create_schema
+from models import db, User, Job, Message
+import compression
+
+PASSWORD = 'bench-password'
+BIO = ('Software engineer working on distributed systems and developer tooling. '
+       'Happy to talk about internships, interview preparation and open source. ') * 3
+DESCRIPTION = ('We are looking for a motivated engineer to join our platform team. '
+               'You will design APIs, improve reliability and mentor interns. ') * 6
+
+
+def seed(app, rows):
+    with app.app_context():
+        app.config['PASSWORD_HASH_WORKERS'] = 0
+        template = User(full_name='x', email='x', college_id='x', college_email='x',
+                        department='x', user_type='student')
+        template.set_password(PASSWORD)
+        admin = User(full_name='Admin', email='admin@college.edu', password_hash=template.password_hash,
+                     college_id='ADMIN', college_email='admin@college.edu', department='Administration',
+                     user_type='alumni', is_verified=True)
+        db.session.add(admin)
+        for i in range(rows):
+            user_type = 'alumni' if i % 2 else 'student'
+            db.session.add(User(
+                full_name=f'Bench User {i}', email=f'bench{i}@example.com',
+                password_hash=template.password_hash, college_id=f'BENCH{i}',
+                college_email=f'bench{i}@college.edu', department='Computer Science',
+                user_type=user_type, is_verified=True, bio=BIO,
+                current_company='Example Corp' if user_type == 'alumni' else None,
+                current_position='Senior Engineer' if user_type == 'alumni' else None,
+                skills='["python", "sql", "flask"]',
+            ))
+        db.session.flush()
+        alumni = User.query.filter_by(user_type='alumni').first()
+        student = User.query.filter_by(user_type='student').first()
+        for i in range(rows):
+            db.session.add(Job(alumni_id=alumni.id, title=f'Backend Engineer {i}', company='Example Corp',
+                               location='Remote', job_type='full-time', description=DESCRIPTION,
+                               requirements='Python, SQL, HTTP APIs', salary_range='10-15 LPA'))
+            sender, receiver = (student, alumni) if i % 2 else (alumni, student)
+            db.session.add(Message(sender_id=sender.id, receiver_id=receiver.id,
+                                   content=f'Message {i}: thanks for the referral, sharing my resume shortly.'))
+        db.session.commit()
+        return student.email, alumni.id
+
+
+def token(client, email):
+    response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def settings():
+    yield 'identity', None, None
+    for level in (1, 6, 9):
+        yield f'gzip-{level}', 'gzip', level
+    if compression.brotli is not None:
+        for quality in (1, 4, 11):
+            yield f'br-{quality}', 'br', quality
+
+
+def measure(app, client, path, headers, repeats, link_kbps):
+    body = client.get(path, headers={**headers, 'Accept-Encoding': 'identity'}).get_data()
+    for name, encoding, level in settings():
+        if encoding == 'gzip':
+            app.config['COMPRESSION_GZIP_LEVEL'] = level
+        elif encoding == 'br':
+            app.config['COMPRESSION_BROTLI_QUALITY'] = level
+
+        # Compression cost on its own, then the whole request as the client sees it
+        cpu = []
+        with app.app_context():
+            for _ in range(repeats):
+                start = time.process_time()
+                wire = compression.compress_bytes(body, encoding) if encoding else body
+                cpu.append(time.process_time() - start)
+
+        wall = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = client.get(path, headers={**headers, 'Accept-Encoding': encoding or 'identity'})
+            wall.append(time.perf_counter() - start)
+        assert len(response.get_data()) == len(wire)
+
+        transfer = len(wire) * 8 / (link_kbps * 1000)
+        print(f"  {name:<9} bytes={len(wire):>9,}  ratio={len(body) / len(wire):5.1f}x  "
+              f"compress cpu={statistics.median(cpu) * 1000:6.2f}ms  request={statistics.median(wall) * 1000:7.2f}ms  "
+              f"transfer@{link_kbps}kbps={transfer * 1000:8.1f}ms")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    link_kbps = int(sys.argv[3]) if len(sys.argv) > 3 else 1500
+
+    app = create_app()
+    create_schema(app)
+    student_email, alumni_id = seed(app, rows)
+    client = app.test_client()
+    student = token(client, student_email)
+    admin = token(client, 'admin@college.edu')
+
+    endpoints = [
+        ('/api/jobs/', student),
+        ('/api/users/alumni', student),
+        ('/api/users/students', student),
+        ('/api/admin/users', admin),
+        (f'/api/chat/messages/{alumni_id}', student),
+    ]
+    print(f"rows={rows} repeats={repeats} brotli={'yes' if compression.brotli else 'not installed'}")
+    try:
+        for path, headers in endpoints:
+            print(path)
+            measure(app, client, path, headers, repeats, link_kbps)
+    finally:
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Concurrent connection benchmark: sync vs gevent gunicorn workers.
+
+Starts gunicorn (through gunicorn.conf.py) on a throwaway SQLite database
+in each mode and opens `connections` simultaneous long-polls on
+/api/chat/poll that wait `hold` seconds for messages that never come. Both
+modes are allowed to park for the same time, so the comparison shows how
+many waiting requests each mode serves at once, how long a quick request
+(/api/health) takes while they wait, and the workers' extra resident
+memory per open connection (Linux only).
+
+Usage: python benchmarks/bench_concurrency.py [connections] [hold_seconds] [workers] [modes...]
+"""
+
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+EMAIL = 'bench.poll@college.edu'
+PASSWORD = 'bench-password'
+
+SETUP = f"""
+from app import create_app
+from init_db import create_schema
+from models import db, User
+app = create_app()
+create_schema(app)
+with app.app_context():
+    user = User(full_name='Bench Poll', email='{EMAIL}', college_id='BENCH-POLL',
+                college_email='{EMAIL}', department='CS', user_type='student', is_verified=True)
+    user.set_password('{PASSWORD}')
+    db.session.add(user)
+    db.session.commit()
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def worker_rss_kb(master_pid):
+    """Summed VmRSS of the master's child processes, or None without /proc"""
+    total = 0
+    try:
+        pids = [p for p in os.listdir('/proc') if p.isdigit()]
+    except FileNotFoundError:
+        return None
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            if ppid != master_pid:
+                continue
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def request(url, headers=None, body=None, timeout=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json', **(headers or {})})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def wait_ready(base, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            request(base + '/api/health', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not become ready')
+
+
+def run_mode(mode, env, connections, hold, workers):
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:create_app()'], cwd=BACKEND_DIR,
+        env={**env, 'GUNICORN_WORKER_CLASS': mode, 'WEB_CONCURRENCY': str(workers), 'PORT': str(port),
+             'GUNICORN_WORKER_CONNECTIONS': str(connections + 100), 'GUNICORN_TIMEOUT': str(int(hold * 4) + 30),
+             'CHAT_LONG_POLL_SECONDS': str(hold), 'CHAT_LONG_POLL_SYNC_SECONDS': str(hold)},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base)
+        _, body = request(base + '/api/auth/login', body={'email': EMAIL, 'password': PASSWORD})
+        headers = {'Authorization': f"Bearer {json.loads(body)['access_token']}"}
+        # Warm every worker's imports, pool and caches
+        for _ in range(workers * 4):
+            request(f'{base}/api/chat/poll?timeout=0', headers)
+        idle_rss = worker_rss_kb(server.pid)
+
+        # A client gives up after two hold periods; with sync workers most
+        # polls are still queued behind the ones being served by then
+        client_timeout = hold * 2 + 1
+        latencies, failures = [], []
+        lock = threading.Lock()
+
+        def poll():
+            start = time.perf_counter()
+            try:
+                request(f'{base}/api/chat/poll?timeout={hold}', headers, timeout=client_timeout)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            except (OSError, urllib.error.URLError):
+                with lock:
+                    failures.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=poll) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(hold / 2)
+        loaded_rss = worker_rss_kb(server.pid)
+        probes = []
+        for _ in range(5):
+            start = time.perf_counter()
+            try:
+                request(base + '/api/health', timeout=client_timeout)
+                probes.append(time.perf_counter() - start)
+            except OSError:
+                probes.append(None)
+                break
+
+        for thread in threads:
+            thread.join()
+
+        on_time = sum(1 for t in latencies if t < hold + 1)
+        served = [p for p in probes if p is not None]
+        per_connection = None
+        if idle_rss is not None and loaded_rss is not None:
+            per_connection = (loaded_rss - idle_rss) / connections
+        return {
+            'served_concurrently': on_time,
+            'completed_late': len(latencies) - on_time,
+            'timed_out': len(failures),
+            'poll_max_s': max(latencies) if latencies else None,
+            'health_ms': statistics.median(served) * 1000 if served else None,
+            'idle_rss_mb': idle_rss / 1024 if idle_rss is not None else None,
+            'kb_per_connection': per_connection,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    hold = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    modes = sys.argv[4:] or ['sync', 'gevent']
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        sys.exit('gunicorn is not installed')
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    env = {**os.environ, 'DATABASE_URL': 'sqlite:///' + db_file.name, 'RATELIMIT_ENABLED': 'false',
+           'METRICS_ENABLED': 'false', 'PASSWORD_HASH_WORKERS': '0',
+           'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'CHAT_POLL_INTERVAL': '1'}
+    try:
+        subprocess.run([sys.executable, '-c', SETUP], cwd=BACKEND_DIR, env=env, check=True,
+                       capture_output=True)
+
+        print(f'{connections} long-polls held {hold:g}s against {workers} workers')
+        print(f"{'mode':<8}{'concurrent':>11}{'late':>6}{'timeout':>9}{'poll max':>10}"
+              f"{'health':>10}{'idle RSS':>10}{'KB/conn':>9}")
+        for mode in modes:
+            if mode == 'gevent':
+                try:
+                    import gevent  # noqa: F401
+                except ImportError:
+                    print('gevent   not installed, skipped')
+                    continue
+            r = run_mode(mode, env, connections, hold, workers)
+            fmt = lambda value, spec, unit='': '-' if value is None else format(value, spec) + unit
+            print(f"{mode:<8}{r['served_concurrently']:>11}{r['completed_late']:>6}{r['timed_out']:>9}"
+                  f"{fmt(r['poll_max_s'], '.1f', 's'):>10}{fmt(r['health_ms'], '.1f', 'ms'):>10}"
+                  f"{fmt(r['idle_rss_mb'], '.1f', 'MB'):>10}{fmt(r['kb_per_connection'], '.1f'):>9}")
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
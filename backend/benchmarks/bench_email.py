@@ -0,0 +1,72 @@
+"""
+Email sending benchmark.
+Sends emails through mailer.send_batch() to a local mail_sink.py server at
+several batch sizes. Batch size 1 is one SMTP connection per email, as an
+inline send would be; larger batches reuse one connection. --connect-ms
+adds a delay before the server greeting to stand in for the TCP, TLS and
+login round trips of a real provider.
+
+Usage: python benchmarks/bench_email.py [emails] [connect_ms] [batch sizes...]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway SQLite database so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_file.name
+os.environ['MAIL_SERVER'] = '127.0.0.1'
+os.environ['MAIL_USE_TLS'] = 'false'
+os.environ['MAIL_DEFAULT_SENDER'] = 'bench@college.edu'
+
+import mail_sink
+from mail_sink import SMTPSink, SMTPHandler
+
+
+def main():
+    emails = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    connect_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    batch_sizes = [int(b) for b in sys.argv[3:]] or [1, 10, 50]
+
+    class SlowHandshake(SMTPHandler):
+        def handle(self):
+            time.sleep(connect_ms / 1000)
+            super().handle()
+
+    sink = SMTPSink(('127.0.0.1', 0), quiet=True)
+    sink.RequestHandlerClass = SlowHandshake
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    os.environ['MAIL_PORT'] = str(sink.server_address[1])
+
+    from app import create_app
+    from mailer import send_batch
+    app = create_app()
+
+    payloads = [{'to': f'user{i}@college.edu', 'subject': f'Bench {i}', 'body': 'Hello\n' * 20}
+                for i in range(emails)]
+    print(f'{emails} emails, {connect_ms:g} ms per connection setup')
+    try:
+        with app.app_context():
+            for size in batch_sizes:
+                before = dict(mail_sink.counts)
+                start = time.perf_counter()
+                for i in range(0, emails, size):
+                    errors = send_batch(payloads[i:i + size])
+                    assert not any(errors), errors
+                elapsed = time.perf_counter() - start
+                connections = mail_sink.counts['connections'] - before['connections']
+                print(f'batch {size:>4}: {emails / elapsed:8.1f} emails/s  '
+                      f'{elapsed * 1000 / emails:6.2f} ms/email  {connections} connections')
+    finally:
+        sink.shutdown()
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
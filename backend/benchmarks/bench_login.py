@@ -0,0 +1,102 @@
+"""
+Login throughput benchmark.
+Measures logins/sec through the Flask test client for several password hash
+pool sizes, with a fixed number of concurrent client threads standing in for
+gthread/gevent request handlers.
+
+Usage: python benchmarks/bench_login.py [threads] [logins_per_thread] [pool sizes...]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway SQLite database so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_file.name
+
+from app import create_app
+from init_db import create_schema
+from models import db, User
+from passwords import shutdown_pool
+
+PASSWORD = 'bench-password'
+
+
+def seed_users(app, count):
+    with app.app_context():
+        app.config['PASSWORD_HASH_WORKERS'] = 0
+        template = User(full_name='x', email='x', college_id='x', college_email='x',
+                        department='x', user_type='student')
+        template.set_password(PASSWORD)
+        for i in range(count):
+            db.session.add(User(
+                full_name=f'Bench User {i}',
+                email=f'bench{i}@example.com',
+                password_hash=template.password_hash,
+                college_id=f'BENCH{i}',
+                college_email=f'bench{i}@college.edu',
+                department='Computer Science',
+                user_type='student',
+                is_verified=True,
+                is_active=True,
+            ))
+        db.session.commit()
+
+
+def run(app, threads, per_thread, pool_size):
+    app.config['PASSWORD_HASH_WORKERS'] = pool_size
+    shutdown_pool()
+    errors = []
+
+    def client_loop(index):
+        client = app.test_client()
+        for _ in range(per_thread):
+            response = client.post('/api/auth/login', json={
+                'email': f'bench{index}@example.com',
+                'password': PASSWORD,
+            })
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    # Warm the pool so process start-up isn't counted
+    app.test_client().post('/api/auth/login', json={'email': 'bench0@example.com', 'password': PASSWORD})
+
+    workers = [threading.Thread(target=client_loop, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * per_thread
+    print(f"pool={pool_size:<3} threads={threads:<3} logins={total:<5} "
+          f"time={elapsed:7.2f}s  logins/sec={total / elapsed:7.1f}  errors={len(errors)}")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    pool_sizes = [int(n) for n in sys.argv[3:]] or [0, 1, 2, 4, os.cpu_count() or 1]
+
+    app = create_app()
+    create_schema(app)
+    seed_users(app, threads)
+
+    print(f"CPUs: {os.cpu_count()}, hash method: {app.config['PASSWORD_HASH_METHOD']}")
+    try:
+        for pool_size in pool_sizes:
+            run(app, threads, per_thread, pool_size)
+    finally:
+        shutdown_pool()
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
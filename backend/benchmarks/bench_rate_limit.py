@@ -0,0 +1,107 @@
+"""
+Rate limiter load test.
+Floods /api/auth/login with bad passwords from one client, with and without
+rate limiting, while a well-behaved client logs in from another IP. Shows
+how many requests/sec the API absorbs and what the legitimate client's
+latency looks like in each case.
+
+Usage: python benchmarks/bench_rate_limit.py [seconds] [attacker_threads] [backend]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway databases so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_limit_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_file.name
+os.environ['RATELIMIT_STORAGE_PATH'] = _limit_file.name
+
+from app import create_app
+from init_db import create_schema
+from models import db, User
+import ratelimit
+
+PASSWORD = 'bench-password'
+
+
+def seed_user(app):
+    with app.app_context():
+        user = User(full_name='Bench User', email='bench@example.com', college_id='BENCH',
+                    college_email='bench@college.edu', department='Computer Science',
+                    user_type='student', is_verified=True, is_active=True)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+
+def run(app, seconds, attackers, enabled):
+    app.config['RATELIMIT_ENABLED'] = enabled
+    with app.app_context():
+        ratelimit.get_backend().reset()
+
+    stop = time.perf_counter() + seconds
+    counts = {'attack': 0, 'rejected': 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def attacker():
+        client = app.test_client()
+        while time.perf_counter() < stop:
+            response = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'wrong'},
+                                   environ_base={'REMOTE_ADDR': '10.0.0.1'})
+            with lock:
+                counts['attack'] += 1
+                counts['rejected'] += response.status_code == 429
+
+    def legitimate():
+        client = app.test_client()
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            client.get('/api/health', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=attacker) for _ in range(attackers)]
+    threads.append(threading.Thread(target=legitimate))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"limiter={'on ' if enabled else 'off'} attack req/sec={counts['attack'] / seconds:8.1f} "
+          f"rejected={counts['rejected']:<6} legit p50={statistics.median(latencies) * 1000:7.1f}ms "
+          f"p95={p95 * 1000:7.1f}ms")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    attackers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    backend = sys.argv[3] if len(sys.argv) > 3 else 'sqlite'
+
+    app = create_app()
+    create_schema(app)
+    app.config['RATELIMIT_BACKEND'] = backend
+    app.config['PASSWORD_HASH_WORKERS'] = 0
+    seed_user(app)
+
+    print(f"backend={backend} attackers={attackers} duration={seconds}s")
+    try:
+        run(app, seconds, attackers, enabled=False)
+        run(app, seconds, attackers, enabled=True)
+    finally:
+        os.unlink(_db_file.name)
+        os.unlink(_limit_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Serializer benchmark.
+For each list endpoint's query, compares hydrating ORM objects and calling
+to_dict() against the column-projected serializers: wall time and number
+of SQL statements. Also compares the stdlib JSON encoder against orjson on
+the same payload, and times each endpoint end to end.
+
+Usage: python benchmarks/bench_serializers.py [rows] [repeats]
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway SQLite database so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_file.name
+os.environ['RATELIMIT_ENABLED'] = 'false'
+
+from sqlalchemy import event
+from app import create_app
+from init_db import create_schema
+from models import db, User, Job, Application, Message
+from serializers import serialize, orjson, USER, JOB, APPLICATION, MESSAGE
+
+PASSWORD = 'bench-password'
+
+
+def seed(app, rows):
+    with app.app_context():
+        app.config['PASSWORD_HASH_WORKERS'] = 0
+        template = User(full_name='x', email='x', college_id='x', college_email='x',
+                        department='x', user_type='student')
+        template.set_password(PASSWORD)
+        db.session.add(User(full_name='Admin', email='admin@college.edu', password_hash=template.password_hash,
+                            college_id='ADMIN', college_email='admin@college.edu', department='Administration',
+                            user_type='alumni', is_verified=True))
+        for i in range(rows):
+            user_type = 'alumni' if i % 2 else 'student'
+            db.session.add(User(
+                full_name=f'Bench User {i}', email=f'bench{i}@example.com',
+                password_hash=template.password_hash, college_id=f'BENCH{i}',
+                college_email=f'bench{i}@college.edu', department='Computer Science',
+                user_type=user_type, is_verified=True, bio='Engineer and mentor. ' * 5,
+            ))
+        db.session.flush()
+        alumni = [u.id for u in User.query.filter_by(user_type='alumni').all()]
+        students = [u.id for u in User.query.filter_by(user_type='student').all()]
+        for i in range(rows):
+            db.session.add(Job(alumni_id=alumni[i % len(alumni)], title=f'Engineer {i}', company='Example Corp',
+                               job_type='full-time', description='Build and run APIs. ' * 10))
+        db.session.flush()
+        for i in range(rows):
+            db.session.add(Application(job_id=1 + i % 10, student_id=students[i % len(students)]))
+            db.session.add(Message(sender_id=students[0], receiver_id=alumni[0], content=f'Message {i}'))
+        db.session.commit()
+        return students[0], alumni[0]
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times) * 1000
+
+
+def compare(name, query_fn, serializer, counter, repeats):
+    counter.count = 0
+    orm_rows, orm_ms = timed(lambda: [obj.to_dict() for obj in query_fn().all()], repeats)
+    orm_statements = counter.count // repeats
+
+    counter.count = 0
+    rows, projected_ms = timed(lambda: serialize(query_fn(), serializer), repeats)
+    projected_statements = counter.count // repeats
+    assert rows == orm_rows, f'{name}: serializer output differs from to_dict()'
+
+    payload = {'count': len(rows), name: rows}
+    _, stdlib_ms = timed(lambda: json.dumps(payload, sort_keys=True, separators=(',', ':')), repeats)
+    line = (f"{name:<13} rows={len(rows):<6} to_dict={orm_ms:8.2f}ms/{orm_statements:<4}stmts  "
+            f"projected={projected_ms:7.2f}ms/{projected_statements}stmt  json={stdlib_ms:6.2f}ms")
+    if orjson is not None:
+        _, orjson_ms = timed(lambda: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), repeats)
+        line += f"  orjson={orjson_ms:6.2f}ms"
+    print(line)
+
+
+def endpoint_times(app, student_id, alumni_id, repeats):
+    client = app.test_client()
+
+    def login(email):
+        response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    student = login(db.session.get(User, student_id).email)
+    alumni = login(db.session.get(User, alumni_id).email)
+    admin = login('admin@college.edu')
+    for path, headers in [('/api/jobs/', student), ('/api/jobs/my-jobs', alumni),
+                          ('/api/jobs/my-applications', student), ('/api/users/alumni', student),
+                          ('/api/users/students', student), ('/api/admin/users', admin),
+                          (f'/api/chat/messages/{alumni_id}', student), ('/api/chat/conversations', student)]:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = client.get(path, headers={**headers, 'Accept-Encoding': 'identity'})
+            times.append(time.perf_counter() - start)
+        print(f"  GET {path:<28} {statistics.median(times) * 1000:8.2f}ms  status={response.status_code}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app = create_app()
+    create_schema(app)
+    student_id, alumni_id = seed(app, rows)
+    print(f"rows={rows} repeats={repeats} orjson={'yes' if orjson else 'not installed'}")
+    try:
+        with app.app_context():
+            counter = StatementCounter(db.engine)
+            compare('jobs', lambda: Job.query.filter_by(is_active=True).order_by(Job.created_at.desc()),
+                    JOB, counter, repeats)
+            compare('alumni', lambda: User.query.filter_by(user_type='alumni', is_verified=True, is_active=True),
+                    USER, counter, repeats)
+            compare('students', lambda: User.query.filter_by(user_type='student', is_verified=True, is_active=True),
+                    USER, counter, repeats)
+            compare('users', lambda: User.query.order_by(User.created_at.desc()), USER, counter, repeats)
+            compare('applications', lambda: Application.query.order_by(Application.applied_at.desc()),
+                    APPLICATION, counter, repeats)
+            compare('messages', lambda: Message.query.order_by(Message.created_at.asc()), MESSAGE, counter, repeats)
+
+            print('End to end:')
+            endpoint_times(app, student_id, alumni_id, repeats)
+    finally:
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup time benchmark.
+Measures, in fresh interpreters: importing app.py, building the app with
+create_app(), serving the first request through the test client, and the
+create_all() schema check that used to run on every boot. If gunicorn is
+installed it also times how long N workers take to answer /api/health.
+
+Usage: python benchmarks/bench_startup.py [repeats] [gunicorn_workers]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Throwaway SQLite database so the benchmark never touches real data
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+ENV = {**os.environ, 'DATABASE_URL': 'sqlite:///' + _db_file.name, 'PYTHONDONTWRITEBYTECODE': '1'}
+
+STEPS = {
+    'import app': 'import app',
+    'create_app()': 'from app import create_app; app = create_app()',
+    'first request': ("from app import create_app; app = create_app(); "
+                      "app.test_client().get('/api/health')"),
+    'create_all() check': ("from app import create_app; from models import db; app = create_app()\n"
+                           "with app.app_context(): db.create_all()"),
+}
+
+
+def time_snippet(code):
+    """Seconds spent running code in a new interpreter, interpreter start-up excluded"""
+    wrapper = ('import time; _start = time.perf_counter()\n'
+               f'{code}\n'
+               'print(time.perf_counter() - _start)')
+    result = subprocess.run([sys.executable, '-c', wrapper], cwd=BACKEND_DIR, env=ENV,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_gunicorn(workers, timeout=60):
+    """Seconds from launching gunicorn until every worker has booted and /api/health answers"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'app:create_app()'],
+        cwd=BACKEND_DIR, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        booted = 0
+        ready = False
+        while time.perf_counter() - start < timeout:
+            line = process.stderr.readline()
+            if 'Booting worker' in line:
+                booted += 1
+            if booted >= workers:
+                break
+        while time.perf_counter() - start < timeout:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1)
+                ready = True
+                break
+            except OSError:
+                time.sleep(0.01)
+        return time.perf_counter() - start if ready else None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    try:
+        # Schema in place, as after init_db.py
+        subprocess.run([sys.executable, '-c', 'from app import create_app; from init_db import create_schema; '
+                        'create_schema(create_app())'], cwd=BACKEND_DIR, env=ENV, check=True,
+                       capture_output=True)
+
+        for name, code in STEPS.items():
+            times = [time_snippet(code) for _ in range(repeats)]
+            print(f"{name:<20} median={statistics.median(times) * 1000:8.1f}ms  "
+                  f"min={min(times) * 1000:8.1f}ms")
+
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print('gunicorn not installed; skipping worker boot timing')
+            return
+        times = [t for t in (time_gunicorn(workers) for _ in range(repeats)) if t is not None]
+        if times:
+            print(f"gunicorn -w {workers:<10} median={statistics.median(times) * 1000:8.1f}ms  "
+                  f"min={min(times) * 1000:8.1f}ms  (launch to first healthy response)")
+    finally:
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Load benchmark harness.
+Drives the API through scripted scenarios and reports p50/p95/p99 latency
+and SQL statements per request for each endpoint. Results are saved as JSON
+so a later run can be compared against them.
+
+By default the app runs in-process on the Flask test client, against a
+throwaway SQLite database seeded with seed_data.py at --scale. With --url
+it drives a running server instead (e.g. gunicorn on a seeded database);
+statement counts then come from that server's /metrics, so run it with a
+single worker for exact figures.
+
+Usage: python benchmarks/harness.py [--scale 0.01] [--requests 50] [--concurrency 1]
+                                    [--url http://localhost:5001] [--label NAME]
+                                    [--compare results/OLD.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import secrets
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+sys.path.insert(0, BACKEND_DIR)
+
+# (name, method, path, metrics route label, role, JSON body)
+SCENARIOS = [
+    ('list_jobs', 'GET', '/api/jobs/', '/api/jobs/', 'student', None),
+    ('search_jobs', 'GET', '/api/jobs/?search=engineer&location=Remote', '/api/jobs/', 'student', None),
+    ('job_detail', 'GET', '/api/jobs/{job_id}', '/api/jobs/<int:job_id>', 'student', None),
+    ('list_alumni', 'GET', '/api/users/alumni', '/api/users/alumni', 'student', None),
+    ('alumni_by_skill', 'GET', '/api/users/alumni?skills=python,sql', '/api/users/alumni', 'student', None),
+    ('list_students', 'GET', '/api/users/students?department=Computer%20Science', '/api/users/students',
+     'alumni', None),
+    ('user_stats', 'GET', '/api/users/stats', '/api/users/stats', 'student', None),
+    ('my_jobs', 'GET', '/api/jobs/my-jobs', '/api/jobs/my-jobs', 'alumni', None),
+    ('my_applications', 'GET', '/api/jobs/my-applications', '/api/jobs/my-applications', 'student', None),
+    ('conversations', 'GET', '/api/chat/conversations', '/api/chat/conversations', 'alumni', None),
+    ('messages', 'GET', '/api/chat/messages/{student_id}', '/api/chat/messages/<int:other_user_id>',
+     'alumni', None),
+    ('unread_count', 'GET', '/api/chat/unread-count', '/api/chat/unread-count', 'student', None),
+    ('admin_users', 'GET', '/api/admin/users?user_type=alumni', '/api/admin/users', 'admin', None),
+    ('admin_pending', 'GET', '/api/admin/pending-users?limit=50', '/api/admin/pending-users', 'admin', None),
+    ('admin_stats', 'GET', '/api/admin/stats', '/api/admin/stats', 'admin', None),
+    ('admin_user_detail', 'GET', '/api/admin/user/{alumni_id}', '/api/admin/user/<int:user_id>', 'admin', None),
+]
+
+
+class TestClient:
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, headers=None, body=None):
+        client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers or {}, json=body)
+        return response.status_code, response.get_data()
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, headers=None, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json', **(headers or {})})
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def sql_statement_totals(client, token):
+    """(sum, count) of SQL statements per route from the server's /metrics"""
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    status, body = client.request('GET', '/metrics', headers)
+    if status != 200:
+        return {}
+    totals = {}
+    pattern = re.compile(r'^http_request_sql_statements_(sum|count)\{route="([^"]*)",method="([^"]*)"\} (\S+)$')
+    for line in body.decode().splitlines():
+        match = pattern.match(line)
+        if match:
+            kind, route, method, value = match.groups()
+            totals.setdefault((route, method), [0.0, 0.0])[0 if kind == 'sum' else 1] = float(value)
+    return totals
+
+
+def login(client, email, password):
+    status, body = client.request('POST', '/api/auth/login', body={'email': email, 'password': password})
+    if status != 200:
+        raise RuntimeError(f'Login failed for {email}: {status} {body[:200]!r}')
+    data = json.loads(body)
+    return {'Authorization': f"Bearer {data['access_token']}"}, data['user']['id']
+
+
+def prepare(client, args):
+    from seed_data import BENCH_STUDENT, BENCH_ALUMNI, ADMIN_EMAIL, ADMIN_PASSWORD, PASSWORD
+    student, student_id = login(client, BENCH_STUDENT, args.password or PASSWORD)
+    alumni, alumni_id = login(client, BENCH_ALUMNI, args.password or PASSWORD)
+    admin, _ = login(client, ADMIN_EMAIL, args.admin_password or ADMIN_PASSWORD)
+
+    _, body = client.request('GET', '/api/jobs/my-jobs', alumni)
+    jobs = json.loads(body)['jobs']
+    job_id = max(jobs, key=lambda j: j['applications_count'])['id'] if jobs else 1
+    return {'student': student, 'alumni': alumni, 'admin': admin}, {
+        'student_id': student_id, 'alumni_id': alumni_id, 'job_id': job_id}
+
+
+def run_scenario(client, scenario, headers, params, requests, concurrency, metrics_token):
+    name, method, path, route, role, body = scenario
+    path = path.format(**params)
+    before = sql_statement_totals(client, metrics_token)
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    per_thread = max(1, requests // concurrency)
+
+    def worker():
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            status, _ = client.request(method, path, headers[role], body)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status >= 400:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    after = sql_statement_totals(client, metrics_token)
+    old_sum, old_count = before.get((route, method), [0.0, 0.0])
+    new_sum, new_count = after.get((route, method), [0.0, 0.0])
+    queries = (new_sum - old_sum) / (new_count - old_count) if new_count > old_count else None
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': round(len(latencies) / wall, 1),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'queries_per_request': round(queries, 2) if queries is not None else None,
+    }
+
+
+def print_results(results, baseline=None, threshold=0.1):
+    print(f"{'scenario':<20}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}{'errors':>8}")
+    regressions = []
+    for name, r in results.items():
+        queries = '-' if r['queries_per_request'] is None else f"{r['queries_per_request']:g}"
+        line = (f"{name:<20}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                f"{r['throughput']:>9.1f}{queries:>9}{r['errors']:>8}")
+        old = (baseline or {}).get(name)
+        if old:
+            change = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0.0
+            line += f"   p95 {change:+.0%} vs baseline"
+            more_queries = (r['queries_per_request'] or 0) > (old['queries_per_request'] or 0)
+            if change > threshold or more_queries:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the API load benchmark scenarios')
+    parser.add_argument('--url', help='Benchmark a running server instead of the in-process test client')
+    parser.add_argument('--scale', type=float, default=0.01, help='Dataset scale for the in-process run')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads per scenario')
+    parser.add_argument('--only', help='Comma-separated scenario names')
+    parser.add_argument('--password', help='Password of the seeded bench accounts')
+    parser.add_argument('--admin-password', help='Password of admin@college.edu')
+    parser.add_argument('--metrics-token', default=os.environ.get('METRICS_TOKEN'))
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--compare', help='Saved result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='p95 increase flagged as a regression')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.url:
+        client = HTTPClient(args.url)
+        mode = f'http {args.url}'
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        os.environ['DATABASE_URL'] = 'sqlite:///' + db_file.name
+        os.environ['RATELIMIT_ENABLED'] = 'false'
+        # /metrics needs a scrape token (or an admin login) outside debug mode
+        args.metrics_token = args.metrics_token or secrets.token_hex(16)
+        os.environ['METRICS_TOKEN'] = args.metrics_token
+        from app import create_app
+        from init_db import create_schema
+        from seed_data import seed, scaled_sizes
+        app = create_app()
+        create_schema(app)
+        with app.app_context():
+            sizes = scaled_sizes(args.scale, {})
+            print(f"Seeding {', '.join(f'{k}={v:,}' for k, v in sizes.items())}...")
+            seed(sizes, log=lambda line: print(f'  {line}'))
+        client = TestClient(app)
+        mode = f'test-client scale={args.scale}'
+
+    try:
+        headers, params = prepare(client, args)
+        scenarios = SCENARIOS
+        if args.only:
+            wanted = set(args.only.split(','))
+            scenarios = [s for s in SCENARIOS if s[0] in wanted]
+
+        results = {}
+        for scenario in scenarios:
+            # One untimed request to warm caches and the pool
+            client.request(scenario[1], scenario[2].format(**params), headers[scenario[4]], scenario[5])
+            results[scenario[0]] = run_scenario(client, scenario, headers, params, args.requests,
+                                                args.concurrency, args.metrics_token)
+
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)['scenarios']
+
+        print(f"\n{mode}, {args.requests} requests x concurrency {args.concurrency} (latency in ms)")
+        regressions = print_results(results, baseline, args.threshold)
+
+        if not args.no_save:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            path = os.path.join(RESULTS_DIR, f'{stamp}-{args.label}.json')
+            with open(path, 'w') as f:
+                json.dump({'label': args.label, 'created_at': stamp, 'mode': mode,
+                           'requests': args.requests, 'concurrency': args.concurrency,
+                           'scenarios': results}, f, indent=2)
+            print(f"\nSaved {path}")
+
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+    finally:
+        if db_file is not None:
+            os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Bulk user onboarding from a CSV roster.
+
+Rows are streamed from the file and processed in chunks: each chunk is
+validated, checked for duplicates with two set-based IN queries against the
+indexed email / college_email columns, has its passwords hashed in parallel
+on the password pool and is inserted in a single transaction. Used by the
+admin bulk-register endpoint and by import_users.py.
+"""
+
+import csv
+import time
+from collections import Counter
+from itertools import islice
+from models import db, User
+from passwords import hash_passwords
+from stats import record_new_users
+from analytics import record_signups
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = ['full_name', 'email', 'password', 'college_id',
+                   'college_email', 'department', 'user_type']
+ALUMNI_FIELDS = ['passing_year', 'current_company', 'current_position',
+                 'bio', 'linkedin_url', 'github_url']
+STUDENT_FIELDS = ['expected_passing_year', 'current_year']
+INTEGER_FIELDS = {'passing_year', 'expected_passing_year', 'current_year'}
+
+
+class ImportReport:
+    """Running totals for one import"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.error_count,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_sec': round(self.rows / elapsed, 1) if elapsed > 0 else None,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+
+def _clean_row(row):
+    """Validate one CSV row and return the User column values"""
+    if None in row:
+        # DictReader files fields beyond the header under None, e.g. an unquoted comma
+        raise ValueError(f'Too many fields: expected {len(row) - 1}, got {len(row) - 1 + len(row[None])}')
+    row = {(k or '').strip(): (v or '').strip() for k, v in row.items()}
+
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            raise ValueError(f'Missing required field: {field}')
+
+    if row['user_type'] not in ('student', 'alumni'):
+        raise ValueError(f"Invalid user_type: {row['user_type']}")
+
+    values = {field: row[field] for field in REQUIRED_FIELDS}
+
+    optional = ALUMNI_FIELDS if row['user_type'] == 'alumni' else STUDENT_FIELDS
+    for field in optional:
+        if row.get(field):
+            if field in INTEGER_FIELDS:
+                try:
+                    values[field] = int(row[field])
+                except ValueError:
+                    raise ValueError(f'Invalid integer for {field}: {row[field]}')
+            else:
+                values[field] = row[field]
+
+    return values
+
+
+def _existing(column, values):
+    """Set-based lookup of which values already exist in an indexed column"""
+    if not values:
+        return set()
+    rows = db.session.query(column).filter(column.in_(values)).all()
+    return {r[0] for r in rows}
+
+
+def _import_chunk(chunk, report, verified, seen_emails, seen_college_emails, dry_run):
+    taken_emails = _existing(User.email, [v['email'] for _, v in chunk])
+    taken_college_emails = _existing(User.college_email, [v['college_email'] for _, v in chunk])
+
+    accepted = []
+    for row_number, values in chunk:
+        if values['email'] in taken_emails or values['email'] in seen_emails:
+            report.add_error(row_number, 'Email already registered')
+            continue
+        if values['college_email'] in taken_college_emails or values['college_email'] in seen_college_emails:
+            report.add_error(row_number, 'College email already registered')
+            continue
+        seen_emails.add(values['email'])
+        seen_college_emails.add(values['college_email'])
+        accepted.append((row_number, values))
+
+    if dry_run:
+        # Dry runs report what would have been created
+        report.created += len(accepted)
+        return
+    if not accepted:
+        return
+
+    hashes = hash_passwords([values.pop('password') for _, values in accepted])
+    for (_, values), password_hash in zip(accepted, hashes):
+        values['password_hash'] = password_hash
+        values['is_verified'] = verified
+        values['is_active'] = True
+
+    try:
+        db.session.execute(db.insert(User), [values for _, values in accepted])
+        record_new_users([(values['user_type'], verified, True) for _, values in accepted])
+        for user_type, count in Counter(values['user_type'] for _, values in accepted).items():
+            record_signups(user_type, count)
+        db.session.commit()
+        report.created += len(accepted)
+    except Exception as e:
+        db.session.rollback()
+        for row_number, _ in accepted:
+            report.add_error(row_number, f'Insert failed: {str(e)}')
+
+
+def import_users_csv(stream, verified=True, chunk_size=CHUNK_SIZE, dry_run=False, max_rows=None):
+    """Import users from a text stream of CSV rows; returns an ImportReport
+
+    With max_rows, a roster with more rows is refused (ValueError) before
+    anything is imported.
+    """
+    report = ImportReport()
+    reader = csv.DictReader(stream)
+
+    columns = [(name or '').strip() for name in (reader.fieldnames or [])]
+    missing = [f for f in REQUIRED_FIELDS if f not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+    rows = reader
+    if max_rows is not None:
+        rows = list(islice(reader, max_rows + 1))
+        if len(rows) > max_rows:
+            raise ValueError(f'At most {max_rows} rows per upload; import larger rosters with import_users.py')
+
+    seen_emails = set()
+    seen_college_emails = set()
+    chunk = []
+
+    for row in rows:
+        row_number = reader.line_num
+        report.rows += 1
+        try:
+            chunk.append((row_number, _clean_row(row)))
+        except ValueError as e:
+            report.add_error(row_number, str(e))
+
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, report, verified, seen_emails, seen_college_emails, dry_run)
+            chunk = []
+
+    if chunk:
+        _import_chunk(chunk, report, verified, seen_emails, seen_college_emails, dry_run)
+
+    return report
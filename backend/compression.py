@@ -0,0 +1,120 @@
+"""
+Response compression.
+
+An after_request hook negotiates brotli or gzip from Accept-Encoding and
+compresses text responses (JSON, CSV, NDJSON, ...). Buffered responses
+under COMPRESSION_MIN_SIZE bytes are sent as is, since the headers would
+eat the saving. Streamed responses are compressed chunk by chunk with a
+sync flush after each one, so exports still reach the client
+incrementally. Brotli is used only when the optional brotli package is
+installed.
+"""
+
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/html', 'text/css', 'text/plain',
+}
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported coding from an Accept-Encoding header, or None"""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available_encodings():
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compressor(encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.Compressor(quality=config['COMPRESSION_BROTLI_QUALITY'])
+    # wbits 31 = gzip container
+    return zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'], zlib.DEFLATED, 31)
+
+
+def compress_bytes(data, encoding):
+    compressor = _compressor(encoding)
+    if encoding == 'br':
+        return compressor.process(data) + compressor.finish()
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, compressor, encoding):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if encoding == 'br':
+            data = compressor.process(chunk) + compressor.flush()
+        else:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == 'br' else compressor.flush()
+
+
+def _should_compress(response):
+    if not current_app.config['COMPRESSION_ENABLED']:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    return 'no-transform' not in (response.headers.get('Cache-Control') or '')
+
+
+def compress_response(response):
+    """after_request hook"""
+    if not _should_compress(response):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    if response.is_streamed:
+        chunks = response.response
+        response.response = _compress_stream(chunks, _compressor(encoding), encoding)
+        if hasattr(chunks, 'close'):
+            # Closing the response now closes only the wrapper; release the export's cursor too
+            response.call_on_close(chunks.close)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+            return response
+        response.set_data(compress_bytes(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    return response
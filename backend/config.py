@@ -18,6 +18,31 @@ class Config:
     else:
         # Local development: Use SQLite
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'alumniconnect.db')
+    
+    # Connection pool: recycle below the server's idle timeout and ping on
+    # checkout, so connections dropped while the service idled never reach a request
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 5),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 10),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE') or 280),  # seconds
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT') or 10),  # seconds to wait for a free connection
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', 'on', '1'],
+    }
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT') or 10)
+        }
+    # Read replicas (comma-separated URLs) for handlers marked @read_only
+    DATABASE_REPLICA_URLS = [u.strip() for u in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',') if u.strip()]
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS') or 5)
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL') or 2)  # seconds
+    # Colleges (see tenancy.py): requests without a token, X-Tenant header or
+    # matching domain belong to DEFAULT_TENANT_ID. Colleges moved out of the
+    # shared tables are listed as "<tenant id>=<database URL or schema>,..."
+    DEFAULT_TENANT_ID = int(os.environ.get('DEFAULT_TENANT_ID') or 1)
+    TENANT_DATABASE_URLS = os.environ.get('TENANT_DATABASE_URLS') or ''
+    TENANT_SCHEMAS = os.environ.get('TENANT_SCHEMAS') or ''
+    TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL') or 60)  # seconds the tenants directory is cached
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     
@@ -25,15 +50,87 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    TOKEN_VERSION_CACHE_TTL = int(os.environ.get('TOKEN_VERSION_CACHE_TTL') or 30)  # seconds
+    
+    VERIFICATION_CLAIM_TTL = int(os.environ.get('VERIFICATION_CLAIM_TTL') or 900)  # seconds
+    
+    DELETION_BATCH_SIZE = int(os.environ.get('DELETION_BATCH_SIZE') or 500)  # rows per transaction
+    DELETION_LEASE_SECONDS = int(os.environ.get('DELETION_LEASE_SECONDS') or 120)
+    
+    # Admin accounts (comma-separated in the environment)
+    ADMIN_EMAILS = [e.strip() for e in (os.environ.get('ADMIN_EMAILS') or 'admin@college.edu').split(',') if e.strip()]
+    
+    # Password hashing configuration
+    # Method strings use Werkzeug's full form so stored hashes can be compared for rehash
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)  # 0 = hash inline
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE') or 32)
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT') or 10)  # seconds
+    BULK_REGISTER_MAX_ROWS = int(os.environ.get('BULK_REGISTER_MAX_ROWS') or 200)  # rows per bulk-register upload
+    
+    # Rate limiting: 'count/period' with optional ';burst'
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND') or 'sqlite'  # 'sqlite' (shared by workers) or 'memory'
+    RATELIMIT_STORAGE_PATH = os.environ.get('RATELIMIT_STORAGE_PATH')
+    RATELIMIT_TRUST_PROXY = os.environ.get('RATELIMIT_TRUST_PROXY', 'false').lower() in ['true', 'on', '1']
+    RATELIMIT_LOGIN_IP = os.environ.get('RATELIMIT_LOGIN_IP') or '30/minute;10'
+    RATELIMIT_LOGIN_EMAIL = os.environ.get('RATELIMIT_LOGIN_EMAIL') or '10/minute;5'
+    RATELIMIT_REGISTER_IP = os.environ.get('RATELIMIT_REGISTER_IP') or '20/hour;5'
+    RATELIMIT_SEND_MESSAGE_USER = os.environ.get('RATELIMIT_SEND_MESSAGE_USER') or '60/minute;20'
+    RATELIMIT_APPLY_USER = os.environ.get('RATELIMIT_APPLY_USER') or '30/hour;10'
+    
+    # Request/SQL metrics (GET /metrics) and slow logs
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token required for /metrics when set
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS') or 1000)
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS') or 200)
+    SLOW_LOG_SAMPLE_RATE = float(os.environ.get('SLOW_LOG_SAMPLE_RATE') or 0.1)  # share of slow logs with stacks
+    
+    # Response compression (brotli needs the optional brotli package)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE') or 1024)  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL') or 6)  # 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY') or 4)  # 0-11
+    
+    # Long-polling (GET /api/chat/poll); sync workers answer at once by default,
+    # since a parked request holds the whole worker (see serving.py)
+    CHAT_LONG_POLL_SECONDS = float(os.environ.get('CHAT_LONG_POLL_SECONDS') or 25)
+    CHAT_LONG_POLL_SYNC_SECONDS = float(os.environ.get('CHAT_LONG_POLL_SYNC_SECONDS') or 0)
+    CHAT_POLL_INTERVAL = float(os.environ.get('CHAT_POLL_INTERVAL') or 1)  # seconds between checks
+    
+    # Idempotency-Key replay for retried POSTs (see idempotency.py)
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL') or 86400)  # seconds a response is replayable
+    IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS') or 60)  # before a stuck first attempt is retried
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS') or 10)  # duplicate waits for the first attempt
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE') or 10000)  # responses per process
+    
+    # POST /api/batch: sub-requests per batch, and how many run at once (1 = in the batch's session)
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS') or 20)
+    BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY') or 1)
     
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'doc', 'docx'}
     
-    # Email configuration (for future use)
+    # Notification feed: audiences above the limit are merged in at read time instead of copied
+    FEED_FANOUT_MAX_AUDIENCE = int(os.environ.get('FEED_FANOUT_MAX_AUDIENCE') or 5000)
+    FEED_FANOUT_BATCH_SIZE = int(os.environ.get('FEED_FANOUT_BATCH_SIZE') or 1000)  # feed rows per transaction
+    
+    # Background tasks (task_worker.py)
+    TASK_BATCH_SIZE = int(os.environ.get('TASK_BATCH_SIZE') or 50)  # tasks leased per claim
+    TASK_LEASE_SECONDS = int(os.environ.get('TASK_LEASE_SECONDS') or 300)
+    TASK_MAX_ATTEMPTS = int(os.environ.get('TASK_MAX_ATTEMPTS') or 5)
+    TASK_RETRY_BACKOFF = int(os.environ.get('TASK_RETRY_BACKOFF') or 30)  # seconds, doubled per attempt
+    TASK_RETRY_MAX_BACKOFF = int(os.environ.get('TASK_RETRY_MAX_BACKOFF') or 3600)
+    
+    # Email configuration (emails are queued only when MAIL_SERVER is set)
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')  # defaults to MAIL_USERNAME
+    MAIL_TIMEOUT = int(os.environ.get('MAIL_TIMEOUT') or 10)  # seconds
+    MESSAGE_EMAIL_DELAY = int(os.environ.get('MESSAGE_EMAIL_DELAY') or 300)  # seconds before a new-message email
@@ -0,0 +1,72 @@
+"""
+College (tenant) setup script.
+Adds a college to the tenants directory and, optionally, its first admin
+account. Requests pick the college with the X-Tenant header (its slug) or
+by arriving on its domain. The admin's email must also be listed in
+ADMIN_EMAILS.
+
+To give the college its own database or schema, add its id to
+TENANT_DATABASE_URLS or TENANT_SCHEMAS and run init_db.py to create its
+tables before it gets traffic.
+
+Usage: python create_tenant.py SLUG NAME [--domain HOST] [--admin-email EMAIL --admin-password PASSWORD]
+"""
+
+import argparse
+from app import create_app
+from models import db, User, Tenant
+from stats import reconcile_stats, record_user_change, user_state
+from tenancy import tenant_context, forget_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add a college')
+    parser.add_argument('slug', help='Short name, sent as the X-Tenant header')
+    parser.add_argument('name', help='Display name')
+    parser.add_argument('--domain', help='Host name that selects this college')
+    parser.add_argument('--admin-email', help='Create an admin account with this email')
+    parser.add_argument('--admin-password', help='Password for the admin account')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            if Tenant.query.filter_by(slug=args.slug).first():
+                print(f"ℹ️  College '{args.slug}' already exists. Skipping creation.")
+                return
+            tenant = Tenant(slug=args.slug, name=args.name, domain=args.domain)
+            db.session.add(tenant)
+            db.session.commit()
+            forget_directory()
+            with tenant_context(tenant.id):
+                reconcile_stats()
+            print(f"✅ Created college {tenant.id} ({tenant.slug})")
+
+            if args.admin_email and args.admin_password:
+                with tenant_context(tenant.id):
+                    admin = User(
+                        full_name=f'{args.name} Admin',
+                        email=args.admin_email,
+                        college_id='ADMIN001',
+                        college_email=args.admin_email,
+                        department='Administration',
+                        user_type='alumni',
+                        is_verified=True,
+                        is_active=True
+                    )
+                    admin.set_password(args.admin_password)
+                    db.session.add(admin)
+                    record_user_change(None, user_state(admin))
+                    db.session.commit()
+                print(f"✅ Created admin {args.admin_email}")
+                if args.admin_email not in app.config['ADMIN_EMAILS']:
+                    print("⚠️  Add this email to ADMIN_EMAILS to give it admin access")
+
+        except Exception as e:
+            print(f"❌ Error creating college: {str(e)}")
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
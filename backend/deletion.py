@@ -0,0 +1,219 @@
+"""
+Asynchronous user deletion.
+
+Deleting a user is split in two. The request only marks the user deleted
+(deleted_at set, deactivated, tokens revoked, dropped from the stats rollup)
+and queues a DeletionJob, which is cheap and touches one row. The worker in
+deletion_worker.py then clears the rows that reference the user one stage
+at a time, in batches of DELETION_BATCH_SIZE primary keys per transaction,
+recording the stage and running row count on the job as it goes. A worker
+leases a job by setting locked_until; if it dies, the lease lapses and the
+next worker resumes from the recorded stage. Stages are idempotent, so
+re-running a partly finished one just finds fewer rows.
+
+Besides the user's own content, the stages remove the feed events they
+caused (and other users' copies of them), emails still queued for them and
+their stored Idempotency-Key responses. Responses cached in a process's
+memory are not reached, but only the user's (revoked) tokens could replay
+them and they expire after IDEMPOTENCY_TTL.
+"""
+
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from flask import current_app
+from models import (db, User, Job, Application, Message, Conversation, DeletionJob, FeedEvent, FeedItem,
+                    FeedCursor, IdempotencyKey, Task, user_skills)
+from authz import bump_token_version, bump_token_versions
+from stats import record_user_change, user_state
+from verification_queue import release_claims
+from tenancy import ALL_TENANTS, tenant_context
+
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 30
+
+
+
+def _user_events(uid):
+    """Feed events the user caused or that describe their jobs and applications"""
+    return db.select(FeedEvent.id).where(db.or_(
+        FeedEvent.actor_id == uid,
+        FeedEvent.job_id.in_(db.select(Job.id).where(Job.alumni_id == uid)),
+        FeedEvent.application_id.in_(db.select(Application.id).where(Application.student_id == uid)),
+    ))
+
+
+def _emails_to(uid):
+    """Queued emails addressed to the user; a task a worker is running is left to finish"""
+    email = db.session.query(User.email).filter(User.id == uid).scalar()
+    if email is None:
+        return db.false()
+    return db.and_(
+        Task.name == 'send_email',
+        Task.status != 'running',
+        Task.payload.contains(json.dumps({'to': email})[1:-1], autoescape=True),
+    )
+
+
+# (stage name, model, criteria for rows belonging to the user), in dependency order
+STAGES = [
+    ('messages', Message, lambda uid: db.or_(Message.sender_id == uid, Message.receiver_id == uid)),
+    ('conversations', Conversation, lambda uid: db.or_(Conversation.user1_id == uid, Conversation.user2_id == uid)),
+    # Other users' copies first, as feed_items reference feed_events
+    ('event_feed_items', FeedItem, lambda uid: FeedItem.event_id.in_(_user_events(uid))),
+    ('feed_events', FeedEvent, lambda uid: FeedEvent.id.in_(_user_events(uid))),
+    ('applications', Application, lambda uid: Application.student_id == uid),
+    ('job_applications', Application,
+     lambda uid: Application.job_id.in_(db.select(Job.id).where(Job.alumni_id == uid))),
+    ('jobs', Job, lambda uid: Job.alumni_id == uid),
+    ('feed_items', FeedItem, lambda uid: FeedItem.user_id == uid),
+    ('emails', Task, _emails_to),
+    # Replayable responses of the user's retried POSTs (see idempotency.py)
+    ('idempotency_keys', IdempotencyKey, lambda uid: IdempotencyKey.scope == f'user:{uid}'),
+]
+
+
+def request_user_deletion(user, requested_by=None):
+    """Mark one user deleted and queue the cleanup; commits with the caller's transaction"""
+    record_user_change(user_state(user), None)
+    user.is_active = False
+    user.deleted_at = datetime.utcnow()
+    bump_token_version(user.id)
+    release_claims([user.id])
+
+    job = DeletionJob.query.filter_by(user_id=user.id).first()
+    if job is None:
+        job = DeletionJob(user_id=user.id, requested_by=requested_by)
+        db.session.add(job)
+    return job
+
+
+def request_users_deletion(user_ids, requested_by=None):
+    """Mark many users deleted with one UPDATE and queue their cleanup jobs
+
+    The caller is responsible for the stats rollup, as bulk actions batch it.
+    """
+    if not user_ids:
+        return
+    db.session.execute(
+        db.update(User)
+        .where(User.id.in_(user_ids))
+        .values(is_active=False, deleted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    bump_token_versions(user_ids)
+    release_claims(user_ids)
+
+    queued = {r[0] for r in db.session.query(DeletionJob.user_id).filter(DeletionJob.user_id.in_(user_ids))}
+    new_jobs = [{'user_id': i, 'requested_by': requested_by, 'status': 'pending',
+                 'rows_deleted': 0, 'attempts': 0, 'created_at': datetime.utcnow()}
+                for i in user_ids if i not in queued]
+    if new_jobs:
+        db.session.execute(db.insert(DeletionJob), new_jobs)
+
+
+def _lease_until():
+    return datetime.utcnow() + timedelta(seconds=current_app.config['DELETION_LEASE_SECONDS'])
+
+
+def claim_job(worker_id):
+    """Lease the oldest runnable job of any college, or return None"""
+    now = datetime.utcnow()
+    runnable = db.and_(
+        DeletionJob.status.in_(['pending', 'running']),
+        db.or_(DeletionJob.locked_until.is_(None), DeletionJob.locked_until < now),
+    )
+    candidate = (db.session.query(DeletionJob.id).filter(runnable).order_by(DeletionJob.id)
+                 .execution_options(**{ALL_TENANTS: True}).first())
+    if candidate is None:
+        return None
+
+    # Conditional UPDATE so two workers can't lease the same job
+    result = db.session.execute(
+        db.update(DeletionJob)
+        .where(DeletionJob.id == candidate.id, runnable)
+        .values(status='running', locked_by=worker_id, locked_until=_lease_until(),
+                attempts=DeletionJob.attempts + 1)
+        .execution_options(synchronize_session=False, **{ALL_TENANTS: True})
+    )
+    db.session.commit()
+    if result.rowcount != 1:
+        return None
+    return db.session.get(DeletionJob, candidate.id, execution_options={ALL_TENANTS: True})
+
+
+def _delete_batch(model, criteria, batch_size):
+    ids = [r[0] for r in db.session.query(model.id).filter(criteria).limit(batch_size).all()]
+    if not ids:
+        return 0
+    db.session.execute(
+        db.delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return len(ids)
+
+
+def _process_stages(job, batch_size):
+    names = [name for name, _, _ in STAGES]
+    start = names.index(job.stage) if job.stage in names else 0
+
+    for name, model, criteria in STAGES[start:]:
+        while True:
+            deleted = _delete_batch(model, criteria(job.user_id), batch_size)
+            job.stage = name
+            job.rows_deleted += deleted
+            job.locked_until = _lease_until()
+            db.session.commit()
+            if deleted < batch_size:
+                break
+
+    # Finally the user row and its small per-user tables
+    job.stage = 'user'
+    db.session.execute(user_skills.delete().where(user_skills.c.user_id == job.user_id))
+    db.session.execute(db.delete(FeedCursor).where(FeedCursor.user_id == job.user_id))
+    release_claims([job.user_id])
+    deleted = db.session.execute(
+        db.delete(User).where(User.id == job.user_id).execution_options(synchronize_session=False)
+    ).rowcount
+    job.rows_deleted += deleted
+    job.status = 'done'
+    job.locked_by = None
+    job.locked_until = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def process_job(job, batch_size=None):
+    """Run one leased job to completion, recording failures for retry"""
+    batch_size = batch_size or current_app.config['DELETION_BATCH_SIZE']
+    try:
+        _process_stages(job, batch_size)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(DeletionJob, job.id)
+        job.last_error = str(e)
+        job.status = 'failed' if job.attempts >= MAX_ATTEMPTS else 'pending'
+        job.locked_by = None
+        # Hold the job back before the next attempt
+        job.locked_until = datetime.utcnow() + timedelta(seconds=RETRY_BACKOFF_SECONDS * job.attempts)
+        db.session.commit()
+        return False
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_pending_jobs(limit=None):
+    """Process runnable jobs until none are left (or limit is reached)"""
+    me = worker_id()
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job(me)
+        if job is None:
+            break
+        with tenant_context(job.tenant_id):
+            process_job(job)
+        processed += 1
+    return processed
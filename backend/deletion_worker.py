@@ -0,0 +1,40 @@
+"""
+User deletion worker.
+Processes queued DeletionJobs, removing each deleted user's messages,
+conversations, applications and jobs in bounded batches. Safe to run
+several copies, and to kill at any point: unfinished jobs are resumed from
+their last recorded stage once their lease expires. A college with its own
+database or schema needs its own worker started with --tenant.
+
+Usage: python deletion_worker.py [--once] [--poll SECONDS] [--tenant ID]
+"""
+
+import argparse
+import time
+from app import create_app
+from deletion import run_pending_jobs
+from tenancy import tenant_context
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Process queued user deletions')
+    parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+    parser.add_argument('--poll', type=int, default=5, help='Seconds to wait when the queue is empty')
+    parser.add_argument('--tenant', type=int, help="Work on this college's own database")
+    args = parser.parse_args()
+
+    app = create_app()
+
+    while True:
+        with app.app_context(), tenant_context(args.tenant):
+            processed = run_pending_jobs()
+        if processed:
+            print(f"✅ Processed {processed} deletion jobs")
+        elif args.once:
+            break
+        else:
+            time.sleep(args.poll)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Streaming table exports.
+
+Exports select plain columns (no ORM objects) through a server-side cursor
+with yield_per, format rows as CSV or NDJSON in small buffered chunks and
+optionally gzip them on the fly, so memory stays flat however many rows
+the table holds.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from models import db, User, Job, Application
+
+YIELD_PER = 1000
+FLUSH_ROWS = 200
+
+Student = db.aliased(User)
+
+# Export name -> (columns, joins)
+EXPORTS = {
+    'users': ([
+        User.id, User.full_name, User.email, User.college_id, User.college_email,
+        User.department, User.user_type, User.is_verified, User.is_active,
+        User.passing_year, User.current_company, User.current_position,
+        User.expected_passing_year, User.current_year, User.skills,
+        User.linkedin_url, User.github_url, User.created_at,
+    ], []),
+    'jobs': ([
+        Job.id, Job.alumni_id, Job.title, Job.company, Job.location, Job.job_type,
+        Job.salary_range, Job.application_deadline, Job.is_active, Job.created_at,
+    ], []),
+    'applications': ([
+        Application.id, Application.job_id, Job.title.label('job_title'), Job.company,
+        Application.student_id, Student.full_name.label('student_name'),
+        Student.email.label('student_email'), Application.status,
+        Application.applied_at, Application.updated_at,
+    ], [(Job, Application.job_id == Job.id), (Student, Application.student_id == Student.id)]),
+}
+
+
+def build_export_query(name):
+    columns, joins = EXPORTS[name]
+    query = db.session.query(*columns)
+    for target, condition in joins:
+        query = query.join(target, condition)
+    return query
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_value(v) for v in row])
+        if count % FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({c: _value(v) for c, v in zip(columns, row)}))
+        if len(lines) >= FLUSH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(query, fmt='csv', gzip=False):
+    """Yield the encoded export of a column query, row chunk by row chunk"""
+    columns = [c['name'] for c in query.column_descriptions]
+    rows = query.execution_options(stream_results=True, yield_per=YIELD_PER)
+
+    chunks = _ndjson_chunks(columns, rows) if fmt == 'ndjson' else _csv_chunks(columns, rows)
+    encoded = (chunk.encode('utf-8') for chunk in chunks)
+    return _gzip(encoded) if gzip else encoded
@@ -0,0 +1,173 @@
+"""
+Notification feed.
+
+Every notification is one feed_events row, ordered by id. Delivery depends
+on the audience:
+- one recipient (application received, application status): a feed_items
+  row is written in the same transaction as the event
+- a department's students (job posted), up to FEED_FANOUT_MAX_AUDIENCE: a
+  'feed_fanout' task copies the event into each student's feed_items,
+  FEED_FANOUT_BATCH_SIZE users per transaction, recording its progress so
+  a retried fan-out resumes where it stopped
+- larger audiences are not copied at all (fanout='read'); get_feed() merges
+  matching events into each reader's feed from ix_feed_events_audience
+
+A feed page is the newest `limit` events below the cursor (an event id)
+from both sources. The unread marker is the last event id the user has
+read, kept in feed_cursors.
+"""
+
+import json
+from flask import current_app
+from models import db, User, FeedEvent, FeedItem, FeedCursor
+from tasks import task, enqueue
+
+MAX_PAGE_SIZE = 100
+UNREAD_COUNT_CAP = 100
+
+
+def _event(kind, actor_id=None, job=None, application_id=None, **payload):
+    event = FeedEvent(kind=kind, actor_id=actor_id, job_id=job.id if job else None,
+                      application_id=application_id, payload=json.dumps(payload))
+    db.session.add(event)
+    db.session.flush()
+    return event
+
+
+def _deliver(event, user_id):
+    db.session.add(FeedItem(user_id=user_id, event_id=event.id))
+
+
+def _audience_query(user_type, department, actor_id=None):
+    query = db.session.query(User.id).filter(
+        User.user_type == user_type,
+        User.department == department,
+        User.is_verified.is_(True),
+        User.is_active.is_(True),
+        User.deleted_at.is_(None)
+    )
+    if actor_id is not None:
+        query = query.filter(User.id != actor_id)
+    return query
+
+
+def job_posted(job, alumni):
+    """Notify the poster's department's students; the job must have been flushed"""
+    event = _event('job_posted', actor_id=alumni.id, job=job, title=job.title, company=job.company,
+                   location=job.location, job_type=job.job_type, department=alumni.department)
+    event.audience_type = 'student'
+    event.audience_department = alumni.department
+
+    # Counting stops just past the threshold
+    threshold = current_app.config['FEED_FANOUT_MAX_AUDIENCE']
+    audience = _audience_query('student', alumni.department).limit(threshold + 1).count()
+    if audience > threshold:
+        event.fanout = 'read'
+    elif audience:
+        enqueue('feed_fanout', {'event_id': event.id})
+    return event
+
+
+def application_received(application, job, student):
+    event = _event('application_received', actor_id=student.id, job=job, application_id=application.id,
+                   title=job.title, company=job.company, student_name=student.full_name)
+    _deliver(event, job.alumni_id)
+    return event
+
+
+def application_status_changed(application, job):
+    event = _event('application_status', actor_id=job.alumni_id, job=job, application_id=application.id,
+                   title=job.title, company=job.company, status=application.status)
+    _deliver(event, application.student_id)
+    return event
+
+
+@task('feed_fanout')
+def fan_out(payload):
+    """Copy an event into its audience's feeds in batches, resuming from fanout_cursor"""
+    event = db.session.get(FeedEvent, payload['event_id'])
+    if event is None or event.fanout != 'write':
+        return
+    batch_size = current_app.config['FEED_FANOUT_BATCH_SIZE']
+    query = _audience_query(event.audience_type, event.audience_department, event.actor_id)
+    last_id = event.fanout_cursor or 0
+    while True:
+        ids = [r[0] for r in query.filter(User.id > last_id).order_by(User.id).limit(batch_size)]
+        if not ids:
+            break
+        db.session.execute(db.insert(FeedItem), [{'user_id': i, 'event_id': event.id} for i in ids])
+        last_id = ids[-1]
+        event.fanout_cursor = last_id
+        db.session.commit()
+
+
+def _broadcasts(user):
+    """Fan-out-on-read events this user should see"""
+    return db.session.query(FeedEvent.id).filter(
+        FeedEvent.fanout == 'read',
+        FeedEvent.audience_type == user.user_type,
+        FeedEvent.audience_department == user.department,
+        FeedEvent.created_at >= user.created_at
+    )
+
+
+def _event_ids(user, below=None, above=None, limit=None):
+    """Newest event ids in the user's feed within (above, below), from both sources"""
+    sources = [db.session.query(FeedItem.event_id).filter(FeedItem.user_id == user.id),
+               _broadcasts(user)]
+    ids = []
+    for query, column in zip(sources, (FeedItem.event_id, FeedEvent.id)):
+        if below is not None:
+            query = query.filter(column < below)
+        if above is not None:
+            query = query.filter(column > above)
+        ids.extend(r[0] for r in query.order_by(column.desc()).limit(limit))
+    return sorted(set(ids), reverse=True)[:limit]
+
+
+def last_read_id(user_id):
+    cursor = db.session.get(FeedCursor, user_id)
+    return cursor.last_read_id if cursor else 0
+
+
+def to_dict(event, last_read):
+    return {
+        'id': event.id,
+        'kind': event.kind,
+        'actor_id': event.actor_id,
+        'job_id': event.job_id,
+        'application_id': event.application_id,
+        'data': json.loads(event.payload) if event.payload else {},
+        'created_at': event.created_at.isoformat() if event.created_at else None,
+        'unread': event.id > last_read,
+    }
+
+
+def get_feed(user, limit, cursor=None):
+    """Return (notifications, next_cursor, last_read_id) for one page, newest first"""
+    ids = _event_ids(user, below=cursor, limit=limit)
+    events = {e.id: e for e in FeedEvent.query.filter(FeedEvent.id.in_(ids))} if ids else {}
+    last_read = last_read_id(user.id)
+    notifications = [to_dict(events[i], last_read) for i in ids if i in events]
+    next_cursor = ids[-1] if len(ids) == limit else None
+    return notifications, next_cursor, last_read
+
+
+def unread_count(user):
+    """Unread notifications, counted up to UNREAD_COUNT_CAP"""
+    return len(_event_ids(user, above=last_read_id(user.id), limit=UNREAD_COUNT_CAP))
+
+
+def mark_read(user_id, up_to):
+    """Move the unread marker forward to up_to (it never moves back)"""
+    cursor = db.session.get(FeedCursor, user_id)
+    if cursor is None:
+        cursor = FeedCursor(user_id=user_id, last_read_id=0)
+        db.session.add(cursor)
+    cursor.last_read_id = max(cursor.last_read_id or 0, up_to)
+    return cursor.last_read_id
+
+
+def latest_event_id(user):
+    ids = _event_ids(user, limit=1)
+    return ids[0] if ids else 0
@@ -0,0 +1,20 @@
+"""
+gunicorn settings, read from the environment (gunicorn loads this file from
+the working directory automatically).
+
+GUNICORN_WORKER_CLASS=sync (default) serves one request per worker process;
+gevent serves up to GUNICORN_WORKER_CONNECTIONS concurrent requests per
+worker, which is what long-polling needs. See serving.py for what the app
+does differently under gevent.
+"""
+
+import os
+
+bind = '0.0.0.0:' + (os.environ.get('PORT') or '5001')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or 'sync'
+workers = int(os.environ.get('WEB_CONCURRENCY') or 2)
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 1000)  # gevent only
+# Sync workers are killed after this many seconds on one request; gevent
+# workers only need to heartbeat, so long-polls are not affected
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 30)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE') or 5)
@@ -0,0 +1,207 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+A client that may retry a POST sends a unique Idempotency-Key header. The
+first request with a key claims it by inserting an in_progress row into
+idempotency_keys, scoped to the user (or, before login, the client IP),
+then runs the handler and stores the response. A retry with the same key:
+- gets the stored response replayed with Idempotent-Replayed: true, and the
+  handler does not run again (no second row, no second password hash)
+- arriving while the first attempt still runs waits up to
+  IDEMPOTENCY_WAIT_SECONDS for it to finish, then gets 409 with Retry-After
+- with a different method, path or body gets 422
+
+5xx and 429 responses are not stored; the key is released so the client
+can retry for real. A first attempt that dies mid-request blocks its key for
+IDEMPOTENCY_LOCK_SECONDS. Stored responses expire after IDEMPOTENCY_TTL
+seconds; expired rows are purged a batch at a time as new keys are claimed.
+Finished responses are also kept in a per-process LRU of
+IDEMPOTENCY_CACHE_SIZE entries, so most replays skip the database.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import Response, current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+from ratelimit import client_ip
+from serving import wait_for
+from tenancy import current_tenant_id
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+PURGE_EVERY = 100  # claims per process between purges of expired rows
+PURGE_BATCH = 500
+
+
+class ResponseCache:
+    """LRU of finished responses, (tenant, scope, key) -> (expires_at, request_hash, status, body, type)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return entry
+
+    def put(self, cache_key, entry, max_size):
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = ResponseCache()
+_claims = 0
+
+
+def _scope():
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    return f'user:{user_id}' if user_id is not None else f'ip:{client_ip()}'
+
+
+def _cache_key(scope, key):
+    return (current_tenant_id(), scope, key)
+
+
+def _request_hash():
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(status, body, content_type):
+    response = Response(body, status=status, content_type=content_type)
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _mismatch():
+    return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+
+
+def _purge_expired():
+    """Delete a batch of expired keys every PURGE_EVERY claims in this process"""
+    global _claims
+    _claims += 1
+    if _claims % PURGE_EVERY:
+        return
+    expired = db.session.query(IdempotencyKey.id).filter(
+        IdempotencyKey.expires_at < datetime.utcnow()
+    ).limit(PURGE_BATCH)
+    db.session.execute(
+        db.delete(IdempotencyKey).where(IdempotencyKey.id.in_([r[0] for r in expired]))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _claim(scope, key, request_hash):
+    """Insert an in_progress row; returns the existing row if the key is taken"""
+    config = current_app.config
+    now = datetime.utcnow()
+    _purge_expired()
+    try:
+        with db.session.begin_nested():
+            db.session.add(IdempotencyKey(
+                scope=scope, key=key, request_hash=request_hash, status='in_progress',
+                locked_until=now + timedelta(seconds=config['IDEMPOTENCY_LOCK_SECONDS']),
+                expires_at=now + timedelta(seconds=config['IDEMPOTENCY_TTL'])
+            ))
+        db.session.commit()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+
+    existing = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+    if existing is not None and (existing.expires_at < now or (
+            existing.status == 'in_progress' and existing.locked_until < now)):
+        # Expired, or its first attempt died: start over
+        db.session.delete(existing)
+        db.session.commit()
+        return _claim(scope, key, request_hash)
+    return existing
+
+
+def _finish(scope, key, response):
+    record = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+    if record is None:
+        return
+    if response.status_code >= 500 or response.status_code == 429:
+        db.session.delete(record)
+    else:
+        record.status = 'done'
+        record.response_status = response.status_code
+        record.response_body = response.get_data()
+        record.response_type = response.content_type
+        record.locked_until = None
+    db.session.commit()
+    if record.status == 'done':
+        entry = (time.time() + current_app.config['IDEMPOTENCY_TTL'], record.request_hash,
+                 record.response_status, record.response_body, record.response_type)
+        cache.put(_cache_key(scope, key), entry, current_app.config['IDEMPOTENCY_CACHE_SIZE'])
+
+
+def idempotent(fn):
+    """Record the first response per Idempotency-Key and replay it for retries (place below the auth decorators)"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return fn(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        scope = _scope()
+        request_hash = _request_hash()
+        cached = cache.get(_cache_key(scope, key))
+        if cached is not None:
+            _, cached_hash, status, body, content_type = cached
+            return _replay(status, body, content_type) if cached_hash == request_hash else _mismatch()
+
+        existing = _claim(scope, key, request_hash)
+        if existing is not None:
+            if existing.request_hash != request_hash:
+                return _mismatch()
+            if existing.status == 'in_progress':
+                # A concurrent duplicate: wait for the first attempt instead of running again
+                def settled():
+                    row = IdempotencyKey.query.filter_by(scope=scope, key=key).populate_existing().first()
+                    if row is None:
+                        return 'released'
+                    return row if row.status == 'done' else None
+                existing = wait_for(settled, current_app.config['IDEMPOTENCY_WAIT_SECONDS'], 0.05)
+                if existing is None or existing == 'released':
+                    response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+                    response.headers['Retry-After'] = '1'
+                    return response, 409
+            return _replay(existing.response_status, existing.response_body, existing.response_type)
+
+        try:
+            response = make_response(fn(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            _finish(scope, key, Response(status=500))
+            raise
+        _finish(scope, key, response)
+        return response
+    return wrapper
@@ -0,0 +1,48 @@
+"""
+Bulk onboarding script.
+Imports a CSV roster of students/alumni as pre-verified users.
+
+Usage: python import_users.py roster.csv [--unverified] [--dry-run] [--chunk-size N]
+
+Required columns: full_name, email, password, college_id, college_email,
+department, user_type. Optional: passing_year, current_company,
+current_position, bio, linkedin_url, github_url (alumni) and
+expected_passing_year, current_year (students).
+"""
+
+import argparse
+from app import create_app
+from bulk_import import CHUNK_SIZE, import_users_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import users from a CSV roster')
+    parser.add_argument('csv_path')
+    parser.add_argument('--unverified', action='store_true', help='Leave imported users pending verification')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and check duplicates without inserting')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        with open(args.csv_path, encoding='utf-8-sig', newline='') as f:
+            report = import_users_csv(
+                f,
+                verified=not args.unverified,
+                chunk_size=args.chunk_size,
+                dry_run=args.dry_run,
+            ).to_dict()
+
+    label = 'would be created' if args.dry_run else 'created'
+    print(f"✅ {report['rows']} rows read, {report['created']} users {label}, "
+          f"{report['failed']} failed in {report['elapsed_seconds']}s "
+          f"({report['rows_per_sec']} rows/sec)")
+    for error in report['errors']:
+        print(f"  row {error['row']}: {error['error']}")
+    if report['errors_truncated']:
+        print(f"  ...and {report['failed'] - len(report['errors'])} more errors")
+
+
+if __name__ == '__main__':
+    main()
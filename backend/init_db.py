@@ -1,10 +1,32 @@
 """
 Database initialization script for production deployment.
 Run this to initialize MySQL database tables and create admin user.
+The app itself never creates tables, so run this (or the deploy's
+pre-start step) whenever models gain new tables. It also creates the
+default college and the tables of colleges with their own database or
+schema (TENANT_DATABASE_URLS / TENANT_SCHEMAS).
 """
 
 from app import create_app
-from models import db, User
+from models import db, User, Tenant, StatsRollup
+from stats import reconcile_stats, record_user_change, user_state
+from tenancy import DIRECTORY_TABLE
+
+def create_schema(app):
+    """Create any missing tables (existing tables are left as they are), the default college and its stats row"""
+    with app.app_context():
+        db.create_all()
+        tenant_tables = [t for t in db.metadata.sorted_tables if t.name != DIRECTORY_TABLE]
+        for key in app.config['SQLALCHEMY_BINDS']:
+            if key.startswith('tenant_'):
+                db.metadata.create_all(db.engines[key], tables=tenant_tables)
+        
+        if db.session.get(Tenant, app.config['DEFAULT_TENANT_ID']) is None:
+            db.session.add(Tenant(id=app.config['DEFAULT_TENANT_ID'], slug='default', name='Default college'))
+            db.session.commit()
+        if StatsRollup.query.first() is None:
+            reconcile_stats()
+
 
 def init_database():
     """Initialize database tables and create admin user"""
@@ -14,7 +36,7 @@ def init_database():
         try:
             # Create all tables
             print("Creating database tables...")
-            db.create_all()
+            create_schema(app)
             print("✅ Database tables created successfully!")
             
             # Check if admin already exists
@@ -38,6 +60,7 @@ def init_database():
             admin.set_password('admin123')
             
             db.session.add(admin)
+            record_user_change(None, user_state(admin))
             db.session.commit()
             
             print("✅ Admin user created successfully!")
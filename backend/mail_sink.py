@@ -0,0 +1,113 @@
+"""
+Local SMTP stand-in for development.
+Accepts mail on a local port without delivering it: each message is printed
+(or just counted with --quiet) and appended to --mbox if given. Point the
+app at it with MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=false.
+--reject ADDRESS refuses that recipient, to exercise the failure paths.
+
+Usage: python mail_sink.py [--port 1025] [--mbox FILE] [--quiet] [--reject ADDRESS ...]
+"""
+
+import argparse
+import mailbox
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+counts = {'connections': 0, 'messages': 0}
+_lock = threading.Lock()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        with _lock:
+            counts['connections'] += 1
+        self.reply('220 mail_sink ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-mail_sink')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 mail_sink')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.partition(':')[2].strip().strip('<>')
+                if address in self.server.rejected:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.receive(recipients)
+                self.reply('250 OK: queued')
+            elif verb in ('RSET', 'NOOP'):
+                recipients = [] if verb == 'RSET' else recipients
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def receive(self, recipients):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if line in (b'.\r\n', b'.\n', b''):
+                break
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        message = message_from_bytes(b''.join(lines), policy=policy.default)
+        with _lock:
+            counts['messages'] += 1
+            if self.server.mbox is not None:
+                self.server.mbox.add(message)
+                self.server.mbox.flush()
+        if not self.server.quiet:
+            print(f"--- {', '.join(recipients)}: {message['Subject']}")
+            print(message.get_body(('plain',)).get_content())
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, mbox=None, quiet=False, rejected=()):
+        super().__init__(address, SMTPHandler)
+        self.mbox = mailbox.mbox(mbox) if mbox else None
+        self.quiet = quiet
+        self.rejected = set(rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accept and print mail locally')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--mbox', help='Also append messages to this mbox file')
+    parser.add_argument('--quiet', action='store_true', help='Only count messages')
+    parser.add_argument('--reject', action='append', default=[], help='Refuse this recipient')
+    args = parser.parse_args()
+
+    server = SMTPSink((args.host, args.port), args.mbox, args.quiet, args.reject)
+    print(f'📬 Listening on {args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{counts['messages']} messages over {counts['connections']} connections")
+
+
+if __name__ == '__main__':
+    main()
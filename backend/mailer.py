@@ -0,0 +1,99 @@
+"""
+Outgoing email.
+
+send_email() only queues a 'send_email' task, so no request ever waits on
+SMTP; with MAIL_SERVER unset it queues nothing. The task worker hands every
+leased email to send_batch(), which opens one SMTP connection (STARTTLS and
+login as configured), sends the whole batch over it and reconnects once if
+the server drops the connection part way. A refused recipient or a 5xx
+reply fails just that message for good; connection errors and 4xx replies
+are retried with the task queue's backoff.
+
+For local testing, run mail_sink.py and point MAIL_SERVER/MAIL_PORT at it
+with MAIL_USE_TLS=false.
+"""
+
+import smtplib
+from email.message import EmailMessage
+from email.utils import make_msgid
+from flask import current_app
+from tasks import task, enqueue, enqueue_many, PermanentError
+
+
+def send_email(to, subject, body):
+    """Queue an email; commits with the caller's transaction"""
+    if not current_app.config['MAIL_SERVER']:
+        return None
+    return enqueue('send_email', {'to': to, 'subject': subject, 'body': body})
+
+
+def send_emails(messages):
+    """Queue many (to, subject, body) emails with one INSERT"""
+    if not current_app.config['MAIL_SERVER']:
+        return
+    enqueue_many('send_email', [{'to': to, 'subject': subject, 'body': body} for to, subject, body in messages])
+
+
+def build_message(payload, sender):
+    message = EmailMessage()
+    message['From'] = sender
+    message['To'] = payload['to']
+    message['Subject'] = payload['subject']
+    message['Message-ID'] = make_msgid()
+    message.set_content(payload['body'])
+    return message
+
+
+def connect(config):
+    smtp = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT'])
+    if config['MAIL_USE_TLS']:
+        smtp.starttls()
+    if config['MAIL_USERNAME']:
+        smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+    return smtp
+
+
+@task('send_email', batch=True)
+def send_batch(payloads):
+    """Send queued emails over one connection; returns one error or None per payload"""
+    config = current_app.config
+    sender = config['MAIL_DEFAULT_SENDER'] or config['MAIL_USERNAME']
+    errors = []
+    smtp = None
+    try:
+        for payload in payloads:
+            message = build_message(payload, sender)
+            for reconnected in (False, True):
+                if smtp is None:
+                    # Connect and login failures are left to the outer handler
+                    smtp = connect(config)
+                try:
+                    smtp.send_message(message)
+                    errors.append(None)
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    # Servers close long-lived connections; retry this message once on a new one
+                    smtp = None
+                    if reconnected:
+                        raise
+                except smtplib.SMTPRecipientsRefused:
+                    errors.append(PermanentError(f"Recipient refused: {payload['to']}"))
+                    break
+                except smtplib.SMTPResponseException as e:
+                    error = f'{e.smtp_code} {e.smtp_error!r}'
+                    errors.append(PermanentError(error) if e.smtp_code >= 500 else RuntimeError(error))
+                    if e.smtp_code == 421:
+                        # Server is closing the connection
+                        smtp.close()
+                        smtp = None
+                    break
+    except (OSError, smtplib.SMTPException) as e:
+        # Server unreachable or rejecting our login: whatever wasn't sent is retried later
+        errors.extend([e] * (len(payloads) - len(errors)))
+    finally:
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                smtp.close()
+    return errors
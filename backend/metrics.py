@@ -0,0 +1,231 @@
+"""
+Request and SQL instrumentation.
+
+before/after_request hooks time every request and engine events time
+every SQL statement, so each route gets a latency histogram, statements
+per request, SQL time and response sizes. Requests busy (not parked in
+a long-poll) for longer than SLOW_REQUEST_MS and statements slower than
+SLOW_QUERY_MS are logged; a SLOW_LOG_SAMPLE_RATE fraction of those log
+entries carry the application stack that issued the slowest statement.
+render_metrics() writes everything, plus the connection pool figures, in
+the Prometheus text format for GET /metrics.
+
+Like the pool metrics, the registry is per worker process.
+"""
+
+import os
+import random
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+import pool_metrics
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}  # (route, method, status) -> count
+            self.latency = {}  # (route, method) -> Histogram
+            self.statements = {}
+            self.sql_seconds = {}
+            self.response_size = {}
+            self.slow_requests = 0
+            self.slow_queries = 0
+
+    def record_request(self, route, method, status, seconds, statements, sql_seconds, size):
+        key = (route, method)
+        with self._lock:
+            status_key = (route, method, status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.statements.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(statements)
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + sql_seconds
+            if size is not None:
+                self.response_size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(size)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+registry = Registry()
+
+
+def _route():
+    rule = request.url_rule
+    # Unmatched paths share one label so scanners can't blow up the series count
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _app_stack():
+    """Stack of the calling code, trimmed to this application's frames"""
+    frames = [f for f in traceback.extract_stack()[:-2]
+              if f.filename.startswith(BACKEND_DIR) and 'site-packages' not in f.filename]
+    return ''.join(traceback.format_list(frames))
+
+
+def _one_line(statement):
+    return ' '.join(statement.split())[:500]
+
+
+def _sampled():
+    return random.random() < current_app.config['SLOW_LOG_SAMPLE_RATE']
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if not has_request_context():
+        return
+    g.sql_statements = g.get('sql_statements', 0) + 1
+    g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+
+    stack = None
+    if elapsed * 1000 >= current_app.config['SLOW_QUERY_MS']:
+        registry.incr('slow_queries')
+        stack = _app_stack() if _sampled() else None
+        current_app.logger.warning('Slow query (%.1f ms) in %s %s: %s%s', elapsed * 1000, request.method,
+                                   _route(), _one_line(statement), f'\n{stack}' if stack else '')
+    if elapsed > g.get('slowest_statement', (0.0, None, None))[0]:
+        g.slowest_statement = (elapsed, statement, stack)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = context.connection
+    if conn is not None and conn.info.get('query_start'):
+        conn.info['query_start'].pop()
+
+
+def register_engine_listeners(engine):
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def start_timer():
+    """before_request hook"""
+    g.request_start = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+
+def record_request(response):
+    """after_request hook; register it first so it runs after the others (e.g. compression)"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = _route()
+    size = None if response.is_streamed else response.calculate_content_length()
+    registry.record_request(route, request.method, response.status_code, elapsed,
+                            g.get('sql_statements', 0), g.get('sql_seconds', 0.0), size)
+
+    # Long-polls spend most of their time parked; only the busy part counts as slow
+    busy = elapsed - g.get('idle_seconds', 0.0)
+    if busy * 1000 >= current_app.config['SLOW_REQUEST_MS']:
+        registry.incr('slow_requests')
+        message = (f"Slow request ({elapsed * 1000:.1f} ms) {request.method} {route}: "
+                   f"{g.get('sql_statements', 0)} statements, {g.get('sql_seconds', 0.0) * 1000:.1f} ms SQL")
+        slowest = g.get('slowest_statement')
+        if slowest:
+            message += f'; slowest ({slowest[0] * 1000:.1f} ms): {_one_line(slowest[1])}'
+            if slowest[2]:
+                message += f'\n{slowest[2]}'
+        current_app.logger.warning(message)
+    return response
+
+
+def init_metrics(app):
+    from models import db
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    with app.app_context():
+        for engine in db.engines.values():
+            register_engine_listeners(engine)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _histogram_lines(name, histograms):
+    lines = []
+    for (route, method), hist in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{_labels(route=route, method=method, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(route=route, method=method)}}} {hist.total}')
+        lines.append(f'{name}_count{{{_labels(route=route, method=method)}}} {cumulative}')
+    return lines
+
+
+def render_metrics(engine):
+    """All metrics of this worker in the Prometheus text exposition format"""
+    out = []
+
+    def metric(name, kind, help_text, lines):
+        out.append(f'# HELP {name} {help_text}')
+        out.append(f'# TYPE {name} {kind}')
+        out.extend(lines)
+
+    with registry._lock:
+        metric('http_requests_total', 'counter', 'Requests by route, method and status',
+               [f'http_requests_total{{{_labels(route=r, method=m, status=s)}}} {n}'
+                for (r, m, s), n in sorted(registry.requests.items())])
+        metric('http_request_duration_seconds', 'histogram', 'Request latency',
+               _histogram_lines('http_request_duration_seconds', registry.latency))
+        metric('http_request_sql_statements', 'histogram', 'SQL statements per request',
+               _histogram_lines('http_request_sql_statements', registry.statements))
+        metric('http_request_sql_seconds_total', 'counter', 'Time spent in SQL by route',
+               [f'http_request_sql_seconds_total{{{_labels(route=r, method=m)}}} {v}'
+                for (r, m), v in sorted(registry.sql_seconds.items())])
+        metric('http_response_size_bytes', 'histogram', 'Response body size (buffered responses)',
+               _histogram_lines('http_response_size_bytes', registry.response_size))
+        metric('http_slow_requests_total', 'counter', 'Requests over SLOW_REQUEST_MS',
+               [f'http_slow_requests_total {registry.slow_requests}'])
+        metric('sql_slow_queries_total', 'counter', 'Statements over SLOW_QUERY_MS',
+               [f'sql_slow_queries_total {registry.slow_queries}'])
+
+    pool = pool_metrics.snapshot(engine)
+    for key in ('size', 'checked_in', 'in_use', 'overflow'):
+        if key in pool:
+            metric(f'db_pool_{key}', 'gauge', f'Connection pool {key.replace("_", " ")}', [f'db_pool_{key} {pool[key]}'])
+    for key in ('connects', 'checkouts', 'invalidations', 'timeouts'):
+        metric(f'db_pool_{key}_total', 'counter', f'Connection pool {key}', [f'db_pool_{key}_total {pool[key]}'])
+    metric('db_pool_checkout_wait_seconds_max', 'gauge', 'Longest checkout wait',
+           [f"db_pool_checkout_wait_seconds_max {pool['checkout_wait_ms']['max'] / 1000}"])
+
+    return '\n'.join(out) + '\n'
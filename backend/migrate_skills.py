@@ -0,0 +1,109 @@
+"""
+Skills migration script.
+Parses the legacy JSON strings in users.skills into the normalized
+skills / user_skills tables, in batches so large user tables don't hold
+one long transaction. Runs for every college. Safe to re-run: existing
+associations are skipped.
+"""
+
+import sys
+from app import create_app
+from models import db, User, Skill, SkillAlias, user_skills
+from skills import DEFAULT_ALIASES, canonical_slugs, get_or_create_skills, parse_skills
+from tenancy import all_tenant_ids, tenant_context
+
+BATCH_SIZE = 500
+
+
+def seed_aliases():
+    """Insert the built-in aliases that aren't stored yet"""
+    existing = {a for (a,) in db.session.query(SkillAlias.alias).all()}
+    missing = {alias: slug for alias, slug in DEFAULT_ALIASES.items() if alias not in existing}
+    if not missing:
+        return 0
+
+    skills = {s.slug: s for s in get_or_create_skills(sorted(set(missing.values())))}
+    for alias, slug in missing.items():
+        db.session.add(SkillAlias(alias=alias, skill_id=skills[slug].id))
+    db.session.commit()
+    return len(missing)
+
+
+def migrate_batch(users):
+    """Link one batch of users to their parsed skills"""
+    parsed = {user.id: parse_skills(user.skills) for user in users}
+    all_names = [name for names in parsed.values() for name in names]
+    if not all_names:
+        return 0
+
+    # Resolve or create every skill in the batch at once
+    slug_map = canonical_slugs(all_names)
+    by_slug = {skill.slug: skill for skill in get_or_create_skills(all_names)}
+
+    user_ids = list(parsed)
+    linked = set(
+        db.session.query(user_skills.c.user_id, user_skills.c.skill_id)
+        .filter(user_skills.c.user_id.in_(user_ids))
+        .all()
+    )
+
+    rows = []
+    for user_id, names in parsed.items():
+        for name in names:
+            skill_id = by_slug[slug_map[name]].id
+            if (user_id, skill_id) not in linked:
+                linked.add((user_id, skill_id))
+                rows.append({'user_id': user_id, 'skill_id': skill_id})
+
+    if rows:
+        db.session.execute(user_skills.insert(), rows)
+    return len(rows)
+
+
+def migrate_tenant(batch_size=BATCH_SIZE):
+    """Migrate the current college's users' legacy skills, keyset-paginated by id"""
+    last_id = 0
+    users_done = 0
+    links_done = 0
+    while True:
+        users = (
+            User.query
+            .filter(User.id > last_id, User.skills.isnot(None), User.skills != '')
+            .order_by(User.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not users:
+            break
+
+        links_done += migrate_batch(users)
+        db.session.commit()
+
+        last_id = users[-1].id
+        users_done += len(users)
+        db.session.expunge_all()
+        print(f"  ...{users_done} users processed (last id {last_id}), {links_done} links created")
+    return users_done, links_done
+
+
+def migrate_skills(batch_size=BATCH_SIZE):
+    """Migrate every college's users; colleges on their own database get their own skills"""
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        for tenant_id in all_tenant_ids():
+            with tenant_context(tenant_id):
+                try:
+                    print(f"Seeded {seed_aliases()} skill aliases for college {tenant_id}")
+                    users_done, links_done = migrate_tenant(batch_size)
+                    print(f"✅ Skills migration complete for college {tenant_id}: {users_done} users, "
+                          f"{Skill.query.count()} skills, {links_done} new links")
+
+                except Exception as e:
+                    print(f"❌ Error migrating skills for college {tenant_id}: {str(e)}")
+                    db.session.rollback()
+
+
+if __name__ == '__main__':
+    migrate_skills(int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE)
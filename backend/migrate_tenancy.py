@@ -0,0 +1,115 @@
+"""
+Tenancy migration script.
+Brings a database created before multi-college support up to date:
+creates the tenants table and the default college, adds tenant_id (set to
+DEFAULT_TENANT_ID, or for token_versions the user's college) to every
+college table and swaps in the indexes that now lead with tenant_id. The stats and analytics rollups and the
+idempotency keys change their keys, so they are recreated empty (the
+default college's stats row is rebuilt on the way); run
+backfill_analytics.py afterwards. Safe to re-run.
+
+Usage: python migrate_tenancy.py
+"""
+
+from sqlalchemy import inspect, text
+from app import create_app
+from models import db
+from init_db import create_schema
+from tenancy import TenantScoped
+
+# Derived or short-lived tables whose primary or unique keys changed
+REBUILT_TABLES = ['stats_rollup', 'analytics_daily_signups', 'analytics_daily_jobs',
+                  'analytics_daily_applications', 'idempotency_keys']
+# Single-column indexes replaced by tenant-led ones
+REPLACED_INDEXES = {'users': ['ix_users_email', 'ix_users_college_email']}
+# Tables keyed by user_id whose rows take their user's college
+USER_OWNED_TABLES = ['token_versions']
+
+
+def scoped_tables():
+    return [mapper.local_table for mapper in db.Model.registry.mappers
+            if issubclass(mapper.class_, TenantScoped)]
+
+
+def rebuild_tables(inspector):
+    for name in REBUILT_TABLES:
+        if inspector.has_table(name):
+            columns = {c['name'] for c in inspector.get_columns(name)}
+            if 'tenant_id' not in columns:
+                db.metadata.tables[name].drop(db.engine)
+                print(f"  dropped {name} (recreated empty)")
+
+
+def add_tenant_columns(inspector, tenant_id):
+    added = []
+    for table in scoped_tables():
+        if not inspector.has_table(table.name):
+            continue
+        columns = {c['name'] for c in inspector.get_columns(table.name)}
+        if 'tenant_id' in columns:
+            continue
+        db.session.execute(text(
+            f'ALTER TABLE {table.name} ADD COLUMN tenant_id INTEGER NOT NULL DEFAULT {int(tenant_id)}'
+        ))
+        added.append(table.name)
+        print(f"  added {table.name}.tenant_id")
+    db.session.commit()
+    return added
+
+
+def assign_user_tenants(added):
+    """Give rows keyed by a user that user's college (rows of deleted users keep the default)"""
+    for name in USER_OWNED_TABLES:
+        if name not in added:
+            continue
+        db.session.execute(text(
+            f'UPDATE {name} SET tenant_id = (SELECT users.tenant_id FROM users WHERE users.id = {name}.user_id) '
+            f'WHERE user_id IN (SELECT id FROM users)'
+        ))
+    db.session.commit()
+
+
+def swap_indexes(inspector):
+    # One connection throughout, so each statement sees the previous one's changes
+    connection = db.session.connection()
+    for table in scoped_tables():
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix['name']: ix['column_names'] for ix in inspector.get_indexes(table.name)}
+        for name in REPLACED_INDEXES.get(table.name, []):
+            if name in existing:
+                connection.execute(text(f'DROP INDEX {name}' if db.engine.dialect.name == 'sqlite'
+                                        else f'DROP INDEX {name} ON {table.name}'))
+                print(f"  dropped index {name}")
+        for index in table.indexes:
+            columns = [c.name for c in index.columns]
+            if existing.get(index.name) == columns:
+                continue
+            if index.name in existing:
+                index.drop(connection)
+            index.create(connection)
+            print(f"  created index {index.name} ({', '.join(columns)})")
+    db.session.commit()
+
+
+def main():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            print("Migrating to multi-college tables...")
+            rebuild_tables(inspect(db.engine))
+            added = add_tenant_columns(inspect(db.engine), app.config['DEFAULT_TENANT_ID'])
+            assign_user_tenants(added)
+            # After the columns exist, since it counts the default college's users
+            create_schema(app)
+            swap_indexes(inspect(db.engine))
+            print(f"✅ Existing rows belong to college {app.config['DEFAULT_TENANT_ID']}. "
+                  "Run backfill_analytics.py to rebuild the analytics rollups.")
+        except Exception as e:
+            print(f"❌ Error migrating: {str(e)}")
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,54 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password, needs_rehash
+from replicas import RoutingSession
+from tenancy import TenantScoped, current_tenant_id
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
-class User(db.Model):
+# Association between users and the normalized skills taxonomy
+user_skills = db.Table(
+    'user_skills',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True),
+    db.Index('ix_user_skills_skill_user', 'skill_id', 'user_id'),
+)
+
+
+class Tenant(db.Model):
+    __tablename__ = 'tenants'
+    
+    # One row per college; always on the primary database
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(50), unique=True, nullable=False)  # X-Tenant header value
+    name = db.Column(db.String(200), nullable=False)
+    domain = db.Column(db.String(255), unique=True)  # Host that selects this college, if any
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'slug': self.slug,
+            'name': self.name,
+            'domain': self.domain,
+            'is_active': self.is_active,
+        }
+
+
+class User(TenantScoped, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Emails are unique per college; one person may be alumni of several
+        db.Index('ix_users_tenant_email', 'tenant_id', 'email', unique=True),
+        db.Index('ix_users_tenant_college_email', 'tenant_id', 'college_email'),
+        # Verification queue: pending users in arrival order
+        db.Index('ix_users_verification_queue', 'tenant_id', 'is_verified', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    email = db.Column(db.String(120), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     college_id = db.Column(db.String(50), nullable=False)
     college_email = db.Column(db.String(120), nullable=False)
@@ -17,6 +56,7 @@ class User(db.Model):
     user_type = db.Column(db.Enum('student', 'alumni'), nullable=False)
     is_verified = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
+    deleted_at = db.Column(db.DateTime)  # Set when deletion is requested; rows removed by deletion_worker.py
     
     # For alumni
     passing_year = db.Column(db.Integer)
@@ -32,7 +72,7 @@ class User(db.Model):
     
     # Common fields
     profile_picture = db.Column(db.String(255))
-    skills = db.Column(db.Text)  # JSON string
+    skills = db.Column(db.Text)  # JSON string, denormalized copy of skill_set
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -41,12 +81,16 @@ class User(db.Model):
     applications = db.relationship('Application', backref='student', lazy=True)
     messages_sent = db.relationship('Message', backref='sender', lazy=True, foreign_keys='Message.sender_id')
     messages_received = db.relationship('Message', backref='receiver', lazy=True, foreign_keys='Message.receiver_id')
+    skill_set = db.relationship('Skill', secondary=user_skills, lazy=True, backref='users')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
     
     def to_dict(self, include_sensitive=False):
         data = {
@@ -82,11 +126,251 @@ class User(db.Model):
         return data
 
 
-class Job(db.Model):
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Display name
+    slug = db.Column(db.String(100), unique=True, nullable=False, index=True)  # Canonical key
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    aliases = db.relationship('SkillAlias', backref='skill', lazy=True, cascade='all, delete-orphan')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'slug': self.slug,
+        }
+
+
+class SkillAlias(db.Model):
+    __tablename__ = 'skill_aliases'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(100), unique=True, nullable=False, index=True)  # Normalized alias key
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False, index=True)
+
+
+class TokenVersion(TenantScoped, db.Model):
+    __tablename__ = 'token_versions'
+    
+    # Only users whose tokens have been revoked get a row; no FK so the
+    # revocation outlives the user row itself. tenant_id is the user's college
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class VerificationClaim(TenantScoped, db.Model):
+    __tablename__ = 'verification_claims'
+    
+    # One row per pending user an admin is currently reviewing
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    admin_id = db.Column(db.Integer, nullable=False, index=True)
+    claimed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class DeletionJob(TenantScoped, db.Model):
+    __tablename__ = 'deletion_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, unique=True)  # No FK: outlives the user row
+    requested_by = db.Column(db.Integer)
+    status = db.Column(db.Enum('pending', 'running', 'done', 'failed'), default='pending', nullable=False, index=True)
+    stage = db.Column(db.String(50))  # Dependent table currently being cleared
+    rows_deleted = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    locked_by = db.Column(db.String(100))
+    locked_until = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'requested_by': self.requested_by,
+            'status': self.status,
+            'stage': self.stage,
+            'rows_deleted': self.rows_deleted,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class Task(TenantScoped, db.Model):
+    __tablename__ = 'tasks'
+    __table_args__ = (
+        # Workers look for runnable tasks in due order
+        db.Index('ix_tasks_runnable', 'status', 'run_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.Enum('pending', 'running', 'done', 'failed'), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Not before; pushed back on retry
+    last_error = db.Column(db.Text)
+    locked_by = db.Column(db.String(100))
+    locked_until = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class IdempotencyKey(TenantScoped, db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', 'scope', 'key', name='uq_idempotency_keys_tenant_scope_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(64), nullable=False)  # 'user:<id>', or 'ip:<address>' before login
+    key = db.Column(db.String(255), nullable=False)  # Client's Idempotency-Key header
+    request_hash = db.Column(db.String(64), nullable=False)  # Method, path and body of the first request
+    status = db.Column(db.Enum('in_progress', 'done'), nullable=False, default='in_progress')
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.LargeBinary)
+    response_type = db.Column(db.String(100))
+    locked_until = db.Column(db.DateTime)  # A crashed first attempt stops blocking retries after this
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class FeedEvent(TenantScoped, db.Model):
+    __tablename__ = 'feed_events'
+    __table_args__ = (
+        # Fan-out-on-read events, newest first per audience
+        db.Index('ix_feed_events_audience', 'tenant_id', 'fanout', 'audience_type', 'audience_department', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)  # Also the feed's sort key and cursor
+    kind = db.Column(db.String(50), nullable=False)  # job_posted, application_received, application_status
+    actor_id = db.Column(db.Integer)
+    job_id = db.Column(db.Integer)
+    application_id = db.Column(db.Integer)
+    payload = db.Column(db.Text)  # JSON snapshot (job title, company, status...)
+    # 'write': copied into feed_items per recipient; 'read': merged into the
+    # feeds of matching users when they read
+    fanout = db.Column(db.Enum('write', 'read'), nullable=False, default='write')
+    audience_type = db.Column(db.String(20))
+    audience_department = db.Column(db.String(100))
+    fanout_cursor = db.Column(db.Integer)  # Last user id copied to, so an interrupted fan-out resumes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class FeedItem(TenantScoped, db.Model):
+    __tablename__ = 'feed_items'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='uq_feed_items_user_event'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)  # No FK: removed by the deletion worker
+    event_id = db.Column(db.Integer, db.ForeignKey('feed_events.id'), nullable=False)
+
+
+class FeedCursor(TenantScoped, db.Model):
+    __tablename__ = 'feed_cursors'
+    
+    # Unread marker: events above last_read_id are unread
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_read_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StatsRollup(TenantScoped, db.Model):
+    __tablename__ = 'stats_rollup'
+    
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', name='uq_stats_rollup_tenant'),
+    )
+    
+    # One row per college of user counters, kept current by deltas from the
+    # user lifecycle routes and rebuilt by reconcile_stats.py
+    id = db.Column(db.Integer, primary_key=True)
+    total_users = db.Column(db.Integer, nullable=False, default=0)
+    verified_users = db.Column(db.Integer, nullable=False, default=0)
+    pending_users = db.Column(db.Integer, nullable=False, default=0)
+    active_users = db.Column(db.Integer, nullable=False, default=0)
+    total_students = db.Column(db.Integer, nullable=False, default=0)
+    total_alumni = db.Column(db.Integer, nullable=False, default=0)
+    verified_students = db.Column(db.Integer, nullable=False, default=0)
+    verified_alumni = db.Column(db.Integer, nullable=False, default=0)
+    active_students = db.Column(db.Integer, nullable=False, default=0)
+    active_alumni = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime)
+
+
+class ReplicaHeartbeat(db.Model):
+    __tablename__ = 'replica_heartbeat'
+    
+    # Single row (id=1) bumped on the primary; its age on a replica is the replica's lag
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    beat_at = db.Column(db.DateTime, nullable=False)
+
+
+class DailySignups(TenantScoped, db.Model):
+    __tablename__ = 'analytics_daily_signups'
+    
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=current_tenant_id)
+    day = db.Column(db.Date, primary_key=True)
+    user_type = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyJobPostings(TenantScoped, db.Model):
+    __tablename__ = 'analytics_daily_jobs'
+    
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=current_tenant_id)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyApplicationEvents(TenantScoped, db.Model):
+    __tablename__ = 'analytics_daily_applications'
+    __table_args__ = (
+        db.Index('ix_analytics_daily_applications_job_day', 'job_id', 'day'),
+    )
+    
+    # Applications entering each funnel step per job per day ('applied' = submitted)
+    tenant_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=current_tenant_id)
+    day = db.Column(db.Date, primary_key=True)
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job(TenantScoped, db.Model):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Job board: a college's active jobs, newest first
+        db.Index('ix_jobs_tenant_active_created', 'tenant_id', 'is_active', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    alumni_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    alumni_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(100), nullable=False)
     location = db.Column(db.String(100))
@@ -121,12 +405,12 @@ class Job(db.Model):
         }
 
 
-class Application(db.Model):
+class Application(TenantScoped, db.Model):
     __tablename__ = 'applications'
     
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
-    student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False, index=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     cover_letter = db.Column(db.Text)
     resume_path = db.Column(db.String(255))
     status = db.Column(db.Enum('pending', 'reviewed', 'shortlisted', 'rejected', 'accepted'), default='pending')
@@ -148,12 +432,12 @@ class Application(db.Model):
         }
 
 
-class Message(db.Model):
+class Message(TenantScoped, db.Model):
     __tablename__ = 'messages'
     
     id = db.Column(db.Integer, primary_key=True)
-    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    receiver_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    receiver_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     content = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -171,7 +455,7 @@ class Message(db.Model):
         }
 
 
-class Conversation(db.Model):
+class Conversation(TenantScoped, db.Model):
     __tablename__ = 'conversations'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,86 @@
+"""
+Email notifications for application status changes, verification and new
+messages. Each helper queues its email in the caller's transaction (see
+mailer.py), so the request only pays for an INSERT.
+
+New-message emails are delayed by MESSAGE_EMAIL_DELAY seconds and sent only
+if the message is still unread and is the oldest unread message from that
+sender, so a burst of messages produces one email and a conversation the
+user is following in the app produces none.
+"""
+
+from flask import current_app
+from models import db, User, Message
+from mailer import send_email, send_emails
+from tasks import task, enqueue
+
+
+def notify_application_status(application):
+    student = application.student
+    job = application.job
+    if not student or not job:
+        return
+    send_email(
+        student.email,
+        f'Your application for {job.title} is now {application.status}',
+        f'Hi {student.full_name},\n\n'
+        f'The status of your application for {job.title} at {job.company} '
+        f'changed to "{application.status}".\n',
+    )
+
+
+def _verified_email(email, full_name):
+    return (
+        email,
+        'Your AlumniConnect account is verified',
+        f'Hi {full_name},\n\nAn administrator verified your account. You can now sign in.\n',
+    )
+
+
+def notify_user_verified(user):
+    send_email(*_verified_email(user.email, user.full_name))
+
+
+def notify_users_verified(user_ids):
+    """Queue verification emails for many users with one SELECT and one INSERT"""
+    if not user_ids or not current_app.config['MAIL_SERVER']:
+        return
+    rows = db.session.query(User.email, User.full_name).filter(User.id.in_(user_ids)).all()
+    send_emails(_verified_email(*row) for row in rows)
+
+
+def notify_new_message(message):
+    """Schedule the unread-message check; the message must have been flushed"""
+    if not current_app.config['MAIL_SERVER']:
+        return
+    enqueue('message_email', {'message_id': message.id}, delay=current_app.config['MESSAGE_EMAIL_DELAY'])
+
+
+@task('message_email')
+def send_message_email(payload):
+    message = db.session.get(Message, payload['message_id'])
+    if message is None or message.is_read:
+        return
+    earlier_unread = db.session.query(Message.id).filter(
+        Message.sender_id == message.sender_id,
+        Message.receiver_id == message.receiver_id,
+        Message.is_read.is_(False),
+        Message.id < message.id
+    ).first()
+    if earlier_unread:
+        # The email for the oldest unread message already covers this one
+        return
+    unread = Message.query.filter_by(
+        sender_id=message.sender_id,
+        receiver_id=message.receiver_id,
+        is_read=False
+    ).count()
+    sender, receiver = message.sender, message.receiver
+    if not sender or not receiver:
+        return
+    send_email(
+        receiver.email,
+        f'New message from {sender.full_name}',
+        f'Hi {receiver.full_name},\n\n'
+        f'You have {unread} unread message{"s" if unread != 1 else ""} from {sender.full_name}.\n',
+    )
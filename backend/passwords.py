@@ -0,0 +1,179 @@
+"""
+Password hashing off the request worker.
+
+Werkzeug's KDFs are deliberately slow, so hashing and verification run in a
+bounded process pool instead of the gunicorn worker's own interpreter. The
+pool is created lazily per worker process (after gunicorn forks) and sized by
+PASSWORD_HASH_WORKERS; 0 hashes inline (on a native thread under gevent),
+which is what tests and one-off scripts want. Hash cost comes from
+PASSWORD_HASH_METHOD and PASSWORD_SALT_LENGTH, and needs_rehash() tells
+login when a stored hash was made with older parameters. When the pool stays
+saturated for PASSWORD_HASH_TIMEOUT seconds, HashingBusy is raised and views
+answer with busy_response(), a 503 the client can retry.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app, has_app_context, jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+from serving import offload
+
+DEFAULTS = {
+    'PASSWORD_HASH_METHOD': 'scrypt:32768:8:1',
+    'PASSWORD_SALT_LENGTH': 16,
+    'PASSWORD_HASH_WORKERS': 0,
+    'PASSWORD_HASH_QUEUE_SIZE': 32,
+    'PASSWORD_HASH_TIMEOUT': 10,
+}
+
+BUSY_RETRY_AFTER = 2  # seconds suggested to clients turned away by a full pool
+BULK_HASH_BATCH = 8  # passwords per pool task in hash_passwords()
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_slots = None
+
+
+class HashingBusy(Exception):
+    """No hashing slot or result within PASSWORD_HASH_TIMEOUT seconds"""
+
+
+def busy_response():
+    """503 with Retry-After for a request turned away by HashingBusy"""
+    response = jsonify({'error': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = str(BUSY_RETRY_AFTER)
+    return response, 503
+
+
+def _setting(name):
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+
+def _get_pool():
+    """Return this process's executor, creating it after a fork if needed"""
+    global _pool, _pool_pid, _slots
+
+    workers = int(_setting('PASSWORD_HASH_WORKERS'))
+    if workers <= 0:
+        return None, None
+
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = os.getpid()
+            # Bound queued work so a login burst can't pile up unbounded futures
+            _slots = threading.BoundedSemaphore(workers + int(_setting('PASSWORD_HASH_QUEUE_SIZE')))
+        return _pool, _slots
+
+
+def _reset_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_pool():
+    """Stop the worker pool, e.g. at interpreter exit or in benchmarks"""
+    _reset_pool()
+
+
+def _run(fn, *args):
+    """Run fn in the pool, falling back to inline if the pool is unusable"""
+    pool, slots = _get_pool()
+    if pool is None:
+        return offload(fn, *args)
+
+    timeout = float(_setting('PASSWORD_HASH_TIMEOUT'))
+    if not slots.acquire(timeout=timeout):
+        raise HashingBusy('Password hashing queue is full')
+    try:
+        return pool.submit(fn, *args).result(timeout=timeout)
+    except FutureTimeout:
+        raise HashingBusy('Password hashing timed out')
+    except BrokenProcessPool:
+        _reset_pool()
+        return offload(fn, *args)
+    finally:
+        slots.release()
+
+
+def hash_password(password):
+    """Hash a password with the configured method and salt length"""
+    return _run(
+        generate_password_hash,
+        password,
+        _setting('PASSWORD_HASH_METHOD'),
+        int(_setting('PASSWORD_SALT_LENGTH')),
+    )
+
+
+def _hash_each(passwords, method, salt_length):
+    return [generate_password_hash(p, method, salt_length) for p in passwords]
+
+
+def hash_passwords(passwords):
+    """Hash many passwords at once, spread across the pool's workers
+
+    Work goes in BULK_HASH_BATCH passwords at a time, each batch holding a
+    queue slot, and at most one batch per worker is outstanding; logins
+    queue behind a batch, not behind the whole list. Raises HashingBusy like
+    hash_password() when no slot or result comes within PASSWORD_HASH_TIMEOUT.
+    """
+    passwords = list(passwords)
+    method = _setting('PASSWORD_HASH_METHOD')
+    salt_length = int(_setting('PASSWORD_SALT_LENGTH'))
+
+    pool, slots = _get_pool()
+    if pool is None or len(passwords) < 2:
+        return offload(_hash_each, passwords, method, salt_length)
+
+    workers = max(1, int(_setting('PASSWORD_HASH_WORKERS')))
+    timeout = float(_setting('PASSWORD_HASH_TIMEOUT'))
+    hashes = []
+    pending = deque()
+    try:
+        for start in range(0, len(passwords), BULK_HASH_BATCH):
+            if len(pending) >= workers:
+                hashes.extend(pending.popleft().result(timeout=timeout))
+            if not slots.acquire(timeout=timeout):
+                raise HashingBusy('Password hashing queue is full')
+            future = pool.submit(_hash_each, passwords[start:start + BULK_HASH_BATCH], method, salt_length)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append(future)
+        while pending:
+            hashes.extend(pending.popleft().result(timeout=timeout))
+        return hashes
+    except FutureTimeout:
+        raise HashingBusy('Password hashing timed out')
+    except BrokenProcessPool:
+        _reset_pool()
+        return offload(_hash_each, passwords, method, salt_length)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash"""
+    if not password_hash:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with different cost parameters"""
+    if not password_hash or password_hash.count('$') < 2:
+        return True
+    method, salt, _ = password_hash.split('$', 2)
+    return (
+        method != _setting('PASSWORD_HASH_METHOD')
+        or len(salt) != int(_setting('PASSWORD_SALT_LENGTH'))
+    )
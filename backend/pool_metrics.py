@@ -0,0 +1,131 @@
+"""
+Connection pool instrumentation.
+
+MySQL and PostgreSQL engines are built on TimedQueuePool, which times how
+long each checkout waits for a connection (SQLite keeps SQLAlchemy's own
+pool), and pool events count connects, checkouts, invalidations (including
+connections dropped by pre-ping) and checkout timeouts. Counters are per worker process; snapshot() adds the live pool
+size, in-use and overflow figures.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+RECENT_WAITS = 1000
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.recent_waits = deque(maxlen=RECENT_WAITS)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.recent_waits.append(seconds)
+
+    def as_dict(self):
+        with self._lock:
+            waits = sorted(self.recent_waits)
+            checkouts = self.checkouts
+
+            def percentile(p):
+                if not waits:
+                    return 0.0
+                return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 3)
+
+            return {
+                'connects': self.connects,
+                'checkouts': checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'checkout_wait_ms': {
+                    'avg': round(self.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                    'max': round(self.wait_max * 1000, 3),
+                    'p50': percentile(0.50),
+                    'p95': percentile(0.95),
+                    'p99': percentile(0.99),
+                },
+            }
+
+
+stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            stats.incr('timeouts')
+            raise
+        finally:
+            stats.record_wait(time.perf_counter() - start)
+
+
+def _in_memory(url):
+    url = make_url(url)
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def engine_options(options, url):
+    """Engine options with the instrumented pool class filled in where a QueuePool is used"""
+    options = dict(options)
+    if not url.startswith('sqlite'):
+        options.setdefault('poolclass', TimedQueuePool)
+    elif _in_memory(url):
+        # Keep Flask-SQLAlchemy's single shared connection: a pooled one would open a new, empty database
+        for name in QUEUE_POOL_OPTIONS:
+            options.pop(name, None)
+    return options
+
+
+def register_pool_listeners(engine):
+    pool = engine.pool
+    event.listen(pool, 'connect', lambda *args: stats.incr('connects'))
+    event.listen(pool, 'checkout', lambda *args: stats.incr('checkouts'))
+    event.listen(pool, 'checkin', lambda *args: stats.incr('checkins'))
+    event.listen(pool, 'invalidate', lambda *args: stats.incr('invalidations'))
+
+
+def snapshot(engine):
+    pool = engine.pool
+    data = {'pid': os.getpid(), 'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'in_use': pool.checkedout(),
+            # overflow() is negative until the base pool_size is reached
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    data.update(stats.as_dict())
+    return data
@@ -0,0 +1,184 @@
+"""
+Token-bucket rate limiting.
+
+Each limit is a bucket of `burst` tokens refilled at `rate` tokens per
+second, keyed by client IP, login email or user id. Buckets live in a
+pluggable backend chosen by RATELIMIT_BACKEND:
+
+- 'memory': per-process dict; limits are per gunicorn worker
+- 'sqlite': a small SQLite file (RATELIMIT_STORAGE_PATH) shared by every
+  worker on the host, updated under BEGIN IMMEDIATE so takes are atomic
+
+Rejections are answered before the view runs, so a flood costs a bucket
+lookup instead of a password hash.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from tenancy import current_tenant_id
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(value):
+    """Parse '5/minute' or '100/hour;20' (limit;burst) into (rate_per_sec, burst)"""
+    value, _, burst = value.partition(';')
+    count, _, period = value.strip().partition('/')
+    count = float(count)
+    seconds = PERIODS[period.strip().rstrip('s') or 'second']
+    return count / seconds, float(burst) if burst else count
+
+
+class MemoryBackend:
+    """Buckets in this process only"""
+
+    def __init__(self, max_keys=100000):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._max_keys = max_keys
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                self._prune(now)
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+    def _prune(self, now):
+        # Drop the oldest half; buckets idle that long are refilled anyway
+        oldest = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _ in oldest[:len(oldest) // 2]:
+            del self._buckets[key]
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by all workers on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+    def reset(self):
+        self._connect().execute('DELETE FROM buckets')
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the configured backend, created once per process"""
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = current_app.config['RATELIMIT_BACKEND']
+                if kind == 'sqlite':
+                    path = current_app.config['RATELIMIT_STORAGE_PATH'] or os.path.join(
+                        tempfile.gettempdir(), 'alumniconnect-ratelimit.db')
+                    _backend = SQLiteBackend(path)
+                else:
+                    _backend = MemoryBackend()
+    return _backend
+
+
+def client_ip():
+    if current_app.config['RATELIMIT_TRUST_PROXY']:
+        forwarded = request.headers.get('X-Forwarded-For')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+
+def _key_value(key):
+    if key == 'ip':
+        return client_ip()
+    if key == 'email':
+        data = request.get_json(silent=True) or {}
+        email = data.get('email')
+        # Emails and user ids are only unique within a college
+        return f'{current_tenant_id()}:{str(email).strip().lower()}' if email else None
+    if key == 'user':
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+        return f'{current_tenant_id()}:{user_id}' if user_id is not None else None
+    raise ValueError(f'Unknown rate limit key: {key}')
+
+
+def rate_limit(name, key='ip'):
+    """Limit a view with the RATELIMIT_<NAME> setting, bucketed by ip, email or user"""
+    setting = f'RATELIMIT_{name.upper()}'
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            limit = config.get(setting)
+            if not config['RATELIMIT_ENABLED'] or not limit:
+                return fn(*args, **kwargs)
+
+            value = _key_value(key)
+            if value is None:
+                return fn(*args, **kwargs)
+
+            rate, burst = parse_limit(limit)
+            allowed, retry_after = get_backend().take(f'{name}:{key}:{value}', rate, burst)
+            if not allowed:
+                response = jsonify({'error': 'Too many requests, please try again later'})
+                response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                return response, 429
+
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
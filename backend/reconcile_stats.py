@@ -0,0 +1,46 @@
+"""
+Statistics reconciliation job.
+Rebuilds each college's stats_rollup row from the users table to fix any
+drift in the delta-maintained counters. Run it from cron, or pass
+--interval to keep it running as a worker process.
+
+Usage: python reconcile_stats.py [--interval SECONDS] [--tenant ID]
+"""
+
+import argparse
+import time
+from app import create_app
+from models import db
+from stats import reconcile_stats
+from tenancy import all_tenant_ids, tenant_context
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcile the admin statistics rollup')
+    parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+    parser.add_argument('--tenant', type=int, help='Only this college (default: all)')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    while True:
+        with app.app_context():
+            for tenant_id in [args.tenant] if args.tenant else all_tenant_ids():
+                with tenant_context(tenant_id):
+                    try:
+                        drift = reconcile_stats()
+                        if drift:
+                            print(f"⚠️  Fixed stats drift for college {tenant_id}: {drift}")
+                        else:
+                            print(f"✅ Stats rollup for college {tenant_id} is consistent")
+                    except Exception as e:
+                        print(f"❌ Error reconciling stats for college {tenant_id}: {str(e)}")
+                        db.session.rollback()
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
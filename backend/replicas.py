@@ -0,0 +1,195 @@
+"""
+Read-replica routing.
+
+Handlers decorated with @read_only send their plain SELECTs to a replica
+listed in DATABASE_REPLICA_URLS; everything else, and anything a read-only
+handler writes, stays on the primary. Once a session has flushed or run a
+write it keeps reading from the primary for the rest of the request.
+
+Lag is measured with the replica_heartbeat row: the primary's beat_at is
+refreshed at most every REPLICA_LAG_CHECK_INTERVAL seconds and compared to
+the copy on each replica. A replica further behind than
+REPLICA_MAX_LAG_SECONDS (or unreachable) is skipped; with none left, reads
+go to the primary.
+
+Read-your-writes: after a successful write the user is pinned to the
+primary for REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_INTERVAL, which is
+as long as any usable replica can be behind. The pin is kept in the worker
+that served the write and returned in the X-Read-Primary-Until header, which
+clients echo so the other workers honour it too. A read-only handler
+reached by POST (such as /api/batch) pins no one.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, has_app_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+from tenancy import tenant_bind_key, routes_to_tenant
+
+PIN_HEADER = 'X-Read-Primary-Until'
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+_lock = threading.Lock()
+_pins = {}  # user_id -> epoch seconds until which reads use the primary
+_lag = {}  # bind key -> (checked_at, lag seconds or None if unreachable)
+
+
+def replica_binds(urls, engine_options):
+    """SQLALCHEMY_BINDS entries for the replica URLs, sharing the primary's pool settings"""
+    binds = {}
+    for i, url in enumerate(urls):
+        # Plain QueuePool so replica checkouts stay out of the primary's pool metrics
+        options = {k: v for k, v in engine_options.items() if k != 'poolclass'}
+        if url.startswith('sqlite'):
+            options.pop('connect_args', None)
+        binds[f'replica_{i}'] = {'url': url, **options}
+    return binds
+
+
+def replica_keys():
+    return [key for key in current_app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_')]
+
+
+def _pin_seconds():
+    config = current_app.config
+    return config['REPLICA_MAX_LAG_SECONDS'] + config['REPLICA_LAG_CHECK_INTERVAL']
+
+
+def _heartbeat(connection):
+    from models import ReplicaHeartbeat
+    return connection.execute(
+        ReplicaHeartbeat.__table__.select().with_only_columns(ReplicaHeartbeat.beat_at)
+        .where(ReplicaHeartbeat.id == 1)
+    ).scalar()
+
+
+def _beat_primary(engines, now):
+    """Read the primary heartbeat, advancing it if it is older than the check interval"""
+    from models import ReplicaHeartbeat
+    table = ReplicaHeartbeat.__table__
+    interval = current_app.config['REPLICA_LAG_CHECK_INTERVAL']
+    with engines[None].begin() as connection:
+        beat = _heartbeat(connection)
+        if beat is None:
+            connection.execute(table.insert().values(id=1, beat_at=now))
+            return now
+        if now - beat > timedelta(seconds=interval):
+            connection.execute(table.update().where(table.c.id == 1).values(beat_at=now))
+            return now
+        return beat
+
+
+def _refresh_lag(keys):
+    from models import db
+    engines = db.engines
+    now = datetime.utcnow()
+    primary_beat = _beat_primary(engines, now)
+    for key in keys:
+        try:
+            with engines[key].connect() as connection:
+                beat = _heartbeat(connection)
+            lag = None if beat is None else max((primary_beat - beat).total_seconds(), 0.0)
+        except Exception:
+            lag = None
+        _lag[key] = (time.monotonic(), lag)
+
+
+def replica_lag():
+    """Current lag per replica in seconds (None = unreachable), refreshed at most every check interval"""
+    keys = replica_keys()
+    interval = current_app.config['REPLICA_LAG_CHECK_INTERVAL']
+    with _lock:
+        stale = [k for k in keys if k not in _lag or time.monotonic() - _lag[k][0] >= interval]
+        if stale:
+            try:
+                _refresh_lag(stale)
+            except Exception:
+                # Primary heartbeat unavailable: treat every replica as unusable for now
+                for key in stale:
+                    _lag[key] = (time.monotonic(), None)
+        return {key: _lag[key][1] for key in keys}
+
+
+def choose_replica():
+    max_lag = current_app.config['REPLICA_MAX_LAG_SECONDS']
+    healthy = [key for key, lag in replica_lag().items() if lag is not None and lag <= max_lag]
+    return random.choice(healthy) if healthy else None
+
+
+def _current_user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No JWT was verified for this request
+        return None
+
+
+def _pinned(user_id):
+    now = time.time()
+    try:
+        header_until = float(request.headers.get(PIN_HEADER, 0))
+    except ValueError:
+        header_until = 0
+    # Clamp client-supplied pins to one window from now
+    if min(header_until, now + _pin_seconds()) > now:
+        return True
+    if user_id is None:
+        return False
+    with _lock:
+        return _pins.get(user_id, 0) > now
+
+
+def read_only(fn):
+    """Route this handler's reads to a replica (place below the auth decorators)"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        if replica_keys() and not _pinned(_current_user_id()):
+            g.replica_bind = choose_replica()
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def remember_write(response):
+    """after_request hook: pin users who just wrote to the primary"""
+    if request.method not in WRITE_METHODS or response.status_code >= 400 or g.get('read_only'):
+        return response
+    if not replica_keys():
+        return response
+    until = time.time() + _pin_seconds()
+    user_id = _current_user_id()
+    if user_id is not None:
+        with _lock:
+            _pins[user_id] = until
+            # Forget expired pins so the dict stays small
+            if len(_pins) > 10000:
+                now = time.time()
+                for key in [k for k, v in _pins.items() if v <= now]:
+                    del _pins[key]
+    response.headers[PIN_HEADER] = f'{until:.3f}'
+    return response
+
+
+class RoutingSession(Session):
+    """Session that sends a college with its own database there, and plain SELECTs to the request's replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            tenant_bind = tenant_bind_key()
+            if tenant_bind and routes_to_tenant(mapper, clause):
+                # Replicas copy the primary, so they never serve these tenants
+                return self._db.engines[tenant_bind]
+            replica = g.get('replica_bind')
+            if replica and not self.info.get('wrote'):
+                if (isinstance(clause, Select) and clause._for_update_arg is None
+                        and not self._flushing and not (self.new or self.dirty or self.deleted)):
+                    return self._db.engines[replica]
+                if clause is not None or self._flushing:
+                    # A write: read from the primary for the rest of the transaction
+                    self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
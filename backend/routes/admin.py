@@ -1,48 +1,155 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User
-from functools import wraps
+import io
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity
+from models import db, User, Job, Application, Message, DeletionJob, Task
+from bulk_import import import_users_csv
+from passwords import HashingBusy, busy_response
+from exports import EXPORTS, build_export_query, stream_export
+from verification_queue import MAX_PAGE_SIZE, claim_next, get_page, pending_query, release_claims
+from authz import role_required, is_admin_email, bump_token_version, bump_token_versions
+from deletion import request_user_deletion, request_users_deletion
+from pool_metrics import snapshot as pool_snapshot
+from replicas import read_only
+from routes.batch import not_batchable
+from serializers import serialize, USER
+from notifications import notify_user_verified, notify_users_verified
+from stats import get_stats, reconcile_stats, record_user_change, record_user_changes, user_state
 
 admin_bp = Blueprint('admin', __name__)
 
-# Admin user IDs - in production, this should be in database or config
-ADMIN_EMAILS = ['admin@college.edu']  # Add admin emails here
+ADMIN_STATS = ['total_users', 'verified_users', 'pending_users', 'active_users',
+               'total_students', 'total_alumni', 'verified_students', 'verified_alumni']
+
 
 def admin_required(fn):
-    """Decorator to check if user is admin"""
-    @wraps(fn)
-    @jwt_required()
-    def wrapper(*args, **kwargs):
-        current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
-        
-        if not user or user.email not in ADMIN_EMAILS:
-            return jsonify({'error': 'Admin access required'}), 403
-        
-        return fn(*args, **kwargs)
-    return wrapper
+    """Decorator to check if user is admin (from token claims, no user query)"""
+    return role_required(admin=True, message='Admin access required')(fn)
+
+
+def get_live_user(user_id):
+    """Load a user unless it is pending deletion"""
+    user = db.session.get(User, user_id)
+    return user if user and user.deleted_at is None else None
+
+
+def _as_bool(value):
+    return value if isinstance(value, bool) else str(value).lower() == 'true'
+
+
+def filter_users(query, filters):
+    """Apply the admin user filters (user_type, is_verified, is_active, search)"""
+    user_type = filters.get('user_type')
+    is_verified = filters.get('is_verified')
+    is_active = filters.get('is_active')
+    search = filters.get('search')
+    
+    query = query.filter(User.deleted_at.is_(None))
+    if user_type:
+        query = query.filter_by(user_type=user_type)
+    if is_verified is not None:
+        query = query.filter_by(is_verified=_as_bool(is_verified))
+    if is_active is not None:
+        query = query.filter_by(is_active=_as_bool(is_active))
+    if search:
+        query = query.filter(
+            db.or_(
+                User.full_name.ilike(f'%{search}%'),
+                User.email.ilike(f'%{search}%'),
+                User.college_id.ilike(f'%{search}%')
+            )
+        )
+    return query
+
+
+def page_limit(default, maximum):
+    """?limit= clamped to 1..maximum, or None when it is not an integer"""
+    value = request.args.get('limit')
+    if value is None:
+        return default
+    try:
+        return min(max(int(value), 1), maximum)
+    except ValueError:
+        return None
 
 
 @admin_bp.route('/pending-users', methods=['GET'])
 @admin_required
 def get_pending_users():
-    """Get all users pending verification"""
+    """Get one keyset page of users pending verification"""
     try:
         user_type = request.args.get('user_type')
+        department = request.args.get('department')
+        cursor = request.args.get('cursor')
+        limit = page_limit(50, MAX_PAGE_SIZE)
+        if limit is None:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        newest_first = request.args.get('order', 'desc') != 'asc'
+        unclaimed = request.args.get('unclaimed', 'false').lower() == 'true'
+        
+        query = pending_query(user_type, department)
+        try:
+            pending_users, next_cursor = get_page(query, limit, cursor, newest_first, unclaimed)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Unfiltered totals come from the stats rollup instead of a COUNT
+        if user_type or department:
+            total = query.count()
+        else:
+            total = get_stats()['pending_users']
         
-        query = User.query.filter_by(is_verified=False)
+        return jsonify({
+            'count': len(pending_users),
+            'total': total,
+            'next_cursor': next_cursor,
+            'users': [user.to_dict() for user in pending_users]
+        }), 200
         
-        if user_type:
-            query = query.filter_by(user_type=user_type)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/pending-users/claim', methods=['POST'])
+@admin_required
+def claim_pending_users():
+    """Claim the next N unclaimed pending users for the current admin"""
+    try:
+        data = request.get_json(silent=True) or {}
+        count = min(int(data.get('count', 10)), MAX_PAGE_SIZE)
         
-        pending_users = query.order_by(User.created_at.desc()).all()
+        users, expires_at = claim_next(
+            int(get_jwt_identity()),
+            count,
+            user_type=data.get('user_type'),
+            department=data.get('department')
+        )
         
         return jsonify({
-            'count': len(pending_users),
-            'users': [user.to_dict() for user in pending_users]
+            'count': len(users),
+            'claim_expires_at': expires_at.isoformat(),
+            'users': users
         }), 200
         
     except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/pending-users/release', methods=['POST'])
+@admin_required
+def release_pending_users():
+    """Release the current admin's claims on the given users"""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids') or []
+        
+        released = release_claims(user_ids, admin_id=int(get_jwt_identity()))
+        db.session.commit()
+        
+        return jsonify({'message': 'Claims released', 'released': released}), 200
+        
+    except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
@@ -51,12 +158,17 @@ def get_pending_users():
 def verify_user(user_id):
     """Verify a user account"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        before = user_state(user)
         user.is_verified = True
+        record_user_change(before, user_state(user))
+        release_claims([user.id])
+        if not before[1]:
+            notify_user_verified(user)
         db.session.commit()
         
         return jsonify({
@@ -74,7 +186,7 @@ def verify_user(user_id):
 def reject_user(user_id):
     """Reject and delete a user account"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -82,10 +194,161 @@ def reject_user(user_id):
         if user.is_verified:
             return jsonify({'error': 'Cannot reject verified user'}), 400
         
-        db.session.delete(user)
+        job = request_user_deletion(user, requested_by=int(get_jwt_identity()))
         db.session.commit()
         
-        return jsonify({'message': 'User rejected and deleted'}), 200
+        return jsonify({
+            'message': 'User rejected and scheduled for deletion',
+            'deletion_job': job.to_dict()
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/bulk-register', methods=['POST'])
+@admin_required
+def bulk_register():
+    """Create pre-verified users from a CSV roster (multipart 'file' or text/csv body)"""
+    try:
+        verified = request.args.get('verified', 'true').lower() == 'true'
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+        
+        if 'file' in request.files:
+            raw = request.files['file'].stream
+        elif request.mimetype == 'text/csv':
+            raw = request.stream
+        else:
+            return jsonify({'error': 'Upload a CSV file as "file" or send a text/csv body'}), 400
+        
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        report = import_users_csv(stream, verified=verified, dry_run=dry_run,
+                                  max_rows=current_app.config['BULK_REGISTER_MAX_ROWS'])
+        
+        return jsonify({
+            'message': 'Dry run complete' if dry_run else 'Bulk registration complete',
+            'dry_run': dry_run,
+            **report.to_dict()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except HashingBusy:
+        db.session.rollback()
+        return busy_response()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+# action -> (rows it applies to, column updates; None means queue for deletion)
+BULK_ACTIONS = {
+    'verify': (User.is_verified.is_(False), {'is_verified': True}),
+    'activate': (User.is_active.is_(False), {'is_active': True}),
+    'deactivate': (User.is_active.is_(True), {'is_active': False}),
+    'reject': (User.is_verified.is_(False), None),
+}
+BULK_CHUNK_SIZE = 500
+MAX_BULK_IDS = 10000
+
+
+def _bulk_chunk(action, rows):
+    """Apply one action to a chunk of (id, user_type, is_verified, is_active) rows in one statement"""
+    predicate, values = BULK_ACTIONS[action]
+    ids = [row.id for row in rows]
+    
+    changes = []
+    for row in rows:
+        before = (row.user_type, bool(row.is_verified), bool(row.is_active))
+        after = None
+        if values is not None:
+            after = (row.user_type,
+                     values.get('is_verified', before[1]),
+                     values.get('is_active', before[2]))
+        changes.append((before, after))
+    record_user_changes(changes)
+    
+    if values is None:
+        # Rejection soft-deletes now; deletion_worker.py removes the rows
+        request_users_deletion(ids, requested_by=int(get_jwt_identity()))
+        affected = len(ids)
+    else:
+        result = db.session.execute(
+            db.update(User).values(**values).where(User.id.in_(ids), predicate)
+            .execution_options(synchronize_session=False)
+        )
+        affected = result.rowcount
+        if action == 'deactivate':
+            bump_token_versions(ids)
+        if action == 'verify':
+            release_claims(ids)
+            notify_users_verified(ids)
+    
+    db.session.commit()
+    return affected
+
+
+def bulk_update_users(action, user_ids=None, filters=None, chunk_size=BULK_CHUNK_SIZE):
+    """Apply an action to users by id list or admin filters, one transaction per chunk"""
+    predicate, _ = BULK_ACTIONS[action]
+    query = (db.session.query(User.id, User.user_type, User.is_verified, User.is_active)
+             .filter(predicate, User.deleted_at.is_(None)))
+    if action in ('deactivate', 'reject'):
+        query = query.filter(User.email.notin_(current_app.config['ADMIN_EMAILS']))
+    
+    affected = 0
+    if user_ids is not None:
+        for start in range(0, len(user_ids), chunk_size):
+            chunk_ids = user_ids[start:start + chunk_size]
+            rows = query.filter(User.id.in_(chunk_ids)).with_for_update().all()
+            if rows:
+                affected += _bulk_chunk(action, rows)
+        return affected
+    
+    # Keyset pagination over the filtered users
+    query = filter_users(query, filters)
+    last_id = 0
+    while True:
+        rows = query.filter(User.id > last_id).order_by(User.id).limit(chunk_size).with_for_update().all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        affected += _bulk_chunk(action, rows)
+    return affected
+
+
+@admin_bp.route('/bulk/<action>', methods=['POST'])
+@admin_required
+def bulk_action(action):
+    """Verify, activate, deactivate or reject many users by id list or filter"""
+    try:
+        if action not in BULK_ACTIONS:
+            return jsonify({'error': f'Unknown bulk action: {action}'}), 404
+        
+        data = request.get_json() or {}
+        user_ids = data.get('user_ids')
+        filters = data.get('filter')
+        
+        if user_ids is None and filters is None:
+            return jsonify({'error': 'Provide user_ids or filter'}), 400
+        if user_ids is not None:
+            if not isinstance(user_ids, list) or len(user_ids) > MAX_BULK_IDS:
+                return jsonify({'error': f'user_ids must be a list of at most {MAX_BULK_IDS} ids'}), 400
+            try:
+                user_ids = sorted({int(i) for i in user_ids})
+            except (TypeError, ValueError):
+                return jsonify({'error': 'user_ids must be integers'}), 400
+        elif not isinstance(filters, dict):
+            return jsonify({'error': 'filter must be an object'}), 400
+        
+        affected = bulk_update_users(action, user_ids=user_ids, filters=filters)
+        
+        return jsonify({
+            'message': f'Bulk {action} complete',
+            'action': action,
+            'affected': affected
+        }), 200
         
     except Exception as e:
         db.session.rollback()
@@ -97,50 +360,67 @@ def reject_user(user_id):
 def get_all_users():
     """Get all users with filters"""
     try:
-        user_type = request.args.get('user_type')
-        is_verified = request.args.get('is_verified')
-        is_active = request.args.get('is_active')
-        search = request.args.get('search')
-        
-        query = User.query
-        
-        if user_type:
-            query = query.filter_by(user_type=user_type)
-        if is_verified is not None:
-            query = query.filter_by(is_verified=is_verified.lower() == 'true')
-        if is_active is not None:
-            query = query.filter_by(is_active=is_active.lower() == 'true')
-        if search:
-            query = query.filter(
-                db.or_(
-                    User.full_name.ilike(f'%{search}%'),
-                    User.email.ilike(f'%{search}%'),
-                    User.college_id.ilike(f'%{search}%')
-                )
-            )
+        query = filter_users(User.query, request.args)
         
-        users = query.order_by(User.created_at.desc()).all()
+        users = serialize(query.order_by(User.created_at.desc()), USER)
         
         return jsonify({
             'count': len(users),
-            'users': [user.to_dict() for user in users]
+            'users': users
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/export/<table>', methods=['GET'])
+@not_batchable
+@admin_required
+def export_table(table):
+    """Stream users, jobs or applications as CSV or NDJSON, optionally gzipped"""
+    try:
+        if table not in EXPORTS:
+            return jsonify({'error': f'Unknown export: {table}'}), 404
+        
+        fmt = request.args.get('format', 'csv')
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'error': 'format must be csv or ndjson'}), 400
+        gzip = request.args.get('gzip', 'false').lower() == 'true'
+        
+        query = build_export_query(table)
+        if table == 'users':
+            query = filter_users(query, request.args)
+        query = query.order_by(EXPORTS[table][0][0])
+        
+        # A gzip download is a .gz file, not a transfer encoding, so clients
+        # save it compressed instead of transparently unpacking it
+        filename = f'{table}.{fmt}' + ('.gz' if gzip else '')
+        if gzip:
+            mimetype = 'application/gzip'
+        else:
+            mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = Response(stream_with_context(stream_export(query, fmt=fmt, gzip=gzip)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/deactivate-user/<int:user_id>', methods=['PUT'])
 @admin_required
 def deactivate_user(user_id):
     """Deactivate a user account"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        before = user_state(user)
         user.is_active = False
+        record_user_change(before, user_state(user))
+        bump_token_version(user.id)
         db.session.commit()
         
         return jsonify({
@@ -158,12 +438,14 @@ def deactivate_user(user_id):
 def activate_user(user_id):
     """Activate a user account"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        before = user_state(user)
         user.is_active = True
+        record_user_change(before, user_state(user))
         db.session.commit()
         
         return jsonify({
@@ -181,40 +463,105 @@ def activate_user(user_id):
 def delete_user(user_id):
     """Permanently delete a user account"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Check if user is admin
-        if user.email in ADMIN_EMAILS:
+        if is_admin_email(user.email):
             return jsonify({'error': 'Cannot delete admin account'}), 400
         
-        db.session.delete(user)
+        job = request_user_deletion(user, requested_by=int(get_jwt_identity()))
         db.session.commit()
         
-        return jsonify({'message': 'User deleted successfully'}), 200
+        return jsonify({
+            'message': 'User scheduled for deletion',
+            'deletion_job': job.to_dict()
+        }), 202
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/deletions', methods=['GET'])
+@admin_required
+def get_deletion_jobs():
+    """Get recent user deletion jobs and their progress"""
+    try:
+        status = request.args.get('status')
+        limit = page_limit(50, 200)
+        if limit is None:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        query = DeletionJob.query
+        if status:
+            query = query.filter_by(status=status)
+        
+        jobs = query.order_by(DeletionJob.id.desc()).limit(limit).all()
+        
+        return jsonify({
+            'count': len(jobs),
+            'jobs': [job.to_dict() for job in jobs]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/deletions/<int:job_id>', methods=['GET'])
+@admin_required
+def get_deletion_job(job_id):
+    """Get the progress of one user deletion job"""
+    try:
+        job = DeletionJob.query.get(job_id)
+        
+        if not job:
+            return jsonify({'error': 'Deletion job not found'}), 404
+        
+        return jsonify(job.to_dict()), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/tasks', methods=['GET'])
+@admin_required
+def get_tasks():
+    """Get recent background tasks, e.g. failed emails"""
+    try:
+        status = request.args.get('status')
+        name = request.args.get('name')
+        limit = page_limit(50, 200)
+        if limit is None:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        query = Task.query
+        if status:
+            query = query.filter_by(status=status)
+        if name:
+            query = query.filter_by(name=name)
+        
+        tasks = query.order_by(Task.id.desc()).limit(limit).all()
+        
+        return jsonify({
+            'count': len(tasks),
+            'tasks': [task.to_dict() for task in tasks]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/stats', methods=['GET'])
 @admin_required
+@read_only
 def get_admin_stats():
     """Get platform statistics for admin dashboard"""
     try:
-        stats = {
-            'total_users': User.query.count(),
-            'verified_users': User.query.filter_by(is_verified=True).count(),
-            'pending_users': User.query.filter_by(is_verified=False).count(),
-            'active_users': User.query.filter_by(is_active=True, is_verified=True).count(),
-            'total_students': User.query.filter_by(user_type='student').count(),
-            'total_alumni': User.query.filter_by(user_type='alumni').count(),
-            'verified_students': User.query.filter_by(user_type='student', is_verified=True).count(),
-            'verified_alumni': User.query.filter_by(user_type='alumni', is_verified=True).count(),
-        }
+        rollup = get_stats()
+        stats = {name: rollup[name] for name in ADMIN_STATS}
         
         return jsonify(stats), 200
         
@@ -222,26 +569,82 @@ def get_admin_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/stats/reconcile', methods=['POST'])
+@admin_required
+def reconcile_admin_stats():
+    """Rebuild the statistics rollup from the users table"""
+    try:
+        drift = reconcile_stats()
+        
+        return jsonify({
+            'message': 'Statistics reconciled',
+            'drift': drift
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _user_activity(user_id):
+    """Relationship counts and last-activity times in one round trip of scalar subqueries"""
+    def scalar(column, *criteria):
+        return db.select(column).where(*criteria).scalar_subquery()
+    
+    row = db.session.execute(db.select(
+        scalar(db.func.count(Job.id), Job.alumni_id == user_id).label('jobs_posted_count'),
+        scalar(db.func.count(Job.id), Job.alumni_id == user_id, Job.is_active.is_(True)).label('active_jobs_count'),
+        scalar(db.func.count(Application.id), Application.student_id == user_id).label('applications_count'),
+        scalar(db.func.max(Application.applied_at), Application.student_id == user_id).label('last_application_at'),
+        scalar(db.func.count(Message.id), Message.sender_id == user_id).label('messages_sent_count'),
+        scalar(db.func.count(Message.id), Message.receiver_id == user_id).label('messages_received_count'),
+        scalar(db.func.max(Message.created_at), Message.sender_id == user_id).label('last_sent_at'),
+        scalar(db.func.max(Message.created_at), Message.receiver_id == user_id).label('last_received_at'),
+    )).one()._asdict()
+    
+    last_message = max(filter(None, [row.pop('last_sent_at'), row.pop('last_received_at')]), default=None)
+    row['last_message_at'] = last_message
+    
+    for key in ('last_application_at', 'last_message_at'):
+        row[key] = row[key].isoformat() if row[key] else None
+    return row
+
+
+@admin_bp.route('/metrics/pool', methods=['GET'])
+@admin_required
+def get_pool_metrics():
+    """Get database connection pool metrics for this worker"""
+    try:
+        return jsonify(pool_snapshot(db.engine)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/user/<int:user_id>', methods=['GET'])
 @admin_required
 def get_user_details(user_id):
     """Get detailed user information"""
     try:
-        user = User.query.get(user_id)
+        user = get_live_user(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         user_data = user.to_dict()
+        activity = _user_activity(user_id)
         
         # Add additional statistics
         if user.user_type == 'alumni':
-            user_data['jobs_posted_count'] = len(user.jobs_posted)
+            user_data['jobs_posted_count'] = activity['jobs_posted_count']
+            user_data['active_jobs_count'] = activity['active_jobs_count']
         else:
-            user_data['applications_count'] = len(user.applications)
+            user_data['applications_count'] = activity['applications_count']
+            user_data['last_application_at'] = activity['last_application_at']
         
-        user_data['messages_sent_count'] = len(user.messages_sent)
-        user_data['messages_received_count'] = len(user.messages_received)
+        user_data['messages_sent_count'] = activity['messages_sent_count']
+        user_data['messages_received_count'] = activity['messages_received_count']
+        user_data['last_message_at'] = activity['last_message_at']
         
         return jsonify(user_data), 200
         
@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from routes.admin import admin_required
+from analytics import parse_range, signups_series, jobs_series, application_funnel
+
+analytics_bp = Blueprint('analytics', __name__)
+
+MAX_RANGE_DAYS = 366
+
+
+def _range():
+    start, end = parse_range(request.args.get('start'), request.args.get('end'))
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'Range is limited to {MAX_RANGE_DAYS} days')
+    return start, end
+
+
+@analytics_bp.route('/signups', methods=['GET'])
+@admin_required
+def get_signups():
+    """Get signups per day by user type"""
+    try:
+        start, end = _range()
+        series = signups_series(start, end, user_type=request.args.get('user_type'))
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': series
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@analytics_bp.route('/jobs', methods=['GET'])
+@admin_required
+def get_job_postings():
+    """Get jobs posted per day or per week"""
+    try:
+        start, end = _range()
+        interval = request.args.get('interval', 'day')
+        if interval not in ('day', 'week'):
+            return jsonify({'error': 'interval must be day or week'}), 400
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'interval': interval,
+            'series': jobs_series(start, end, interval)
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@analytics_bp.route('/applications', methods=['GET'])
+@admin_required
+def get_application_funnels():
+    """Get application funnel counts per job"""
+    try:
+        start, end = _range()
+        job_id = request.args.get('job_id', type=int)
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'jobs': application_funnel(start, end, job_id=job_id)
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
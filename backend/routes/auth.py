@@ -1,11 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from models import db, User
+from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
+from skills import set_user_skills
+from authz import user_claims
+from tenancy import CLAIM as TENANT_CLAIM
+from ratelimit import rate_limit
+from idempotency import idempotent
+from stats import record_user_change, user_state
+from analytics import record_signups
+from passwords import HashingBusy, busy_response
 
 auth_bp = Blueprint('auth', __name__)
 
+
+def is_duplicate_user(error):
+    """Whether an IntegrityError came from a unique index on users (not e.g. skills)"""
+    message = str(error.orig)
+    return 'users.' in message or 'ix_users_' in message
+
+
 @auth_bp.route('/register', methods=['POST'])
+@idempotent
+@rate_limit('register_ip', key='ip')
 def register():
     """Register a new user (student or alumni)"""
     try:
@@ -18,11 +36,13 @@ def register():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Check if user already exists
-        if User.query.filter_by(email=data['email']).first():
+        # Check if user already exists (one query over both indexed columns)
+        existing = User.query.filter(
+            or_(User.email == data['email'], User.college_email == data['college_email'])
+        ).first()
+        if existing and existing.email == data['email']:
             return jsonify({'error': 'Email already registered'}), 400
-        
-        if User.query.filter_by(college_email=data['college_email']).first():
+        if existing:
             return jsonify({'error': 'College email already registered'}), 400
         
         # Create new user
@@ -51,6 +71,10 @@ def register():
             user.current_year = data.get('current_year')
         
         db.session.add(user)
+        if data.get('skills'):
+            set_user_skills(user, data['skills'])
+        record_user_change(None, user_state(user))
+        record_signups(user.user_type)
         db.session.commit()
         
         return jsonify({
@@ -58,15 +82,22 @@ def register():
             'user': user.to_dict()
         }), 201
         
-    except IntegrityError:
+    except IntegrityError as e:
         db.session.rollback()
+        if not is_duplicate_user(e):
+            return jsonify({'error': str(e)}), 500
         return jsonify({'error': 'User already exists'}), 400
+    except HashingBusy:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login_ip', key='ip')
+@rate_limit('login_email', key='email')
 def login():
     """Login user and return JWT tokens"""
     try:
@@ -86,9 +117,16 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account has been deactivated'}), 403
         
-        # Create tokens
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        # Upgrade hashes made with older cost parameters while we have the plaintext
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
+        # Create tokens; role claims let later requests skip the user lookup
+        claims = user_claims(user)
+        access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(user.id),
+                                             additional_claims={'tv': claims['tv'], TENANT_CLAIM: claims[TENANT_CLAIM]})
         
         return jsonify({
             'message': 'Login successful',
@@ -97,7 +135,11 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except HashingBusy:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
@@ -106,8 +148,14 @@ def login():
 def refresh():
     """Refresh access token"""
     try:
-        current_user_id = get_jwt_identity()
-        access_token = create_access_token(identity=str(current_user_id))
+        current_user_id = int(get_jwt_identity())
+        user = User.query.get(current_user_id)
+        
+        # Refresh is rare, so re-read the user to pick up role and status changes
+        if not user or not user.is_active:
+            return jsonify({'error': 'Account has been deactivated'}), 403
+        
+        access_token = create_access_token(identity=str(current_user_id), additional_claims=user_claims(user))
         
         return jsonify({
             'access_token': access_token
@@ -148,11 +196,14 @@ def update_profile():
         data = request.get_json()
         
         # Update common fields
-        updatable_fields = ['full_name', 'skills', 'profile_picture']
+        updatable_fields = ['full_name', 'profile_picture']
         for field in updatable_fields:
             if field in data:
                 setattr(user, field, data[field])
         
+        if 'skills' in data:
+            set_user_skills(user, data['skills'])
+        
         # Update type-specific fields
         if user.user_type == 'alumni':
             alumni_fields = ['current_company', 'current_position', 'bio', 
@@ -202,6 +253,9 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except HashingBusy:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
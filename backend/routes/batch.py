@@ -0,0 +1,148 @@
+"""
+POST /api/batch runs several GET requests in one round trip:
+
+    {"requests": [{"path": "/api/admin/stats"}, {"path": "/api/chat/unread-count"}]}
+    -> {"responses": [{"status": 200, "body": {...}}, {"status": 200, "body": {...}}]}
+
+Sub-requests are dispatched in-process through the normal blueprints, with
+the batch's Authorization (and read-primary pin) headers, so each runs its
+usual decorators and hooks and gets its own status. By default they run one
+after another in the batch's database session: a single connection
+checkout, and rows such as the current user are loaded once and then served
+from the session's identity map. With BATCH_CONCURRENCY > 1 they run that
+many at a time instead, each in its own app context and session; that pays
+off when some of them are slow and the worker is gevent.
+
+Views marked @not_batchable (streamed exports, long-polls) are refused, as
+their responses are unbounded in size or time and would hold up the batch.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from urllib.parse import urlsplit
+from flask import Blueprint, current_app, g, jsonify, request
+from flask_jwt_extended import jwt_required
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from models import db
+from replicas import read_only, PIN_HEADER
+from tenancy import HEADER as TENANT_HEADER
+
+batch_bp = Blueprint('batch', __name__)
+
+FORWARDED_HEADERS = ('Authorization', PIN_HEADER, TENANT_HEADER, 'X-Forwarded-For', 'User-Agent')
+
+_executor = None
+_executor_lock = Lock()
+
+
+def _pool(size):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='batch')
+        return _executor
+
+
+def _environ(path):
+    url = urlsplit(path)
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    # Same host, so colleges picked by domain resolve the same way
+    return EnvironBuilder(path=url.path, query_string=url.query, method='GET', headers=headers,
+                          base_url=request.host_url, environ_base={'REMOTE_ADDR': request.remote_addr}).get_environ()
+
+
+def _dispatch(app, environ):
+    """Run one sub-request in the current app context; returns {'status', 'body'}"""
+    with app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            db.session.rollback()
+            return {'status': 500, 'body': {'error': str(e)}}
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+
+
+def _dispatch_shared(app, environ):
+    """Run a sub-request in the batch's session, with a g of its own"""
+    # g belongs to the app context, which the sub-request shares with the
+    # batch (that is what keeps the session); swap its contents so state such
+    # as the chosen replica doesn't leak between sub-requests
+    saved = dict(vars(g))
+    vars(g).clear()
+    try:
+        return _dispatch(app, environ)
+    finally:
+        vars(g).clear()
+        vars(g).update(saved)
+
+
+def _dispatch_isolated(app, environ):
+    with app.app_context():
+        return _dispatch(app, environ)
+
+
+def not_batchable(fn):
+    """Keep this view out of batches: it streams or holds the request open (place below the route decorator)"""
+    fn.batchable = False
+    return fn
+
+
+def _batchable(path):
+    """Whether the view serving a GET of path may run inside a batch; unknown paths are left to 404"""
+    try:
+        endpoint, _ = current_app.url_map.bind_to_environ(request.environ).match(path, method='GET')
+    except HTTPException:
+        return True
+    return getattr(current_app.view_functions[endpoint], 'batchable', True)
+
+
+def _validate(items):
+    limit = current_app.config['BATCH_MAX_REQUESTS']
+    if not isinstance(items, list) or not items:
+        return 'requests must be a non-empty list'
+    if len(items) > limit:
+        return f'At most {limit} requests per batch'
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return 'Each request needs a path'
+        if item.get('method', 'GET').upper() != 'GET':
+            return 'Only GET requests can be batched'
+        path = urlsplit(item['path']).path
+        if not path.startswith('/api/'):
+            return f"Path must start with /api/: {item['path']}"
+        if path.rstrip('/') == request.path.rstrip('/'):
+            return 'Batches cannot be nested'
+        if not _batchable(path):
+            return f"Streamed and long-poll endpoints cannot be batched: {item['path']}"
+    return None
+
+
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+@read_only
+def run_batch():
+    """Run up to BATCH_MAX_REQUESTS GET requests and return their responses in order"""
+    try:
+        payload = request.get_json(silent=True)
+        items = payload.get('requests') if isinstance(payload, dict) else None
+        error = _validate(items)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        app = current_app._get_current_object()
+        environs = [_environ(item['path']) for item in items]
+        concurrency = current_app.config['BATCH_CONCURRENCY']
+        if concurrency > 1 and len(environs) > 1:
+            responses = list(_pool(concurrency).map(lambda environ: _dispatch_isolated(app, environ), environs))
+        else:
+            responses = [_dispatch_shared(app, environ) for environ in environs]
+        
+        return jsonify({'responses': responses}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
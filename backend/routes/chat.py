@@ -1,50 +1,66 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, Message, Conversation, User
 from sqlalchemy import or_, and_
+from ratelimit import rate_limit
+from idempotency import idempotent
+from replicas import read_only
+from routes.batch import not_batchable
+from serializers import serialize, MESSAGE, USER
+from serving import long_poll_seconds, wait_for
+from notifications import notify_new_message
 
 chat_bp = Blueprint('chat', __name__)
 
 @chat_bp.route('/conversations', methods=['GET'])
 @jwt_required()
+@read_only
 def get_conversations():
     """Get all conversations for the current user"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         
         # Get all conversations where user is participant
-        conversations = Conversation.query.filter(
+        conversations = db.session.query(
+            Conversation.id, Conversation.user1_id, Conversation.user2_id, Conversation.last_message_at
+        ).filter(
             or_(
                 Conversation.user1_id == current_user_id,
                 Conversation.user2_id == current_user_id
             )
         ).order_by(Conversation.last_message_at.desc()).all()
         
+        other_ids = [conv.user2_id if conv.user1_id == current_user_id else conv.user1_id
+                     for conv in conversations]
+        
+        # Other users, last messages and unread counts: one query each for all conversations
+        users = {u['id']: u for u in serialize(User.query.filter(User.id.in_(other_ids)), USER)}
+        
+        other_party = db.case((Message.sender_id == current_user_id, Message.receiver_id),
+                              else_=Message.sender_id)
+        last_ids = db.session.query(db.func.max(Message.id)).filter(
+            or_(Message.sender_id == current_user_id, Message.receiver_id == current_user_id)
+        ).group_by(other_party)
+        last_messages = {}
+        for msg in serialize(Message.query.filter(Message.id.in_(last_ids)), MESSAGE):
+            other_id = msg['receiver_id'] if msg['sender_id'] == current_user_id else msg['sender_id']
+            last_messages[other_id] = msg
+        
+        unread_counts = dict(db.session.query(Message.sender_id, db.func.count(Message.id)).filter(
+            Message.receiver_id == current_user_id,
+            Message.sender_id.in_(other_ids),
+            Message.is_read.is_(False)
+        ).group_by(Message.sender_id).all())
+        
         conversation_list = []
-        for conv in conversations:
-            # Determine the other user
-            other_user = conv.user2 if conv.user1_id == current_user_id else conv.user1
-            
-            # Get last message
-            last_message = Message.query.filter(
-                or_(
-                    and_(Message.sender_id == conv.user1_id, Message.receiver_id == conv.user2_id),
-                    and_(Message.sender_id == conv.user2_id, Message.receiver_id == conv.user1_id)
-                )
-            ).order_by(Message.created_at.desc()).first()
-            
-            # Count unread messages
-            unread_count = Message.query.filter_by(
-                receiver_id=current_user_id,
-                sender_id=other_user.id,
-                is_read=False
-            ).count()
-            
+        for conv, other_id in zip(conversations, other_ids):
+            if other_id not in users:
+                continue
             conversation_list.append({
                 'conversation_id': conv.id,
-                'other_user': other_user.to_dict(),
-                'last_message': last_message.to_dict() if last_message else None,
-                'unread_count': unread_count,
+                'other_user': users[other_id],
+                'last_message': last_messages.get(other_id),
+                'unread_count': unread_counts.get(other_id, 0),
                 'last_message_at': conv.last_message_at.isoformat() if conv.last_message_at else None
             })
         
@@ -70,12 +86,12 @@ def get_messages(other_user_id):
             return jsonify({'error': 'User not found'}), 404
         
         # Get all messages between the two users
-        messages = Message.query.filter(
+        messages = serialize(Message.query.filter(
             or_(
                 and_(Message.sender_id == current_user_id, Message.receiver_id == other_user_id),
                 and_(Message.sender_id == other_user_id, Message.receiver_id == current_user_id)
             )
-        ).order_by(Message.created_at.asc()).all()
+        ).order_by(Message.created_at.asc()), MESSAGE)
         
         # Mark received messages as read
         Message.query.filter_by(
@@ -87,7 +103,7 @@ def get_messages(other_user_id):
         
         return jsonify({
             'count': len(messages),
-            'messages': [msg.to_dict() for msg in messages],
+            'messages': messages,
             'other_user': other_user.to_dict()
         }), 200
         
@@ -95,8 +111,40 @@ def get_messages(other_user_id):
         return jsonify({'error': str(e)}), 500
 
 
+@chat_bp.route('/poll', methods=['GET'])
+@not_batchable
+@jwt_required()
+@read_only
+def poll_messages():
+    """Wait for messages received after a given message id (long-poll)"""
+    try:
+        current_user_id = int(get_jwt_identity())
+        after = request.args.get('after', 0, type=int)
+        timeout = long_poll_seconds(request.args.get('timeout', type=float))
+        
+        def new_messages():
+            query = MESSAGE.query(Message.query.filter(
+                Message.receiver_id == current_user_id,
+                Message.id > after
+            )).order_by(Message.id.asc()).limit(100)
+            return [MESSAGE.row(row) for row in query]
+        
+        messages = wait_for(new_messages, timeout, current_app.config['CHAT_POLL_INTERVAL'])
+        
+        return jsonify({
+            'count': len(messages),
+            'messages': messages,
+            'last_id': messages[-1]['id'] if messages else after
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @chat_bp.route('/send', methods=['POST'])
 @jwt_required()
+@idempotent
+@rate_limit('send_message_user', key='user')
 def send_message():
     """Send a message to another user"""
     try:
@@ -140,6 +188,8 @@ def send_message():
         else:
             conversation.last_message_at = message.created_at
         
+        db.session.flush()
+        notify_new_message(message)
         db.session.commit()
         
         return jsonify({
@@ -157,7 +207,7 @@ def send_message():
 def mark_message_read(message_id):
     """Mark a specific message as read"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         message = Message.query.get(message_id)
         
         if not message:
@@ -199,7 +249,7 @@ def get_unread_count():
 def delete_message(message_id):
     """Delete a message (only by sender)"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         message = Message.query.get(message_id)
         
         if not message:
@@ -1,12 +1,21 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Job, Application, User
+from models import db, User, Job, Application
 from datetime import datetime
+from authz import role_required
+from ratelimit import rate_limit
+from idempotency import idempotent
+from analytics import record_job_posted, record_application_event
+from replicas import read_only
+from serializers import serialize, JOB, APPLICATION
+from notifications import notify_application_status
+import feed
 
 jobs_bp = Blueprint('jobs', __name__)
 
 @jobs_bp.route('/', methods=['GET'])
 @jwt_required()
+@read_only
 def get_jobs():
     """Get all active job postings"""
     try:
@@ -34,11 +43,11 @@ def get_jobs():
                 )
             )
         
-        jobs = query.order_by(Job.created_at.desc()).all()
+        jobs = serialize(query.order_by(Job.created_at.desc()), JOB)
         
         return jsonify({
             'count': len(jobs),
-            'jobs': [job.to_dict() for job in jobs]
+            'jobs': jobs
         }), 200
         
     except Exception as e:
@@ -46,15 +55,12 @@ def get_jobs():
 
 
 @jobs_bp.route('/', methods=['POST'])
-@jwt_required()
+@role_required(user_type='alumni', message='Only alumni can post jobs')
+@idempotent
 def create_job():
     """Create a new job posting (alumni only)"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.user_type != 'alumni':
-            return jsonify({'error': 'Only alumni can post jobs'}), 403
         
         data = request.get_json()
         
@@ -84,6 +90,9 @@ def create_job():
                 return jsonify({'error': 'Invalid date format for application_deadline'}), 400
         
         db.session.add(job)
+        record_job_posted()
+        db.session.flush()
+        feed.job_posted(job, db.session.get(User, int(current_user_id)))
         db.session.commit()
         
         return jsonify({
@@ -117,7 +126,7 @@ def get_job(job_id):
 def update_job(job_id):
     """Update job posting (only by the alumni who posted it)"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         job = Job.query.get(job_id)
         
         if not job:
@@ -159,7 +168,7 @@ def update_job(job_id):
 def delete_job(job_id):
     """Delete job posting (only by the alumni who posted it)"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         job = Job.query.get(job_id)
         
         if not job:
@@ -179,15 +188,13 @@ def delete_job(job_id):
 
 
 @jobs_bp.route('/<int:job_id>/apply', methods=['POST'])
-@jwt_required()
+@role_required(user_type='student', message='Only students can apply to jobs')
+@idempotent
+@rate_limit('apply_user', key='user')
 def apply_to_job(job_id):
     """Apply to a job posting (students only)"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.user_type != 'student':
-            return jsonify({'error': 'Only students can apply to jobs'}), 403
         
         job = Job.query.get(job_id)
         if not job or not job.is_active:
@@ -213,6 +220,9 @@ def apply_to_job(job_id):
         )
         
         db.session.add(application)
+        record_application_event(job_id, 'applied')
+        db.session.flush()
+        feed.application_received(application, job, db.session.get(User, int(current_user_id)))
         db.session.commit()
         
         return jsonify({
@@ -226,21 +236,17 @@ def apply_to_job(job_id):
 
 
 @jobs_bp.route('/my-jobs', methods=['GET'])
-@jwt_required()
+@role_required(user_type='alumni', message='Only alumni can view their posted jobs')
 def get_my_jobs():
     """Get jobs posted by current alumni"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
         
-        if not user or user.user_type != 'alumni':
-            return jsonify({'error': 'Only alumni can view their posted jobs'}), 403
-        
-        jobs = Job.query.filter_by(alumni_id=current_user_id).order_by(Job.created_at.desc()).all()
+        jobs = serialize(Job.query.filter_by(alumni_id=current_user_id).order_by(Job.created_at.desc()), JOB)
         
         return jsonify({
             'count': len(jobs),
-            'jobs': [job.to_dict() for job in jobs]
+            'jobs': jobs
         }), 200
         
     except Exception as e:
@@ -248,21 +254,20 @@ def get_my_jobs():
 
 
 @jobs_bp.route('/my-applications', methods=['GET'])
-@jwt_required()
+@role_required(user_type='student', message='Only students can view their applications')
 def get_my_applications():
     """Get applications submitted by current student"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
         
-        if not user or user.user_type != 'student':
-            return jsonify({'error': 'Only students can view their applications'}), 403
-        
-        applications = Application.query.filter_by(student_id=current_user_id).order_by(Application.applied_at.desc()).all()
+        applications = serialize(
+            Application.query.filter_by(student_id=current_user_id).order_by(Application.applied_at.desc()),
+            APPLICATION
+        )
         
         return jsonify({
             'count': len(applications),
-            'applications': [app.to_dict() for app in applications]
+            'applications': applications
         }), 200
         
     except Exception as e:
@@ -274,7 +279,7 @@ def get_my_applications():
 def get_job_applications(job_id):
     """Get all applications for a specific job (only by alumni who posted it)"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         job = Job.query.get(job_id)
         
         if not job:
@@ -283,11 +288,14 @@ def get_job_applications(job_id):
         if job.alumni_id != current_user_id:
             return jsonify({'error': 'Unauthorized'}), 403
         
-        applications = Application.query.filter_by(job_id=job_id).order_by(Application.applied_at.desc()).all()
+        applications = serialize(
+            Application.query.filter_by(job_id=job_id).order_by(Application.applied_at.desc()),
+            APPLICATION
+        )
         
         return jsonify({
             'count': len(applications),
-            'applications': [app.to_dict() for app in applications]
+            'applications': applications
         }), 200
         
     except Exception as e:
@@ -299,7 +307,7 @@ def get_job_applications(job_id):
 def update_application_status(application_id):
     """Update application status (only by alumni who posted the job)"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         application = Application.query.get(application_id)
         
         if not application:
@@ -313,7 +321,17 @@ def update_application_status(application_id):
         if 'status' not in data:
             return jsonify({'error': 'Status is required'}), 400
         
-        application.status = data['status']
+        status = data['status']
+        if status not in Application.status.type.enums:
+            return jsonify({'error': f'Invalid status: {status}'}), 400
+        
+        changed = status != application.status
+        if changed and status != 'pending':
+            record_application_event(application.job_id, status)
+        application.status = status
+        if changed:
+            notify_application_status(application)
+            feed.application_status_changed(application, application.job)
         db.session.commit()
         
         return jsonify({
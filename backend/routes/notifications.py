@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, User
+from feed import MAX_PAGE_SIZE, get_feed, unread_count, mark_read, latest_event_id
+from replicas import read_only
+
+notifications_bp = Blueprint('notifications', __name__)
+
+
+@notifications_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def get_notifications():
+    """Get one page of the current user's notification feed, newest first"""
+    try:
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor', type=int)
+        
+        notifications, next_cursor, last_read = get_feed(user, limit, cursor)
+        
+        return jsonify({
+            'count': len(notifications),
+            'notifications': notifications,
+            'next_cursor': next_cursor,
+            'last_read_id': last_read
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@notifications_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+@read_only
+def get_unread_notifications():
+    """Get the number of unread notifications (capped at 100)"""
+    try:
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return jsonify({'unread_count': unread_count(user)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@notifications_bp.route('/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read():
+    """Mark notifications up to an id (default: all) as read"""
+    try:
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        up_to = data.get('up_to')
+        if up_to is None:
+            up_to = latest_event_id(user)
+        elif not isinstance(up_to, int):
+            return jsonify({'error': 'up_to must be a notification id'}), 400
+        
+        last_read = mark_read(user.id, up_to)
+        db.session.commit()
+        
+        return jsonify({'last_read_id': last_read}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
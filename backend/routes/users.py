@@ -1,12 +1,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User
+from models import db, User, Skill
 from sqlalchemy import or_
+from skills import filter_by_skills, slugify_skill
+from stats import get_stats as get_rollup_stats
+from replicas import read_only
+from serializers import serialize, USER
 
 users_bp = Blueprint('users', __name__)
 
 @users_bp.route('/alumni', methods=['GET'])
 @jwt_required()
+@read_only
 def get_alumni():
     """Get all verified alumni"""
     try:
@@ -15,6 +20,8 @@ def get_alumni():
         company = request.args.get('company')
         passing_year = request.args.get('passing_year')
         search = request.args.get('search')
+        skills = request.args.get('skills')
+        skill_match = request.args.get('skill_match', 'all')
         
         # Base query
         query = User.query.filter_by(user_type='alumni', is_verified=True, is_active=True)
@@ -34,12 +41,14 @@ def get_alumni():
                     User.current_position.ilike(f'%{search}%')
                 )
             )
+        if skills:
+            query = filter_by_skills(query, skills, match_all=skill_match != 'any')
         
-        alumni = query.all()
+        alumni = serialize(query, USER)
         
         return jsonify({
             'count': len(alumni),
-            'alumni': [a.to_dict() for a in alumni]
+            'alumni': alumni
         }), 200
         
     except Exception as e:
@@ -48,6 +57,7 @@ def get_alumni():
 
 @users_bp.route('/students', methods=['GET'])
 @jwt_required()
+@read_only
 def get_students():
     """Get all verified students"""
     try:
@@ -55,6 +65,8 @@ def get_students():
         department = request.args.get('department')
         year = request.args.get('year')
         search = request.args.get('search')
+        skills = request.args.get('skills')
+        skill_match = request.args.get('skill_match', 'all')
         
         # Base query
         query = User.query.filter_by(user_type='student', is_verified=True, is_active=True)
@@ -66,12 +78,14 @@ def get_students():
             query = query.filter_by(current_year=int(year))
         if search:
             query = query.filter(User.full_name.ilike(f'%{search}%'))
+        if skills:
+            query = filter_by_skills(query, skills, match_all=skill_match != 'any')
         
-        students = query.all()
+        students = serialize(query, USER)
         
         return jsonify({
             'count': len(students),
-            'students': [s.to_dict() for s in students]
+            'students': students
         }), 200
         
     except Exception as e:
@@ -99,6 +113,7 @@ def get_user_profile(user_id):
 
 @users_bp.route('/departments', methods=['GET'])
 @jwt_required()
+@read_only
 def get_departments():
     """Get all unique departments"""
     try:
@@ -113,13 +128,39 @@ def get_departments():
         return jsonify({'error': str(e)}), 500
 
 
+@users_bp.route('/skills', methods=['GET'])
+@jwt_required()
+@read_only
+def get_skills():
+    """Get skills from the taxonomy, optionally by name prefix"""
+    try:
+        prefix = request.args.get('q')
+        limit = min(int(request.args.get('limit', 50)), 200)
+        
+        query = Skill.query
+        if prefix:
+            query = query.filter(Skill.slug.startswith(slugify_skill(prefix), autoescape=True))
+        
+        skills = query.order_by(Skill.slug).limit(limit).all()
+        
+        return jsonify({
+            'count': len(skills),
+            'skills': [skill.to_dict() for skill in skills]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @users_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_stats():
     """Get platform statistics"""
     try:
-        total_alumni = User.query.filter_by(user_type='alumni', is_verified=True, is_active=True).count()
-        total_students = User.query.filter_by(user_type='student', is_verified=True, is_active=True).count()
+        rollup = get_rollup_stats()
+        total_alumni = rollup['active_alumni']
+        total_students = rollup['active_students']
         
         return jsonify({
             'total_alumni': total_alumni,
@@ -0,0 +1,313 @@
+"""
+Synthetic data generator.
+Bulk-loads a realistic dataset for load testing: users with skills, jobs,
+applications and messages. Job popularity and conversation lengths are
+heavy-tailed (Pareto), so a few jobs and conversations are very large, as
+in production. Rows are generated in batches and written with executemany
+inserts on a single connection; every user shares one password hash.
+
+Two fixed accounts are created for benchmarks: bench-student@seed.example.com
+and bench-alumni@seed.example.com. They take part in the largest
+conversation and the alumni account owns the most popular job. The
+admin@college.edu account is created too if it is missing.
+
+Usage: python seed_data.py [--scale 1.0] [--users N] [--jobs N]
+                           [--applications N] [--messages N] [--seed 42]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from app import create_app
+from init_db import create_schema
+from models import db, User, Job, Conversation
+from skills import get_or_create_skills
+from stats import reconcile_stats
+from analytics import backfill
+
+FULL_SIZES = {'users': 100_000, 'jobs': 50_000, 'applications': 1_000_000, 'messages': 5_000_000}
+PASSWORD = 'seed-password'
+BENCH_STUDENT = 'bench-student@seed.example.com'
+BENCH_ALUMNI = 'bench-alumni@seed.example.com'
+ADMIN_EMAIL = 'admin@college.edu'
+ADMIN_PASSWORD = 'admin123'
+HISTORY_DAYS = 730
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Rohan', 'Saanvi',
+               'Arjun', 'Priya', 'Rahul', 'Sneha', 'Karan', 'Neha', 'Vikram', 'Pooja', 'Aman', 'Riya']
+LAST_NAMES = ['Sharma', 'Verma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Singh', 'Das', 'Kulkarni',
+              'Mehta', 'Joshi', 'Rao', 'Banerjee', 'Chopra', 'Menon', 'Pillai', 'Shah', 'Bose', 'Kapoor']
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics', 'Mechanical', 'Civil',
+               'Electrical', 'Chemical', 'Biotechnology']
+COMPANIES = ['Infosys', 'TCS', 'Wipro', 'Google', 'Microsoft', 'Amazon', 'Flipkart', 'Zomato', 'Swiggy',
+             'Razorpay', 'Freshworks', 'Atlassian', 'Adobe', 'Oracle', 'Accenture', 'Deloitte']
+POSITIONS = ['Software Engineer', 'Senior Software Engineer', 'Data Scientist', 'Product Manager',
+             'Engineering Manager', 'DevOps Engineer', 'Analyst', 'Consultant', 'Designer']
+LOCATIONS = ['Bengaluru', 'Hyderabad', 'Pune', 'Mumbai', 'Chennai', 'Delhi NCR', 'Remote']
+JOB_TYPES = ['full-time', 'full-time', 'full-time', 'internship', 'internship', 'part-time', 'contract']
+SKILLS = ['Python', 'Java', 'JavaScript', 'React', 'Node.js', 'SQL', 'MySQL', 'Flask', 'Django', 'AWS',
+          'Docker', 'Kubernetes', 'Machine Learning', 'Data Analysis', 'C++', 'Go', 'TypeScript', 'Git',
+          'Linux', 'Spring Boot', 'Figma', 'Excel', 'Tableau', 'TensorFlow', 'MATLAB', 'AutoCAD']
+STATUSES = ['pending'] * 6 + ['reviewed'] * 2 + ['shortlisted', 'rejected', 'rejected', 'accepted']
+PHRASES = ['Thanks for connecting!', 'Could you refer me for the opening?', 'Sure, send me your resume.',
+           'How was your interview prep?', 'I have shared the link.', 'Let us catch up this weekend.',
+           'What does your team work on?', 'Congrats on the offer!', 'Any tips for the coding round?']
+DESCRIPTION = ('We are hiring a {title} to join our {location} team. You will design, build and operate '
+               'services used by millions of customers, work closely with product and design, and '
+               'mentor junior engineers. Strong fundamentals and curiosity matter more than any stack.')
+
+
+def scaled_sizes(scale, overrides):
+    sizes = {name: max(1, int(count * scale)) for name, count in FULL_SIZES.items()}
+    sizes.update({name: count for name, count in overrides.items() if count is not None})
+    sizes['users'] = max(sizes['users'], 4)
+    return sizes
+
+
+def heavy_tail(rng, total, buckets, cap=None, alpha=1.2):
+    """Split total into buckets with Pareto-distributed sizes, largest first"""
+    if cap is not None:
+        total = min(total, cap * buckets)
+    weights = sorted((rng.paretovariate(alpha) for _ in range(buckets)), reverse=True)
+    scale = total / sum(weights)
+    sizes = [min(max(1, int(w * scale)), cap or total) for w in weights]
+    # Hand the rounding remainder to the smaller buckets
+    remainder = total - sum(sizes)
+    while remainder > 0:
+        for i in range(len(sizes) - 1, -1, -1):
+            if remainder == 0:
+                break
+            if cap is None or sizes[i] < cap:
+                sizes[i] += 1
+                remainder -= 1
+    return sizes
+
+
+class Loader:
+    """Batched executemany inserts on one connection"""
+
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = {}
+        self.written = {}
+
+    def add(self, table, row):
+        rows = self.pending.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.pending)):
+            rows = self.pending.get(name)
+            if rows:
+                self.connection.execute(db.metadata.tables[name].insert(), rows)
+                self.connection.commit()
+                self.written[name] = self.written.get(name, 0) + len(rows)
+                self.pending[name] = []
+
+
+def _fast_load_settings(connection):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('PRAGMA synchronous=OFF')
+        connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+    elif connection.dialect.name == 'mysql':
+        connection.exec_driver_sql('SET unique_checks=0, foreign_key_checks=0')
+
+
+def _next_id(connection, model):
+    return (connection.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+
+def seed_users(rng, loader, count, first_id, password_hash, skill_ids, now):
+    students, alumni = [], []
+    for i in range(count):
+        user_id = first_id + i
+        if i == 0:
+            user_type, email = 'student', BENCH_STUDENT
+        elif i == 1:
+            user_type, email = 'alumni', BENCH_ALUMNI
+        else:
+            user_type = 'alumni' if rng.random() < 0.3 else 'student'
+            email = f'user{user_id}@seed.example.com'
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = now - timedelta(days=rng.random() * HISTORY_DAYS)
+        chosen = rng.sample(list(skill_ids), rng.randint(2, 6))
+        verified = i < 2 or rng.random() < 0.95
+
+        row = {
+            'id': user_id, 'full_name': f'{first} {last}', 'email': email, 'password_hash': password_hash,
+            'college_id': f'SEED{user_id:07d}', 'college_email': f'{first.lower()}.{user_id}@college.edu',
+            'department': rng.choice(DEPARTMENTS), 'user_type': user_type, 'is_verified': verified,
+            'is_active': i < 2 or rng.random() < 0.98, 'skills': json.dumps(chosen),
+            'passing_year': None, 'current_company': None, 'current_position': None, 'bio': None,
+            'expected_passing_year': None, 'current_year': None,
+            'created_at': created_at, 'updated_at': created_at,
+        }
+        if user_type == 'alumni':
+            company = rng.choice(COMPANIES)
+            row.update({
+                'passing_year': rng.randint(2005, 2024), 'current_company': company,
+                'current_position': rng.choice(POSITIONS),
+                'bio': f'{rng.choice(POSITIONS)} at {company}. Happy to help juniors with referrals and interviews.',
+            })
+            alumni.append((user_id, verified))
+        else:
+            row.update({'expected_passing_year': rng.randint(2025, 2029), 'current_year': rng.randint(1, 4)})
+            students.append((user_id, verified))
+        loader.add('users', row)
+        for name in chosen:
+            loader.add('user_skills', {'user_id': user_id, 'skill_id': skill_ids[name]})
+    loader.flush()
+    # Only verified users post and apply, as the API enforces
+    return [u for u, ok in students if ok], [u for u, ok in alumni if ok]
+
+
+def seed_jobs(rng, loader, count, first_id, alumni, now):
+    for i in range(count):
+        alumni_id = alumni[0] if i == 0 else rng.choice(alumni)
+        title, location = rng.choice(POSITIONS), rng.choice(LOCATIONS)
+        created_at = now - timedelta(days=rng.random() * HISTORY_DAYS)
+        loader.add('jobs', {
+            'id': first_id + i, 'alumni_id': alumni_id, 'title': title, 'company': rng.choice(COMPANIES),
+            'location': location, 'job_type': rng.choice(JOB_TYPES),
+            'description': DESCRIPTION.format(title=title, location=location),
+            'requirements': ', '.join(rng.sample(SKILLS, 4)),
+            'salary_range': f'{rng.randint(4, 30)}-{rng.randint(31, 60)} LPA',
+            'application_deadline': created_at + timedelta(days=30),
+            'is_active': rng.random() < 0.8, 'created_at': created_at, 'updated_at': created_at,
+        })
+    loader.flush()
+
+
+def seed_applications(rng, loader, count, first_job_id, jobs, students, now):
+    # Popular jobs get most applications; a student applies to a job at most once
+    sizes = heavy_tail(rng, count, jobs, cap=len(students))
+    for offset, size in enumerate(sizes):
+        job_id = first_job_id + offset
+        applicants = rng.sample(students, size)
+        if offset == 0 and students[0] not in applicants:
+            applicants[0] = students[0]
+        for student_id in applicants:
+            applied_at = now - timedelta(days=rng.random() * HISTORY_DAYS)
+            updated_at = applied_at + timedelta(days=rng.random() * 10)
+            loader.add('applications', {
+                'job_id': job_id, 'student_id': student_id, 'status': rng.choice(STATUSES),
+                'cover_letter': 'I would love to contribute to your team.',
+                'applied_at': applied_at, 'updated_at': updated_at,
+            })
+    loader.flush()
+
+
+def seed_messages(rng, loader, count, first_conversation_id, students, alumni, now):
+    conversations = max(1, count // 40)
+    pairs = [(students[0], alumni[0])]
+    seen = set(pairs)
+    while len(pairs) < conversations:
+        pair = (rng.choice(students), rng.choice(alumni))
+        if pair not in seen:
+            seen.add(pair)
+            pairs.append(pair)
+        elif len(seen) >= len(students) * len(alumni):
+            break
+
+    for offset, ((student_id, alumni_id), size) in enumerate(zip(pairs, heavy_tail(rng, count, len(pairs)))):
+        created_at = now - timedelta(days=rng.random() * HISTORY_DAYS)
+        step = (now - created_at) / (size + 1)
+        sent_at = created_at
+        for n in range(size):
+            sent_at += step
+            sender, receiver = (student_id, alumni_id) if rng.random() < 0.5 else (alumni_id, student_id)
+            loader.add('messages', {
+                'sender_id': sender, 'receiver_id': receiver, 'content': rng.choice(PHRASES),
+                'is_read': n < size - 3 or rng.random() < 0.5, 'created_at': sent_at,
+            })
+        loader.add('conversations', {
+            'id': first_conversation_id + offset, 'user1_id': student_id, 'user2_id': alumni_id,
+            'last_message_at': sent_at, 'created_at': created_at,
+        })
+    loader.flush()
+
+
+def ensure_admin():
+    if User.query.filter_by(email=ADMIN_EMAIL).first():
+        return
+    admin = User(full_name='Admin User', email=ADMIN_EMAIL, college_id='ADMIN001',
+                 college_email=ADMIN_EMAIL, department='Administration', user_type='alumni',
+                 is_verified=True, is_active=True)
+    admin.set_password(ADMIN_PASSWORD)
+    db.session.add(admin)
+    db.session.commit()
+
+
+def seed(sizes, rng_seed=42, batch_size=5000, password=PASSWORD, log=print):
+    """Generate a dataset of the given sizes; requires an app context"""
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    if User.query.filter_by(email=BENCH_STUDENT).first():
+        raise RuntimeError('This database has already been seeded')
+
+    ensure_admin()
+    skill_ids = {skill.name: skill.id for skill in get_or_create_skills(SKILLS)}
+    db.session.commit()
+    template = User()
+    template.set_password(password)
+
+    with db.engine.connect() as connection:
+        _fast_load_settings(connection)
+        loader = Loader(connection, batch_size)
+        first_user, first_job, first_conversation = (
+            _next_id(connection, User), _next_id(connection, Job), _next_id(connection, Conversation))
+
+        started = time.perf_counter()
+        students, alumni = seed_users(rng, loader, sizes['users'], first_user,
+                                      template.password_hash, skill_ids, now)
+        log(f"users: {sizes['users']:,} ({time.perf_counter() - started:.1f}s)")
+
+        started = time.perf_counter()
+        seed_jobs(rng, loader, sizes['jobs'], first_job, alumni, now)
+        log(f"jobs: {sizes['jobs']:,} ({time.perf_counter() - started:.1f}s)")
+
+        started = time.perf_counter()
+        seed_applications(rng, loader, sizes['applications'], first_job, sizes['jobs'], students, now)
+        log(f"applications: {loader.written.get('applications', 0):,} ({time.perf_counter() - started:.1f}s)")
+
+        started = time.perf_counter()
+        seed_messages(rng, loader, sizes['messages'], first_conversation, students, alumni, now)
+        log(f"messages: {loader.written.get('messages', 0):,} in {loader.written.get('conversations', 0):,} "
+            f"conversations ({time.perf_counter() - started:.1f}s)")
+
+    # Rollups the write paths would have maintained
+    reconcile_stats()
+    backfill((now - timedelta(days=HISTORY_DAYS + 1)).date(), now.date())
+    return loader.written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic load-test data')
+    parser.add_argument('--scale', type=float, default=1.0, help='Fraction of the full dataset (default 1.0)')
+    for name in FULL_SIZES:
+        parser.add_argument(f'--{name}', type=int, help=f'Override the {name} count (full: {FULL_SIZES[name]:,})')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed, for repeatable datasets')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    sizes = scaled_sizes(args.scale, {name: getattr(args, name) for name in FULL_SIZES})
+    app = create_app()
+    create_schema(app)
+
+    with app.app_context():
+        try:
+            print(f"Seeding {', '.join(f'{k}={v:,}' for k, v in sizes.items())}...")
+            seed(sizes, rng_seed=args.seed, batch_size=args.batch_size)
+            print(f"✅ Done. Benchmark accounts: {BENCH_STUDENT} / {BENCH_ALUMNI}, password '{PASSWORD}'")
+        except Exception as e:
+            print(f"❌ Error seeding data: {str(e)}")
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Column-projected serializers.
+
+Each serializer declares the keys of one response shape, the column each
+key comes from and the joins those columns need. serialize() rewrites an
+existing filtered/ordered query to select exactly those columns in one
+statement and turns the result rows straight into dicts, so list
+endpoints never build ORM objects or follow lazy relationships per row.
+The output matches the models' to_dict() exactly.
+
+FastJSONProvider encodes responses with orjson when it is installed.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+from models import db, User, Job, Application, Message
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class Serializer:
+    """A response shape: (key, column) fields, the joins they need and an optional variant
+
+    variant is (discriminator key, {value: [extra keys]}): every key listed in
+    any variant is dropped from rows unless it belongs to that row's value.
+    """
+
+    def __init__(self, fields, joins=(), variant=None):
+        self.keys = [key for key, _ in fields]
+        self.columns = [column.label(key) for key, column in fields]
+        self.joins = list(joins)
+        self.dates = [i for i, (_, column) in enumerate(fields)
+                      if isinstance(column.type, (db.DateTime, db.Date))]
+
+        self.variants = None
+        if variant is not None:
+            discriminator, extras = variant
+            optional = {key for keys in extras.values() for key in keys}
+            base = [i for i, key in enumerate(self.keys) if key not in optional]
+            self.discriminator = self.keys.index(discriminator)
+            self.variants = {
+                value: base + [self.keys.index(key) for key in keys]
+                for value, keys in extras.items()
+            }
+            self.default_variant = base
+
+    def query(self, query):
+        query = query.with_entities(*self.columns)
+        for target, condition in self.joins:
+            query = query.outerjoin(target, condition)
+        return query
+
+    def row(self, row):
+        values = list(row)
+        for i in self.dates:
+            if values[i] is not None:
+                values[i] = values[i].isoformat()
+        if self.variants is None:
+            return dict(zip(self.keys, values))
+        indexes = self.variants.get(values[self.discriminator], self.default_variant)
+        keys = self.keys
+        return {keys[i]: values[i] for i in indexes}
+
+
+def serialize(query, serializer):
+    """Run query projected onto the serializer's columns; returns a list of dicts"""
+    return [serializer.row(row) for row in serializer.query(query)]
+
+
+Alumni = db.aliased(User)
+Student = db.aliased(User)
+Sender = db.aliased(User)
+Receiver = db.aliased(User)
+
+USER = Serializer([
+    ('id', User.id),
+    ('full_name', User.full_name),
+    ('email', User.email),
+    ('college_id', User.college_id),
+    ('college_email', User.college_email),
+    ('department', User.department),
+    ('user_type', User.user_type),
+    ('is_verified', User.is_verified),
+    ('is_active', User.is_active),
+    ('profile_picture', User.profile_picture),
+    ('skills', User.skills),
+    ('created_at', User.created_at),
+    ('passing_year', User.passing_year),
+    ('current_company', User.current_company),
+    ('current_position', User.current_position),
+    ('bio', User.bio),
+    ('linkedin_url', User.linkedin_url),
+    ('github_url', User.github_url),
+    ('expected_passing_year', User.expected_passing_year),
+    ('current_year', User.current_year),
+], variant=('user_type', {
+    'alumni': ['passing_year', 'current_company', 'current_position', 'bio', 'linkedin_url', 'github_url'],
+    'student': ['expected_passing_year', 'current_year'],
+}))
+
+JOB = Serializer([
+    ('id', Job.id),
+    ('alumni_id', Job.alumni_id),
+    ('alumni_name', Alumni.full_name),
+    ('title', Job.title),
+    ('company', Job.company),
+    ('location', Job.location),
+    ('job_type', Job.job_type),
+    ('description', Job.description),
+    ('requirements', Job.requirements),
+    ('salary_range', Job.salary_range),
+    ('application_deadline', Job.application_deadline),
+    ('is_active', Job.is_active),
+    ('created_at', Job.created_at),
+    ('applications_count', db.select(db.func.count(Application.id))
+                             .where(Application.job_id == Job.id).scalar_subquery()),
+], joins=[(Alumni, Job.alumni_id == Alumni.id)])
+
+APPLICATION = Serializer([
+    ('id', Application.id),
+    ('job_id', Application.job_id),
+    ('job_title', Job.title),
+    ('student_id', Application.student_id),
+    ('student_name', Student.full_name),
+    ('student_email', Student.email),
+    ('cover_letter', Application.cover_letter),
+    ('resume_path', Application.resume_path),
+    ('status', Application.status),
+    ('applied_at', Application.applied_at),
+], joins=[(Job, Application.job_id == Job.id), (Student, Application.student_id == Student.id)])
+
+MESSAGE = Serializer([
+    ('id', Message.id),
+    ('sender_id', Message.sender_id),
+    ('sender_name', Sender.full_name),
+    ('receiver_id', Message.receiver_id),
+    ('receiver_name', Receiver.full_name),
+    ('content', Message.content),
+    ('is_read', Message.is_read),
+    ('created_at', Message.created_at),
+], joins=[(Sender, Message.sender_id == Sender.id), (Receiver, Message.receiver_id == Receiver.id)])
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the default encoder"""
+
+    # Datetimes still go through Flask's default hook so their format doesn't change
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+               if orjson is not None else 0)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or self._app.debug or self.compact is False:
+            return super().response(obj)
+        body = orjson.dumps(obj, default=self.default, option=self.OPTIONS) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
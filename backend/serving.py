@@ -0,0 +1,82 @@
+"""
+Sync and gevent serving modes.
+
+gunicorn.conf.py picks the worker class from GUNICORN_WORKER_CLASS. A sync
+worker serves one request at a time, so a request that waits (a long-poll,
+a slow client) holds the whole worker. A gevent worker monkey-patches
+sockets, locks and sleeps before the app is imported and carries up to
+GUNICORN_WORKER_CONNECTIONS requests, switching between them whenever one
+waits on the network or the database. PyMySQL and SQLite need nothing
+more; psycopg2 is made cooperative with psycogreen by patch_drivers().
+
+Code that waits has to play along:
+- wait_for() closes the request's session between checks, so a parked
+  request holds no pool connection (the pool is far smaller than the
+  number of connections a gevent worker accepts)
+- offload() runs CPU-bound calls on gevent's native thread pool, so they
+  don't stall every other request in the worker
+- long_poll_seconds() caps waits at CHAT_LONG_POLL_SECONDS under gevent
+  and CHAT_LONG_POLL_SYNC_SECONDS (default 0: answer at once) under sync
+  workers
+"""
+
+import time
+from flask import current_app, g
+
+
+def cooperative():
+    """True when running under gevent's monkey patches"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+def patch_drivers(app):
+    """Make C database drivers yield to gevent; a no-op under sync workers"""
+    if not cooperative() or not app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres'):
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        app.logger.warning('psycogreen is not installed; psycopg2 queries will block the gevent worker')
+        return
+    patch_psycopg()
+
+
+def offload(fn, *args):
+    """Call fn(*args) on a native thread under gevent, inline otherwise"""
+    if not cooperative():
+        return fn(*args)
+    import gevent
+    return gevent.get_hub().threadpool.apply(fn, args)
+
+
+def long_poll_seconds(requested=None):
+    """How long this request may wait, given the client's requested timeout"""
+    config = current_app.config
+    limit = config['CHAT_LONG_POLL_SECONDS'] if cooperative() else config['CHAT_LONG_POLL_SYNC_SECONDS']
+    if requested is None:
+        return limit
+    return max(0.0, min(requested, limit))
+
+
+def wait_for(check, timeout, interval):
+    """Call check() until it returns something truthy or timeout seconds pass
+
+    The session is closed between checks, so the wait holds no database
+    connection. Time spent asleep is recorded in g.idle_seconds, which the
+    slow-request log leaves out.
+    """
+    from models import db
+    deadline = time.monotonic() + timeout
+    while True:
+        result = check()
+        remaining = deadline - time.monotonic()
+        if result or remaining <= 0:
+            return result
+        db.session.close()
+        pause = min(interval, remaining)
+        time.sleep(pause)
+        g.idle_seconds = g.get('idle_seconds', 0.0) + pause
@@ -0,0 +1,175 @@
+"""
+Skills taxonomy helpers.
+
+Skill names are canonicalized to a slug (lowercase, collapsed whitespace) and
+resolved through the skill_aliases table, so "K8s", "kubernetes" and
+"Kubernetes " all map to the same Skill row.
+"""
+
+import json
+import re
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Skill, SkillAlias, user_skills
+
+# Built-in aliases, seeded into skill_aliases by migrate_skills.py
+DEFAULT_ALIASES = {
+    'k8s': 'kubernetes',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'golang': 'go',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'postgres': 'postgresql',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'c plus plus': 'c++',
+    'cpp': 'c++',
+}
+
+MAX_SKILL_LENGTH = 100
+
+
+def slugify_skill(name):
+    """Normalize a raw skill name to its lookup key"""
+    slug = re.sub(r'\s+', ' ', str(name)).strip().lower()
+    return slug[:MAX_SKILL_LENGTH]
+
+
+def parse_skills(value):
+    """Parse skills from a list, a JSON array string or a comma-separated string"""
+    if value is None:
+        return []
+
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.split(',')
+
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+
+    names = []
+    seen = set()
+    for item in value:
+        if item is None:
+            continue
+        name = re.sub(r'\s+', ' ', str(item)).strip()[:MAX_SKILL_LENGTH]
+        slug = slugify_skill(name)
+        if slug and slug not in seen:
+            seen.add(slug)
+            names.append(name)
+    return names
+
+
+def canonical_slugs(names):
+    """Map each raw name to its canonical slug, applying aliases in one query"""
+    slugs = {name: slugify_skill(name) for name in names}
+    slugs = {name: slug for name, slug in slugs.items() if slug}
+    if not slugs:
+        return {}
+
+    # Stored aliases take precedence over the built-in table
+    stored = dict(
+        db.session.query(SkillAlias.alias, Skill.slug)
+        .join(Skill, SkillAlias.skill_id == Skill.id)
+        .filter(SkillAlias.alias.in_(set(slugs.values())))
+        .all()
+    )
+
+    return {
+        name: stored.get(slug) or DEFAULT_ALIASES.get(slug, slug)
+        for name, slug in slugs.items()
+    }
+
+
+def resolve_slugs(names):
+    """Return the distinct canonical slugs for the given names"""
+    resolved = []
+    for slug in canonical_slugs(names).values():
+        if slug not in resolved:
+            resolved.append(slug)
+    return resolved
+
+
+def find_skill_ids(slugs):
+    """Return ids of existing skills with the given canonical slugs"""
+    if not slugs:
+        return []
+    rows = db.session.query(Skill.id).filter(Skill.slug.in_(slugs)).all()
+    return [r[0] for r in rows]
+
+
+def get_or_create_skills(names):
+    """Return Skill rows for the given names, creating missing ones"""
+    display_names = {}
+    for name, slug in canonical_slugs(names).items():
+        if slug not in display_names:
+            # Aliased names keep the canonical slug as their display name
+            display_names[slug] = name if slugify_skill(name) == slug else slug
+
+    if not display_names:
+        return []
+
+    by_slug = _find_skills(list(display_names))
+    # Flush the caller's pending rows first so their errors aren't taken for a skill conflict
+    db.session.flush()
+    for slug, name in display_names.items():
+        if slug not in by_slug:
+            by_slug[slug] = _create_skill(name, slug)
+
+    return [by_slug[slug] for slug in display_names]
+
+
+def _find_skills(slugs):
+    return {skill.slug: skill for skill in Skill.query.filter(Skill.slug.in_(slugs))}
+
+
+def _create_skill(name, slug):
+    """Insert one skill in a savepoint; if a concurrent request just added it, use that row"""
+    try:
+        with db.session.begin_nested():
+            skill = Skill(name=name, slug=slug)
+            db.session.add(skill)
+        return skill
+    except IntegrityError:
+        return Skill.query.filter_by(slug=slug).one()
+
+
+def set_user_skills(user, value):
+    """Replace a user's skills and refresh the denormalized JSON column"""
+    skills = get_or_create_skills(parse_skills(value))
+    user.skill_set = skills
+    user.skills = json.dumps([skill.name for skill in skills])
+    return skills
+
+
+def filter_by_skills(query, value, match_all=True):
+    """Restrict a User query to users having the given skills via index joins"""
+    names = parse_skills(value)
+    if not names:
+        return query
+
+    slugs = resolve_slugs(names)
+    skill_ids = find_skill_ids(slugs)
+    if match_all and len(skill_ids) < len(slugs):
+        # At least one requested skill is unknown, so nobody can match all
+        return query.filter(db.false())
+    if not skill_ids:
+        return query.filter(db.false())
+
+    matching = db.select(user_skills.c.user_id).where(user_skills.c.skill_id.in_(skill_ids))
+    if match_all and len(skill_ids) > 1:
+        matching = matching.group_by(user_skills.c.user_id).having(
+            db.func.count(user_skills.c.skill_id) == len(skill_ids)
+        )
+
+    return query.filter(User.id.in_(matching))
@@ -0,0 +1,137 @@
+"""
+User statistics rollup.
+
+The admin and public stats endpoints read their college's stats_rollup row
+instead of counting users. Routes that create users or change is_verified/is_active
+call record_user_change() with the user's state before and after, which
+applies the difference as an atomic "col = col + delta" UPDATE in the same
+transaction. reconcile_stats() rebuilds the row from one GROUP BY query to
+correct any drift (run periodically via reconcile_stats.py).
+
+init_db.py and create_tenant.py create each college's row up front. If a
+delta arrives while the row is missing anyway, an empty row is inserted
+first so the delta isn't lost; it stays unreconciled (reconciled_at is
+NULL) until the reconcile job fills in the users it missed, and get_stats()
+counts the users directly in the meantime.
+"""
+
+from collections import Counter
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models import db, User, StatsRollup
+from tenancy import current_tenant_id
+
+# Counter name -> predicate over (user_type, is_verified, is_active)
+COUNTERS = {
+    'total_users': lambda t, v, a: True,
+    'verified_users': lambda t, v, a: v,
+    'pending_users': lambda t, v, a: not v,
+    'active_users': lambda t, v, a: a and v,
+    'total_students': lambda t, v, a: t == 'student',
+    'total_alumni': lambda t, v, a: t == 'alumni',
+    'verified_students': lambda t, v, a: t == 'student' and v,
+    'verified_alumni': lambda t, v, a: t == 'alumni' and v,
+    'active_students': lambda t, v, a: t == 'student' and v and a,
+    'active_alumni': lambda t, v, a: t == 'alumni' and v and a,
+}
+
+
+def user_state(user):
+    """The (user_type, is_verified, is_active) triple the counters depend on"""
+    is_active = True if user.is_active is None else bool(user.is_active)
+    return (user.user_type, bool(user.is_verified), is_active)
+
+
+def _contributions(state, weight=1):
+    counts = Counter()
+    if state is not None:
+        for name, predicate in COUNTERS.items():
+            if predicate(*state):
+                counts[name] += weight
+    return counts
+
+
+def _create_row():
+    """Insert the current college's zeroed row; a concurrent insert wins the race"""
+    try:
+        with db.session.begin_nested():
+            db.session.execute(StatsRollup.__table__.insert().values(tenant_id=current_tenant_id()))
+    except IntegrityError:
+        pass
+
+
+def _apply(deltas):
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    table = StatsRollup.__table__
+    values = {name: table.c[name] + delta for name, delta in deltas.items()}
+    values['updated_at'] = datetime.utcnow()
+    # Scoped to the current college's row by tenancy
+    update = table.update().values(values)
+    if db.session.execute(update).rowcount == 0:
+        _create_row()
+        db.session.execute(update)
+
+
+def record_user_change(before, after):
+    """Apply the counter delta for one user moving from state before to after (None = absent)"""
+    record_user_changes([(before, after)])
+
+
+def record_user_changes(changes):
+    """Apply the combined counter delta for many (before, after) transitions in one UPDATE"""
+    deltas = Counter()
+    for (before, after), count in Counter(changes).items():
+        deltas.update(_contributions(after, count))
+        deltas.subtract(_contributions(before, count))
+    _apply(deltas)
+
+
+def record_new_users(states):
+    """Apply counter deltas for a batch of newly created users"""
+    deltas = Counter()
+    for state, count in Counter(states).items():
+        deltas.update(_contributions(state, count))
+    _apply(deltas)
+
+
+def compute_stats():
+    """Count every counter with a single conditional-aggregate query"""
+    rows = (
+        db.session.query(User.user_type, User.is_verified, User.is_active, db.func.count(User.id))
+        .filter(User.deleted_at.is_(None))
+        .group_by(User.user_type, User.is_verified, User.is_active)
+        .all()
+    )
+    counts = Counter({name: 0 for name in COUNTERS})
+    for user_type, is_verified, is_active, count in rows:
+        is_active = True if is_active is None else bool(is_active)
+        counts.update(_contributions((user_type, bool(is_verified), is_active), count))
+    return dict(counts)
+
+
+def reconcile_stats():
+    """Rebuild the current college's rollup row from the users table; returns the drift that was fixed"""
+    actual = compute_stats()
+    row = StatsRollup.query.with_for_update().first()
+    if row is None:
+        _create_row()
+        row = StatsRollup.query.with_for_update().first()
+    drift = {name: actual[name] - getattr(row, name) for name in COUNTERS
+             if actual[name] != getattr(row, name)}
+
+    for name, value in actual.items():
+        setattr(row, name, value)
+    row.reconciled_at = datetime.utcnow()
+    db.session.commit()
+    return drift
+
+
+def get_stats():
+    """Read the rollup row; never writes, so it is safe in read-only (replica) requests"""
+    row = StatsRollup.query.first()
+    if row is None or row.reconciled_at is None:
+        # Missing or holding only deltas: count without saving, the reconcile job fixes the row
+        return compute_stats()
+    return {name: getattr(row, name) for name in COUNTERS}
@@ -0,0 +1,59 @@
+"""
+Background task worker.
+Runs queued tasks (emails, notification checks and feed fan-out; see
+tasks.py), leasing up to TASK_BATCH_SIZE at a time. Safe to run several copies, or several
+processes with --processes; tasks leased by a worker that dies run again
+once the lease expires. Tasks of colleges in the shared tables are run by
+the default workers; a college with its own database or schema needs its
+own workers started with --tenant.
+
+Usage: python task_worker.py [--once] [--poll SECONDS] [--processes N] [--tenant ID]
+"""
+
+import argparse
+import multiprocessing
+import time
+from app import create_app
+from tasks import run_pending_tasks
+from tenancy import tenant_context
+import mailer  # noqa: F401  registers task handlers
+import notifications  # noqa: F401
+import feed  # noqa: F401
+
+
+def work(once, poll, tenant_id=None):
+    app = create_app()
+
+    while True:
+        with app.app_context(), tenant_context(tenant_id):
+            processed = run_pending_tasks()
+        if processed:
+            print(f"✅ Processed {processed} tasks")
+        elif once:
+            break
+        else:
+            time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued background tasks')
+    parser.add_argument('--once', action='store_true', help='Exit when no task is due')
+    parser.add_argument('--poll', type=float, default=2, help='Seconds to wait when no task is due')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes to run')
+    parser.add_argument('--tenant', type=int, help="Work on this college's own database")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        work(args.once, args.poll, args.tenant)
+        return
+
+    processes = [multiprocessing.Process(target=work, args=(args.once, args.poll, args.tenant))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
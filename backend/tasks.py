@@ -0,0 +1,184 @@
+"""
+Durable background tasks.
+
+enqueue() adds a row to the tasks table in the caller's transaction, so a
+task exists exactly when the write that asked for it commits, and the
+request never waits on the work itself. task_worker.py runs due tasks: it
+leases up to TASK_BATCH_SIZE of them with one conditional UPDATE (each
+claim writes its own lease token into locked_by, so two workers never run
+the same task), calls the handler registered for each task's name, and
+marks the task done or reschedules it with exponential backoff
+(TASK_RETRY_BACKOFF * 2^(attempts - 1) seconds, at most
+TASK_RETRY_MAX_BACKOFF) until max_attempts is used up. If a worker dies
+its lease lapses after TASK_LEASE_SECONDS and the tasks run again, so
+handlers must tolerate being run twice.
+
+A handler registered with batch=True is called once with every leased
+payload of its name (the email sender uses this to send over one SMTP
+connection) and returns one error, or None, per payload. Raising
+PermanentError, or returning one, fails a task without further retries.
+"""
+
+import json
+import os
+import socket
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, Task
+from tenancy import ALL_TENANTS, tenant_context
+
+_handlers = {}  # name -> (function, batch)
+
+
+class PermanentError(Exception):
+    """A failure that retrying won't fix, e.g. a refused recipient"""
+
+
+def task(name, batch=False):
+    """Register a handler for tasks called name"""
+    def decorator(fn):
+        _handlers[name] = (fn, batch)
+        return fn
+    return decorator
+
+
+def enqueue(name, payload, delay=0, max_attempts=None):
+    """Queue one task; commits with the caller's transaction"""
+    job = Task(
+        name=name,
+        payload=json.dumps(payload),
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts or current_app.config['TASK_MAX_ATTEMPTS'],
+    )
+    db.session.add(job)
+    return job
+
+
+def enqueue_many(name, payloads, delay=0):
+    """Queue many tasks with one INSERT"""
+    if not payloads:
+        return
+    now = datetime.utcnow()
+    rows = [{'name': name, 'payload': json.dumps(p), 'status': 'pending', 'attempts': 0,
+             'max_attempts': current_app.config['TASK_MAX_ATTEMPTS'],
+             'run_at': now + timedelta(seconds=delay), 'created_at': now}
+            for p in payloads]
+    db.session.execute(db.insert(Task), rows)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _runnable(now):
+    return db.or_(
+        db.and_(Task.status == 'pending', Task.run_at <= now),
+        # Leased by a worker that never finished
+        db.and_(Task.status == 'running', Task.locked_until < now),
+    )
+
+
+def claim_tasks(worker, limit):
+    """Lease up to limit due tasks of any college, oldest first"""
+    now = datetime.utcnow()
+    ids = [r[0] for r in db.session.query(Task.id).filter(_runnable(now))
+           .order_by(Task.run_at, Task.id).limit(limit).execution_options(**{ALL_TENANTS: True})]
+    if not ids:
+        return []
+
+    lease = f'{worker}:{uuid.uuid4().hex[:12]}'
+    db.session.execute(
+        db.update(Task)
+        .where(Task.id.in_(ids), _runnable(now))
+        .values(status='running', locked_by=lease, attempts=Task.attempts + 1,
+                locked_until=now + timedelta(seconds=current_app.config['TASK_LEASE_SECONDS']))
+        .execution_options(synchronize_session=False, **{ALL_TENANTS: True})
+    )
+    db.session.commit()
+    return (Task.query.filter(Task.locked_by == lease, Task.status == 'running').order_by(Task.id)
+            .execution_options(**{ALL_TENANTS: True}).all())
+
+
+def _backoff(attempts):
+    config = current_app.config
+    return min(config['TASK_RETRY_BACKOFF'] * 2 ** (attempts - 1), config['TASK_RETRY_MAX_BACKOFF'])
+
+
+def _finish(job, error):
+    """Mark a leased task done, rescheduled or failed (the caller commits)"""
+    now = datetime.utcnow()
+    job.locked_by = None
+    job.locked_until = None
+    if error is None:
+        job.status = 'done'
+        job.finished_at = now
+        return
+    job.last_error = str(error)[:2000] or type(error).__name__
+    if isinstance(error, PermanentError) or job.attempts >= job.max_attempts:
+        job.status = 'failed'
+        job.finished_at = now
+    else:
+        job.status = 'pending'
+        job.run_at = now + timedelta(seconds=_backoff(job.attempts))
+
+
+def _run_group(name, jobs):
+    handler = _handlers.get(name)
+    if handler is None:
+        for job in jobs:
+            _finish(job, PermanentError(f'No handler registered for {name}'))
+        db.session.commit()
+        return
+
+    fn, batch = handler
+    if batch:
+        try:
+            errors = fn([json.loads(job.payload) for job in jobs])
+        except Exception as e:
+            db.session.rollback()
+            errors = [e] * len(jobs)
+        for job, error in zip(jobs, errors):
+            _finish(job, error)
+        db.session.commit()
+        return
+
+    for job in jobs:
+        # The handler's own writes commit together with the task's completion
+        try:
+            fn(json.loads(job.payload))
+            error = None
+        except Exception as e:
+            db.session.rollback()
+            error = e
+        _finish(job, error)
+        db.session.commit()
+
+
+def run_tasks(jobs):
+    """Run leased tasks as the college that queued them, grouped by name so batch handlers see them together"""
+    groups = defaultdict(list)
+    for job in jobs:
+        if job.attempts > job.max_attempts:
+            # Its leases keep lapsing, e.g. it crashes the worker
+            _finish(job, PermanentError(job.last_error or 'Lease expired on every attempt'))
+            db.session.commit()
+            continue
+        groups[(job.tenant_id, job.name)].append(job)
+    for (tenant_id, name), group in groups.items():
+        with tenant_context(tenant_id):
+            _run_group(name, group)
+
+
+def run_pending_tasks(limit=None):
+    """Process due tasks until none are left (or about limit have run)"""
+    me = worker_id()
+    processed = 0
+    while limit is None or processed < limit:
+        jobs = claim_tasks(me, current_app.config['TASK_BATCH_SIZE'])
+        if not jobs:
+            break
+        run_tasks(jobs)
+        processed += len(jobs)
+    return processed
@@ -0,0 +1,207 @@
+"""
+Multi-college tenancy.
+
+Each college is a row in tenants, and every table holding a college's data
+has a tenant_id column (the TenantScoped mixin). The current tenant comes
+from, in order:
+- tenant_context(), used by workers and scripts
+- the tid claim in the request's access token
+- the X-Tenant header (a tenant slug) or a Host matching a tenant's domain,
+  checked in resolve_tenant() before each request
+- DEFAULT_TENANT_ID, the college a single-college deployment runs as
+
+Scoping is automatic: ORM SELECT, UPDATE and DELETE statements get
+"tenant_id = <current tenant>" on every TenantScoped entity they touch
+(including joins and subqueries), Core UPDATE and DELETE statements on a
+scoped Table get it in their WHERE clause, and new rows, ORM or Core, get
+the current tenant_id as a column default. Core SELECTs on a scoped Table
+must filter by hand. Workers that claim queued rows for every college pass
+execution_options(all_tenants=True) and then run each row inside
+tenant_context(row.tenant_id).
+
+Tables without tenant_id are shared by the colleges in a database: the
+skills taxonomy (skills, skill_aliases) is one vocabulary for everyone, and
+user_skills rows are only ever reached through a scoped user.
+
+A large college can be moved out of the shared tables:
+TENANT_DATABASE_URLS gives it its own database, and TENANT_SCHEMAS its own
+schema on its database (or the primary's). While it is the current tenant,
+all statements except those on the tenants directory go to that bind; it
+holds a full copy of the schema (init_db.py creates it). Run one task and
+deletion worker per dedicated tenant with --tenant.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, has_request_context, jsonify, request
+from flask_jwt_extended import get_jwt
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+HEADER = 'X-Tenant'
+CLAIM = 'tid'
+ALL_TENANTS = 'all_tenants'  # execution option that disables scoping for one statement
+DIRECTORY_TABLE = 'tenants'
+
+_lock = threading.Lock()
+_directory = {}  # 'slug:<slug>' / 'domain:<host>' -> tenant id
+_loaded_at = None
+
+
+def current_tenant_id():
+    """Id of the college the current request, task or script works for"""
+    if not has_app_context():
+        return None
+    tenant_id = g.get('tenant_id')
+    if tenant_id is not None:
+        return tenant_id
+    if has_request_context():
+        try:
+            tenant_id = get_jwt().get(CLAIM)
+        except RuntimeError:
+            # No JWT was verified for this request (yet)
+            tenant_id = None
+        if tenant_id is None:
+            tenant_id = g.get('request_tenant_id')
+        if tenant_id is not None:
+            return tenant_id
+    return current_app.config['DEFAULT_TENANT_ID']
+
+
+@contextmanager
+def tenant_context(tenant_id):
+    """Run the block as tenant_id, e.g. a task queued by one college"""
+    previous = g.get('tenant_id')
+    g.tenant_id = tenant_id
+    try:
+        yield
+    finally:
+        g.tenant_id = previous
+
+
+class TenantScoped:
+    """Mixin for tables holding one college's rows"""
+    tenant_id = Column(Integer, nullable=False, default=current_tenant_id)
+
+
+def _scoped_tables():
+    """Tables of every TenantScoped model"""
+    tables, classes = set(), TenantScoped.__subclasses__()
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+        if hasattr(cls, '__table__'):
+            tables.add(cls.__table__)
+    return tables
+
+
+def _scope_statement(execute_state):
+    """do_orm_execute hook: limit statements to the current tenant's rows"""
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        # Refreshes and lazy loads follow rows that were already scoped
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    if execute_state.execution_options.get(ALL_TENANTS):
+        return
+    tenant_id = current_tenant_id()
+    statement = execute_state.statement
+    if not execute_state.is_orm_statement:
+        # Loader criteria only reach ORM entities; filter Core DML on a scoped Table directly
+        table = getattr(statement, 'table', None)
+        if not execute_state.is_select and table in _scoped_tables():
+            execute_state.statement = statement.where(table.c.tenant_id == tenant_id)
+        return
+    execute_state.statement = statement.options(
+        with_loader_criteria(TenantScoped, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+    )
+
+
+event.listen(Session, 'do_orm_execute', _scope_statement)
+
+
+def _parse_map(value):
+    """'7=value,9=value' -> {7: 'value', 9: 'value'}"""
+    pairs = (item.split('=', 1) for item in (value or '').split(',') if '=' in item)
+    return {int(key.strip()): setting.strip() for key, setting in pairs}
+
+
+def tenant_binds(config, engine_options):
+    """SQLALCHEMY_BINDS entries for tenants with their own database or schema"""
+    urls = _parse_map(config.get('TENANT_DATABASE_URLS'))
+    schemas = _parse_map(config.get('TENANT_SCHEMAS'))
+    binds = {}
+    for tenant_id in sorted(set(urls) | set(schemas)):
+        url = urls.get(tenant_id) or config['SQLALCHEMY_DATABASE_URI']
+        options = {k: v for k, v in engine_options.items() if k != 'poolclass'}
+        if url.startswith('sqlite'):
+            options.pop('connect_args', None)
+        if tenant_id in schemas:
+            options['execution_options'] = {'schema_translate_map': {None: schemas[tenant_id]}}
+        binds[bind_key(tenant_id)] = {'url': url, **options}
+    return binds
+
+
+def bind_key(tenant_id):
+    return f'tenant_{tenant_id}'
+
+
+def tenant_bind_key():
+    """The current tenant's own bind, or None if it lives in the shared tables"""
+    key = bind_key(current_tenant_id())
+    return key if key in current_app.config.get('SQLALCHEMY_BINDS', {}) else None
+
+
+def routes_to_tenant(mapper, clause):
+    """Whether a statement may follow the tenant to its own bind (everything but the directory)"""
+    if mapper is not None:
+        return mapper.local_table.name != DIRECTORY_TABLE
+    table = getattr(clause, 'table', None)
+    return getattr(table, 'name', None) != DIRECTORY_TABLE
+
+
+def _load_directory():
+    """Return the cached slug/domain -> id map, reloading it when stale"""
+    global _directory, _loaded_at
+
+    from models import db, Tenant
+
+    ttl = current_app.config['TENANT_CACHE_TTL']
+    now = time.monotonic()
+    if _loaded_at is None or now - _loaded_at > ttl:
+        with _lock:
+            if _loaded_at is None or now - _loaded_at > ttl:
+                directory = {}
+                rows = db.session.query(Tenant.id, Tenant.slug, Tenant.domain).filter(Tenant.is_active.is_(True))
+                for tenant_id, slug, domain in rows:
+                    directory[f'slug:{slug}'] = tenant_id
+                    if domain:
+                        directory[f'domain:{domain.lower()}'] = tenant_id
+                _directory = directory
+                _loaded_at = now
+    return _directory
+
+
+def forget_directory():
+    """Make this worker reload the tenants directory on its next lookup"""
+    global _loaded_at
+    _loaded_at = None
+
+
+def resolve_tenant():
+    """before_request hook: pick the tenant named by X-Tenant or the Host"""
+    slug = request.headers.get(HEADER)
+    if slug:
+        tenant_id = _load_directory().get(f'slug:{slug}')
+        if tenant_id is None:
+            return jsonify({'error': f'Unknown college: {slug}'}), 404
+        g.request_tenant_id = tenant_id
+        return None
+    g.request_tenant_id = _load_directory().get(f'domain:{request.host.split(":")[0].lower()}')
+    return None
+
+
+def all_tenant_ids():
+    from models import db, Tenant
+    return [r[0] for r in db.session.query(Tenant.id).order_by(Tenant.id)]
@@ -0,0 +1,128 @@
+"""
+Shared fixtures for the backend tests.
+
+Run from backend/: python -m pytest -q
+
+The app is built once against a throwaway SQLite file; every test starts
+from freshly created tables and empty in-process caches. College 3 is
+configured with a database of its own so tenancy tests can check routing.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Config reads the environment at import time
+_tmp = tempfile.mkdtemp(prefix='alumniconnect-tests-')
+os.environ.update({
+    'DATABASE_URL': 'sqlite:///' + os.path.join(_tmp, 'test.db'),
+    'TENANT_DATABASE_URLS': '3=sqlite:///' + os.path.join(_tmp, 'tenant3.db'),
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'PASSWORD_HASH_WORKERS': '0',
+    'RATELIMIT_BACKEND': 'memory',
+    'ADMIN_EMAILS': 'admin@college.edu',
+    'TENANT_CACHE_TTL': '0',
+})
+
+from app import create_app  # noqa: E402
+from models import db, User  # noqa: E402
+from init_db import create_schema  # noqa: E402
+from stats import record_user_change, user_state  # noqa: E402
+from tenancy import DIRECTORY_TABLE, tenant_context  # noqa: E402
+import authz  # noqa: E402
+import idempotency  # noqa: E402
+import ratelimit  # noqa: E402
+import replicas  # noqa: E402
+import tenancy  # noqa: E402
+
+PASSWORD = 'password123'
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, RATELIMIT_ENABLED=False)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def fresh_database(app):
+    with app.app_context():
+        tenant_tables = [t for t in db.metadata.sorted_tables if t.name != DIRECTORY_TABLE]
+        for key in app.config['SQLALCHEMY_BINDS']:
+            if key.startswith('tenant_'):
+                db.metadata.drop_all(db.engines[key], tables=tenant_tables)
+        db.drop_all()
+    create_schema(app)
+    authz._caches.clear()
+    idempotency.cache.clear()
+    ratelimit._backend = None
+    replicas._pins.clear()
+    tenancy.forget_directory()
+    yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """make_user(email, user_type='student', tenant_id=None, **fields) -> user id"""
+    def make(email, user_type='student', tenant_id=None, password=PASSWORD, **fields):
+        fields.setdefault('is_verified', True)
+        with app.app_context(), tenant_context(tenant_id or app.config['DEFAULT_TENANT_ID']):
+            user = User(
+                full_name=fields.pop('full_name', email.split('@')[0]),
+                email=email,
+                college_id=fields.pop('college_id', 'ID-' + email),
+                college_email=fields.pop('college_email', 'college.' + email),
+                department=fields.pop('department', 'CS'),
+                user_type=user_type,
+                **fields
+            )
+            user.set_password(password)
+            db.session.add(user)
+            record_user_change(None, user_state(user))
+            db.session.commit()
+            return user.id
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """login(email, headers=None) -> Authorization header for that user"""
+    def log_in(email, password=PASSWORD, headers=None):
+        response = client.post('/api/auth/login', json={'email': email, 'password': password},
+                               headers=headers or {})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+    return log_in
+
+
+@pytest.fixture
+def admin(make_user, login):
+    make_user('admin@college.edu', 'alumni')
+    return login('admin@college.edu')
+
+
+@pytest.fixture
+def posting(client, make_user, login):
+    """An alumni's job with one student application; returns their headers and ids"""
+    make_user('alum@x.edu', 'alumni')
+    make_user('student@x.edu')
+    make_user('rival@x.edu', 'alumni')
+    alum, student, rival = login('alum@x.edu'), login('student@x.edu'), login('rival@x.edu')
+
+    job = {'title': 'Backend Dev', 'company': 'Acme', 'job_type': 'full-time', 'description': 'APIs'}
+    job_id = client.post('/api/jobs/', json=job, headers=alum).get_json()['job']['id']
+    response = client.post(f'/api/jobs/{job_id}/apply', json={'cover_letter': 'Hi'}, headers=student)
+    assert response.status_code == 201
+    application_id = response.get_json()['application']['id']
+    return {'alum': alum, 'student': student, 'rival': rival, 'job_id': job_id, 'application_id': application_id}
@@ -0,0 +1,56 @@
+import pytest
+
+
+def _batch(client, headers, *paths, **extra):
+    requests = [{'path': path} for path in paths]
+    return client.post('/api/batch', json={'requests': requests, **extra}, headers=headers)
+
+
+@pytest.mark.parametrize('concurrency', [1, 3])
+def test_each_request_gets_its_own_status(app, client, posting, monkeypatch, concurrency):
+    monkeypatch.setitem(app.config, 'BATCH_CONCURRENCY', concurrency)
+
+    response = _batch(client, posting['student'],
+                      f"/api/jobs/{posting['job_id']}",
+                      '/api/notifications/unread-count',
+                      '/api/admin/stats',
+                      '/api/jobs/999999',
+                      '/api/jobs/?limit=1')
+
+    assert response.status_code == 200
+    responses = response.get_json()['responses']
+    assert [r['status'] for r in responses] == [200, 200, 403, 404, 200]
+    assert responses[0]['body']['title'] == 'Backend Dev'
+    assert responses[1]['body'] == {'unread_count': 0}
+    assert len(responses[4]['body']['jobs']) == 1
+
+
+@pytest.mark.parametrize('path', ['/api/admin/export/users?format=ndjson', '/api/chat/poll?after=0&timeout=5'])
+def test_streamed_and_long_poll_endpoints_are_rejected(client, admin, path):
+    response = _batch(client, admin, '/api/jobs/', path)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'Streamed and long-poll endpoints cannot be batched: {path}'
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'requests': []}, 'requests must be a non-empty list'),
+    ({'requests': [{'method': 'GET'}]}, 'Each request needs a path'),
+    ({'requests': [{'path': '/api/jobs/', 'method': 'POST'}]}, 'Only GET requests can be batched'),
+    ({'requests': [{'path': '/metrics'}]}, 'Path must start with /api/: /metrics'),
+    ({'requests': [{'path': '/api/batch'}]}, 'Batches cannot be nested'),
+])
+def test_invalid_batches_are_rejected(client, posting, body, error):
+    response = client.post('/api/batch', json=body, headers=posting['student'])
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
+
+
+def test_oversized_batch_is_rejected(app, client, posting, monkeypatch):
+    monkeypatch.setitem(app.config, 'BATCH_MAX_REQUESTS', 2)
+    response = _batch(client, posting['student'], *['/api/notifications/unread-count'] * 3)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'At most 2 requests per batch'
+
+
+def test_batch_needs_a_login(client):
+    assert _batch(client, {}, '/api/jobs/').status_code == 401
@@ -0,0 +1,90 @@
+import io
+
+from models import User
+from bulk_import import import_users_csv
+from stats import compute_stats, get_stats
+
+HEADER = 'full_name,email,password,college_id,college_email,department,user_type,passing_year\n'
+
+
+def _csv(*rows):
+    return HEADER + ''.join(row + '\n' for row in rows)
+
+
+def test_import_creates_users_and_reports_bad_rows(app, make_user):
+    make_user('taken@x.edu')
+    roster = _csv(
+        'Ann,ann@x.edu,pw1,A1,ann@college.edu,CS,alumni,2020',
+        'Bob,bob@x.edu,pw2,B1,bob@college.edu,CS,student,',
+        'Dup,ann@x.edu,pw3,D1,dup@college.edu,CS,student,',
+        'Old,taken@x.edu,pw4,O1,old@college.edu,CS,student,',
+        'Bad,bad@x.edu,pw5,X1,bad@college.edu,CS,teacher,',
+        'Year,year@x.edu,pw6,Y1,year@college.edu,CS,alumni,soon',
+    )
+
+    with app.app_context():
+        report = import_users_csv(io.StringIO(roster), chunk_size=2).to_dict()
+
+        assert (report['rows'], report['created'], report['failed']) == (6, 2, 4)
+        assert {e['row']: e['error'] for e in report['errors']} == {
+            4: 'Email already registered',
+            5: 'Email already registered',
+            6: 'Invalid user_type: teacher',
+            7: 'Invalid integer for passing_year: soon',
+        }
+        ann = User.query.filter_by(email='ann@x.edu').one()
+        assert ann.is_verified and ann.passing_year == 2020 and ann.check_password('pw1')
+        assert get_stats() == compute_stats()
+
+
+def test_dry_run_creates_nothing(app):
+    with app.app_context():
+        report = import_users_csv(io.StringIO(_csv('Ann,ann@x.edu,pw1,A1,ann@college.edu,CS,alumni,')),
+                                  dry_run=True)
+        assert report.created == 1
+        assert User.query.count() == 0
+
+
+def test_missing_columns_are_rejected(client, admin):
+    response = client.post('/api/admin/bulk-register', data='full_name,email\nA,a@x.edu\n',
+                           content_type='text/csv', headers=admin)
+    assert response.status_code == 400
+    assert 'missing columns' in response.get_json()['error']
+
+
+def test_bulk_register_endpoint(client, admin, login):
+    response = client.post('/api/admin/bulk-register',
+                           data=_csv('Ann,ann@x.edu,password123,A1,ann@college.edu,CS,alumni,'),
+                           content_type='text/csv', headers=admin)
+
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 1
+    assert login('ann@x.edu')
+
+
+def test_overlong_row_is_reported_not_fatal(app):
+    roster = _csv(
+        'Ann,ann@x.edu,pw1,A1,ann@college.edu,CS,alumni,2020',
+        'Bob,bob@x.edu,pw2,B1,bob@college.edu,CS,student,,Likes commas, apparently',
+        'Cat,cat@x.edu,pw3,C1,cat@college.edu,CS,student,',
+    )
+
+    with app.app_context():
+        report = import_users_csv(io.StringIO(roster), chunk_size=1).to_dict()
+
+        assert (report['rows'], report['created'], report['failed']) == (3, 2, 1)
+        assert report['errors'] == [{'row': 3, 'error': 'Too many fields: expected 8, got 10'}]
+        assert {u.email for u in User.query} == {'ann@x.edu', 'cat@x.edu'}
+
+
+def test_bulk_register_caps_rows_per_upload(app, client, admin, monkeypatch):
+    monkeypatch.setitem(app.config, 'BULK_REGISTER_MAX_ROWS', 1)
+    response = client.post('/api/admin/bulk-register',
+                           data=_csv('Ann,ann@x.edu,pw1,A1,ann@college.edu,CS,alumni,',
+                                     'Bob,bob@x.edu,pw2,B1,bob@college.edu,CS,student,'),
+                           content_type='text/csv', headers=admin)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('At most 1 rows per upload')
+    with app.app_context():
+        assert User.query.filter(User.email.in_(['ann@x.edu', 'bob@x.edu'])).count() == 0
@@ -0,0 +1,15 @@
+def test_receiver_marks_read_and_sender_deletes(client, make_user, login):
+    make_user('alum@x.edu', 'alumni')
+    student_id = make_user('student@x.edu')
+    alum, student = login('alum@x.edu'), login('student@x.edu')
+
+    sent = client.post('/api/chat/send', json={'receiver_id': student_id, 'content': 'Hello'}, headers=alum)
+    assert sent.status_code == 201
+    message_id = sent.get_json()['data']['id']
+
+    assert client.put(f'/api/chat/mark-read/{message_id}', headers=alum).status_code == 403
+    assert client.put(f'/api/chat/mark-read/{message_id}', headers=student).status_code == 200
+    assert client.get('/api/chat/unread-count', headers=student).get_json()['unread_count'] == 0
+
+    assert client.delete(f'/api/chat/delete/{message_id}', headers=student).status_code == 403
+    assert client.delete(f'/api/chat/delete/{message_id}', headers=alum).status_code == 200
@@ -0,0 +1,80 @@
+import zlib
+
+import pytest
+from flask import Response
+
+import compression
+from compression import choose_encoding, compress_response
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('identity', None),
+    ('*', 'br'),
+    ('', None),
+    ('gzip;q=nonsense, br', 'br'),
+])
+def test_negotiation_with_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, 'available_encodings', lambda: ['br', 'gzip'])
+    assert choose_encoding(header) == expected
+
+
+def test_negotiation_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'available_encodings', lambda: ['gzip'])
+    assert choose_encoding('br, gzip;q=0.1') == 'gzip'
+    assert choose_encoding('br') is None
+
+
+def test_only_bodies_over_the_threshold_are_compressed(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'COMPRESSION_MIN_SIZE', 10000)
+    small = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
+
+    monkeypatch.setitem(app.config, 'COMPRESSION_MIN_SIZE', 10)
+    big = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert big.headers['Content-Encoding'] == 'gzip'
+    assert zlib.decompress(big.get_data(), 31) == small.get_data()
+
+    identity = client.get('/', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+
+
+def test_streamed_export_is_flushed_chunk_by_chunk(client, make_user, admin):
+    for i in range(3):
+        make_user(f'user{i}@x.edu')
+
+    response = client.get('/api/admin/export/users', headers={**admin, 'Accept-Encoding': 'gzip'}, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+
+    decompressor = zlib.decompressobj(31)
+    chunks = iter(response.response)
+    # The first chunk is readable on its own thanks to the sync flush
+    first = decompressor.decompress(next(chunks))
+    assert first.startswith(b'id,')
+    body = first + b''.join(decompressor.decompress(chunk) for chunk in chunks)
+    assert body.count(b'@x.edu') >= 3
+    response.close()
+
+
+def test_closing_a_compressed_stream_closes_the_wrapped_iterable(app):
+    class Rows:
+        closed = False
+
+        def __iter__(self):
+            yield 'a,b\n'
+
+        def close(self):
+            self.closed = True
+
+    rows = Rows()
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = compress_response(Response(rows, mimetype='text/csv'))
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+    # The client went away before the body was read
+    response.close()
+    assert rows.closed
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+
+import deletion
+from deletion import claim_job, process_job, run_pending_jobs
+from mailer import send_email
+from models import db, Application, DeletionJob, FeedEvent, FeedItem, IdempotencyKey, Job, Message, Task, User
+from stats import compute_stats, get_stats
+
+
+def _alumni_with_rows(app, make_user, messages=5):
+    alumni_id = make_user('alum@x.edu', 'alumni')
+    student_id = make_user('student@x.edu')
+    with app.app_context():
+        for i in range(messages):
+            db.session.add(Message(sender_id=alumni_id, receiver_id=student_id, content=f'm{i}'))
+        job = Job(alumni_id=alumni_id, title='Dev', company='Acme', job_type='full-time', description='d')
+        db.session.add(job)
+        db.session.flush()
+        db.session.add(Application(job_id=job.id, student_id=student_id))
+        db.session.commit()
+    return alumni_id, student_id
+
+
+def test_delete_endpoint_queues_and_worker_removes_rows(app, client, make_user, admin):
+    alumni_id, student_id = _alumni_with_rows(app, make_user)
+
+    response = client.delete(f'/api/admin/delete-user/{alumni_id}', headers=admin)
+    assert response.status_code == 202
+
+    with app.app_context():
+        assert get_stats() == compute_stats()
+        assert run_pending_jobs() == 1
+        job = DeletionJob.query.one()
+        assert (job.status, job.stage, job.rows_deleted) == ('done', 'user', 5 + 1 + 1 + 1)
+        assert db.session.get(User, alumni_id) is None
+        assert Message.query.count() == Job.query.count() == Application.query.count() == 0
+        assert db.session.get(User, student_id) is not None
+
+
+def test_failed_job_resumes_from_its_stage(app, client, make_user, admin, monkeypatch):
+    alumni_id, _ = _alumni_with_rows(app, make_user)
+    client.delete(f'/api/admin/delete-user/{alumni_id}', headers=admin)
+    monkeypatch.setitem(app.config, 'DELETION_BATCH_SIZE', 2)
+
+    real_delete_batch = deletion._delete_batch
+
+    def crash_on_jobs(model, criteria, batch_size):
+        if model is Job:
+            raise RuntimeError('worker died')
+        return real_delete_batch(model, criteria, batch_size)
+
+    with app.app_context():
+        monkeypatch.setattr(deletion, '_delete_batch', crash_on_jobs)
+        assert process_job(claim_job('w1')) is False
+
+        job = DeletionJob.query.one()
+        assert (job.status, job.stage, job.last_error) == ('pending', 'job_applications', 'worker died')
+        assert job.rows_deleted == 5 + 1
+        # Held back by the retry backoff
+        assert claim_job('w2') is None
+
+        job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        monkeypatch.setattr(deletion, '_delete_batch', real_delete_batch)
+        assert run_pending_jobs() == 1
+
+        job = DeletionJob.query.one()
+        assert (job.status, job.attempts, job.rows_deleted) == ('done', 2, 5 + 1 + 1 + 1)
+        assert db.session.get(User, alumni_id) is None
+
+
+def test_leased_job_is_not_claimed_twice(app, client, make_user, admin):
+    alumni_id, _ = _alumni_with_rows(app, make_user, messages=0)
+    client.delete(f'/api/admin/delete-user/{alumni_id}', headers=admin)
+
+    with app.app_context():
+        assert claim_job('w1') is not None
+        assert claim_job('w2') is None
+
+        # A lapsed lease is picked up by the next worker
+        job = DeletionJob.query.one()
+        job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert claim_job('w2').locked_by == 'w2'
+
+
+def test_worker_removes_the_users_events_emails_and_idempotency_keys(app, client, posting, admin, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAIL_SERVER', 'smtp.test')
+    client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+               json={'status': 'reviewed'}, headers=posting['alum'])
+    with app.app_context():
+        student_id = User.query.filter_by(email='student@x.edu').one().id
+        expires = datetime.utcnow() + timedelta(hours=1)
+        for scope in (f'user:{student_id}', 'user:0'):
+            db.session.add(IdempotencyKey(scope=scope, key='k', request_hash='h', expires_at=expires))
+        send_email('alum@x.edu', 'Hi', 'Still queued')
+        db.session.commit()
+
+    client.delete(f'/api/admin/delete-user/{student_id}', headers=admin)
+
+    with app.app_context():
+        assert run_pending_jobs() == 1
+        # Only the alumni's job posting is left, in nobody's feed
+        assert [e.kind for e in FeedEvent.query] == ['job_posted']
+        assert FeedItem.query.count() == 0
+        assert [json.loads(t.payload)['to'] for t in Task.query.filter_by(name='send_email')] == ['alum@x.edu']
+        assert [k.scope for k in IdempotencyKey.query] == ['user:0']
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import mailer
+from models import Task
+from tasks import run_pending_tasks
+
+
+class FakeSMTP:
+    sent = []
+
+    def __init__(self, host, port, timeout=None):
+        pass
+
+    def send_message(self, message):
+        FakeSMTP.sent.append(message)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def mail(app, monkeypatch):
+    FakeSMTP.sent = []
+    monkeypatch.setitem(app.config, 'MAIL_SERVER', 'smtp.test')
+    monkeypatch.setitem(app.config, 'MAIL_USE_TLS', False)
+    monkeypatch.setitem(app.config, 'MAIL_DEFAULT_SENDER', 'noreply@college.edu')
+    monkeypatch.setattr(mailer.smtplib, 'SMTP', FakeSMTP)
+    return FakeSMTP.sent
+
+
+def _emails(app):
+    with app.app_context():
+        return [json.loads(t.payload) for t in Task.query.filter_by(name='send_email').all()]
+
+
+def test_status_change_queues_and_sends_the_student_email(app, client, posting, mail):
+    response = client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+                          json={'status': 'shortlisted'}, headers=posting['alum'])
+    assert response.status_code == 200
+
+    emails = _emails(app)
+    assert [(e['to'], e['subject']) for e in emails] == [
+        ('student@x.edu', 'Your application for Backend Dev is now shortlisted')]
+
+    with app.app_context():
+        run_pending_tasks()
+        assert Task.query.filter_by(name='send_email').one().status == 'done'
+    assert [m['To'] for m in mail] == ['student@x.edu']
+
+
+def test_unchanged_status_sends_nothing(app, client, posting, mail):
+    response = client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+                          json={'status': 'pending'}, headers=posting['alum'])
+    assert response.status_code == 200
+    assert _emails(app) == []
+
+
+def test_no_mail_server_queues_nothing(app, client, posting):
+    client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+               json={'status': 'accepted'}, headers=posting['alum'])
+    assert _emails(app) == []
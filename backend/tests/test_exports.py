@@ -0,0 +1,33 @@
+import gzip
+import json
+
+
+def test_csv_export_streams_rows(client, make_user, admin):
+    make_user('student@x.edu')
+
+    response = client.get('/api/admin/export/users?format=csv', headers=admin)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('id,')
+    assert len(lines) == 3
+
+
+def test_gzip_export_is_a_gz_file_not_a_content_encoding(client, make_user, admin):
+    make_user('student@x.edu')
+
+    response = client.get('/api/admin/export/users?format=ndjson&gzip=true',
+                          headers={**admin, 'Accept-Encoding': 'gzip, br'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in response.headers
+    assert 'filename=users.ndjson.gz' in response.headers['Content-Disposition']
+    rows = [json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()]
+    assert sorted(row['email'] for row in rows) == ['admin@college.edu', 'student@x.edu']
+
+
+def test_export_requires_admin(client, make_user, login):
+    make_user('student@x.edu')
+    assert client.get('/api/admin/export/users', headers=login('student@x.edu')).status_code == 403
@@ -0,0 +1,108 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+import feed
+import idempotency
+from models import db, IdempotencyKey, Job, User
+
+JOB = {'title': 'Backend Dev', 'company': 'Acme', 'job_type': 'full-time', 'description': 'APIs'}
+
+
+def _post_job(client, headers, key, body=JOB):
+    return client.post('/api/jobs/', json=body, headers={**headers, 'Idempotency-Key': key})
+
+
+def test_retry_replays_the_first_response(app, client, make_user, login):
+    make_user('alum@x.edu', 'alumni')
+    alum = login('alum@x.edu')
+
+    first = _post_job(client, alum, 'k1')
+    assert first.status_code == 201
+    assert 'Idempotent-Replayed' not in first.headers
+
+    replays = [_post_job(client, alum, 'k1')]
+    idempotency.cache.clear()  # the stored row serves replays in other workers
+    replays.append(_post_job(client, alum, 'k1'))
+    for replay in replays:
+        assert replay.status_code == 201
+        assert replay.headers['Idempotent-Replayed'] == 'true'
+        assert replay.get_json() == first.get_json()
+
+    with app.app_context():
+        assert Job.query.count() == 1
+
+
+def test_key_reused_for_another_body_is_refused(client, make_user, login):
+    make_user('alum@x.edu', 'alumni')
+    alum = login('alum@x.edu')
+
+    assert _post_job(client, alum, 'k1').status_code == 201
+    response = _post_job(client, alum, 'k1', {**JOB, 'title': 'Frontend Dev'})
+    assert response.status_code == 422
+
+
+def test_keys_are_scoped_per_user(app, client, make_user, login):
+    make_user('alum@x.edu', 'alumni')
+    make_user('other@x.edu', 'alumni')
+
+    assert _post_job(client, login('alum@x.edu'), 'k1').status_code == 201
+    response = _post_job(client, login('other@x.edu'), 'k1')
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+    with app.app_context():
+        assert Job.query.count() == 2
+
+
+def test_registration_retry_is_replayed_not_rejected(app, client):
+    body = {'full_name': 'Ann', 'email': 'ann@x.edu', 'password': 'password123', 'college_id': 'A1',
+            'college_email': 'ann@college.edu', 'department': 'CS', 'user_type': 'student'}
+    headers = {'Idempotency-Key': 'signup-1'}
+
+    first = client.post('/api/auth/register', json=body, headers=headers)
+    retry = client.post('/api/auth/register', json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    with app.app_context():
+        assert User.query.filter_by(email='ann@x.edu').count() == 1
+
+
+def test_server_errors_are_not_stored(app, client, make_user, login, monkeypatch):
+    make_user('alum@x.edu', 'alumni')
+    alum = login('alum@x.edu')
+
+    def broken(job, alumni):
+        raise RuntimeError('feed down')
+
+    monkeypatch.setattr(feed, 'job_posted', broken)
+    assert _post_job(client, alum, 'k1').status_code == 500
+    with app.app_context():
+        assert IdempotencyKey.query.count() == 0
+
+    monkeypatch.undo()
+    response = _post_job(client, alum, 'k1')
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_duplicate_of_a_running_request_gets_409(app, client, make_user, login, monkeypatch):
+    alum_id = make_user('alum@x.edu', 'alumni')
+    alum = login('alum@x.edu')
+    monkeypatch.setitem(app.config, 'IDEMPOTENCY_WAIT_SECONDS', 0.1)
+
+    body = json.dumps(JOB)
+    digest = hashlib.sha256(f'POST /api/jobs/\n{body}'.encode())
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add(IdempotencyKey(scope=f'user:{alum_id}', key='k1', request_hash=digest.hexdigest(),
+                                      status='in_progress', locked_until=now + timedelta(minutes=1),
+                                      expires_at=now + timedelta(days=1)))
+        db.session.commit()
+
+    response = client.post('/api/jobs/', data=body, content_type='application/json',
+                           headers={**alum, 'Idempotency-Key': 'k1'})
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == '1'
+    with app.app_context():
+        assert Job.query.count() == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from models import db, Application, DailyApplicationEvents
+
+
+def test_owner_lists_applications_in_to_dict_shape(app, client, posting):
+    response = client.get(f"/api/jobs/{posting['job_id']}/applications", headers=posting['alum'])
+
+    assert response.status_code == 200
+    with app.app_context():
+        expected = [db.session.get(Application, posting['application_id']).to_dict()]
+    assert response.get_json()['applications'] == expected
+
+
+def test_owner_updates_and_deletes_job(client, posting):
+    job_url = f"/api/jobs/{posting['job_id']}"
+
+    response = client.put(job_url, json={'title': 'Senior Dev'}, headers=posting['alum'])
+    assert response.status_code == 200
+    assert response.get_json()['job']['title'] == 'Senior Dev'
+
+    assert client.delete(job_url, headers=posting['alum']).status_code == 200
+    assert client.get(job_url, headers=posting['alum']).status_code == 404
+
+
+@pytest.mark.parametrize('method, path', [
+    ('get', '/api/jobs/{job_id}/applications'),
+    ('put', '/api/jobs/{job_id}'),
+    ('delete', '/api/jobs/{job_id}'),
+    ('put', '/api/jobs/applications/{application_id}/status'),
+])
+def test_other_alumni_are_refused(client, posting, method, path):
+    url = path.format(**posting)
+    response = getattr(client, method)(url, json={'status': 'accepted', 'title': 'x'}, headers=posting['rival'])
+    assert response.status_code == 403
+
+
+def _status(client, posting, status):
+    return client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+                      json={'status': status}, headers=posting['alum'])
+
+
+def test_status_changes_feed_the_application_funnel(client, posting, admin):
+    for status in ('reviewed', 'shortlisted', 'shortlisted', 'accepted'):
+        response = _status(client, posting, status)
+        assert response.status_code == 200
+        assert response.get_json()['application']['status'] == status
+
+    funnel = client.get(f"/api/admin/analytics/applications?job_id={posting['job_id']}", headers=admin).get_json()
+    assert funnel['jobs'] == [{'job_id': posting['job_id'], 'funnel': {
+        'applied': 1, 'reviewed': 1, 'shortlisted': 1, 'accepted': 1, 'rejected': 0}}]
+
+
+def test_unknown_status_is_rejected_before_any_write(app, client, posting):
+    response = _status(client, posting, 'hired')
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.get(Application, posting['application_id']).status == 'pending'
+        assert DailyApplicationEvents.query.filter_by(status='hired').count() == 0
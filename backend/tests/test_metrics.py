@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db
+
+
+def test_metrics_need_an_admin_without_a_token(client, make_user, login, admin):
+    make_user('student@x.edu')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers=login('student@x.edu')).status_code == 401
+
+    response = client.get('/metrics', headers=admin)
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.get_data(as_text=True)
+
+
+def test_metrics_accept_the_scrape_token(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scrape-me')
+
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'}).status_code == 200
+
+
+def test_failed_statement_does_not_leak_its_timer(app):
+    with app.app_context():
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        assert connection.info.get('query_start') == []
+        db.session.rollback()
@@ -0,0 +1,57 @@
+from tasks import run_pending_tasks
+
+
+def _feed(client, headers, **params):
+    response = client.get('/api/notifications/', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_status_change_reaches_only_the_student(client, posting):
+    response = client.put(f"/api/jobs/applications/{posting['application_id']}/status",
+                          json={'status': 'reviewed'}, headers=posting['alum'])
+    assert response.status_code == 200
+
+    [notification] = [n for n in _feed(client, posting['student'])['notifications']
+                      if n['kind'] == 'application_status']
+    assert notification['application_id'] == posting['application_id']
+    assert notification['data'] == {'title': 'Backend Dev', 'company': 'Acme', 'status': 'reviewed'}
+    assert notification['unread']
+
+    for other in (posting['alum'], posting['rival']):
+        kinds = {n['kind'] for n in _feed(client, other)['notifications']}
+        assert 'application_status' not in kinds
+
+
+def test_owner_is_told_about_applications(client, posting):
+    [notification] = _feed(client, posting['alum'])['notifications']
+    assert notification['kind'] == 'application_received'
+    assert notification['application_id'] == posting['application_id']
+
+
+def test_job_posts_fan_out_and_mark_read(app, client, posting):
+    with app.app_context():
+        run_pending_tasks()
+
+    feed = _feed(client, posting['student'])
+    assert [n['kind'] for n in feed['notifications']] == ['job_posted']
+    assert client.get('/api/notifications/unread-count', headers=posting['student']).get_json() == {'unread_count': 1}
+
+    read = client.post('/api/notifications/read', json={}, headers=posting['student'])
+    assert read.get_json()['last_read_id'] == feed['notifications'][0]['id']
+    assert client.get('/api/notifications/unread-count', headers=posting['student']).get_json() == {'unread_count': 0}
+
+
+def test_large_audiences_are_merged_at_read_time(app, client, posting, monkeypatch):
+    monkeypatch.setitem(app.config, 'FEED_FANOUT_MAX_AUDIENCE', 0)
+    job = {'title': 'Data Dev', 'company': 'Acme', 'job_type': 'full-time', 'description': 'ETL'}
+    assert client.post('/api/jobs/', json=job, headers=posting['alum']).status_code == 201
+
+    feed = _feed(client, posting['student'], limit=1)
+    assert [n['data']['title'] for n in feed['notifications']] == ['Data Dev']
+    assert feed['next_cursor'] == feed['notifications'][0]['id']
+
+    with app.app_context():
+        run_pending_tasks()
+    older = _feed(client, posting['student'], limit=1, cursor=feed['next_cursor'])
+    assert older['notifications'][0]['kind'] == 'job_posted'
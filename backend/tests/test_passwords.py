@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import passwords
+import serving
+from passwords import hash_passwords, needs_rehash
+from werkzeug.security import check_password_hash
+
+
+class _FullPool:
+    def submit(self, *args):
+        raise AssertionError('a full pool must not get work')
+
+
+def _saturate(app, monkeypatch):
+    monkeypatch.setattr(passwords, '_get_pool', lambda: (_FullPool(), threading.Semaphore(0)))
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_TIMEOUT', 0.01)
+
+
+def test_login_answers_503_when_hashing_queue_is_full(app, client, make_user, monkeypatch):
+    make_user('student@x.edu')
+    _saturate(app, monkeypatch)
+
+    response = client.post('/api/auth/login', json={'email': 'student@x.edu', 'password': 'password123'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(passwords.BUSY_RETRY_AFTER)
+    assert 'queue' not in response.get_json()['error']
+
+
+def test_register_answers_503_when_hashing_queue_is_full(app, client, monkeypatch):
+    _saturate(app, monkeypatch)
+
+    response = client.post('/api/auth/register', json={
+        'full_name': 'New', 'email': 'new@x.edu', 'password': 'password123', 'college_id': 'N1',
+        'college_email': 'new@college.edu', 'department': 'CS', 'user_type': 'student',
+    })
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+
+def test_hash_passwords_goes_through_offload(app, monkeypatch):
+    offloaded = []
+
+    def fake_offload(fn, *args):
+        offloaded.append(fn)
+        return fn(*args)
+
+    monkeypatch.setattr(passwords, 'offload', fake_offload)
+    with app.app_context():
+        hashes = hash_passwords(['one', 'two'])
+
+    assert offloaded
+    assert check_password_hash(hashes[0], 'one') and check_password_hash(hashes[1], 'two')
+    with app.app_context():
+        assert not needs_rehash(hashes[0])
+
+
+def test_offload_is_inline_without_gevent():
+    assert serving.offload(lambda a, b: a + b, 1, 2) == 3
+
+
+def test_hash_passwords_batches_through_the_queue_slots(app, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    slots = threading.BoundedSemaphore(3)
+    monkeypatch.setattr(passwords, '_get_pool', lambda: (pool, slots))
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_WORKERS', 2)
+    plain = [f'pw{i}' for i in range(20)]
+
+    with app.app_context():
+        hashes = hash_passwords(plain)
+
+    pool.shutdown()
+    assert all(check_password_hash(h, p) for h, p in zip(hashes, plain))
+    # Every slot was handed back
+    assert all(slots.acquire(blocking=False) for _ in range(3))
+
+
+def test_hash_passwords_raises_busy_when_the_queue_is_full(app, monkeypatch):
+    _saturate(app, monkeypatch)
+    with app.app_context(), pytest.raises(passwords.HashingBusy):
+        hash_passwords(['one', 'two'])
+
+
+def test_bulk_register_answers_503_when_hashing_queue_is_full(app, client, admin, monkeypatch):
+    _saturate(app, monkeypatch)
+    roster = ('full_name,email,password,college_id,college_email,department,user_type\n'
+              'Ann,ann@x.edu,pw1,A1,ann@college.edu,CS,alumni\n'
+              'Bob,bob@x.edu,pw2,B1,bob@college.edu,CS,student\n')
+
+    response = client.post('/api/admin/bulk-register', data=roster, content_type='text/csv', headers=admin)
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
@@ -0,0 +1,29 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from config import Config
+from pool_metrics import TimedQueuePool, engine_options
+
+
+def test_queue_pool_only_for_server_databases():
+    options = Config.SQLALCHEMY_ENGINE_OPTIONS
+    assert engine_options(options, 'mysql+pymysql://u:p@db/app')['poolclass'] is TimedQueuePool
+    assert 'poolclass' not in engine_options(options, 'sqlite:////tmp/app.db')
+    assert engine_options(options, 'sqlite:////tmp/app.db')['pool_size'] == options['pool_size']
+
+
+def test_in_memory_sqlite_keeps_one_database():
+    app = Flask(__name__)
+    url = 'sqlite://'
+    app.config.update(SQLALCHEMY_DATABASE_URI=url,
+                      SQLALCHEMY_ENGINE_OPTIONS=engine_options(Config.SQLALCHEMY_ENGINE_OPTIONS, url))
+    db = SQLAlchemy(app)
+
+    with app.app_context():
+        assert not isinstance(db.engine.pool, QueuePool)
+        with db.engine.begin() as connection:
+            connection.execute(text('CREATE TABLE t (x INTEGER)'))
+        with db.engine.connect() as connection:
+            assert connection.execute(text('SELECT COUNT(*) FROM t')).scalar() == 0
@@ -0,0 +1,90 @@
+import pytest
+
+from models import db, Tenant
+from ratelimit import SQLiteBackend, parse_limit
+
+LIMIT = '1/hour;2'  # two requests, then one more per hour
+
+
+@pytest.fixture
+def limited(app, monkeypatch):
+    """Enable limiting with only the named limits set to LIMIT"""
+    def enable(*names):
+        monkeypatch.setitem(app.config, 'RATELIMIT_ENABLED', True)
+        for name in ('LOGIN_IP', 'LOGIN_EMAIL', 'REGISTER_IP', 'SEND_MESSAGE_USER', 'APPLY_USER'):
+            monkeypatch.setitem(app.config, f'RATELIMIT_{name}', LIMIT if name in names else '')
+    return enable
+
+
+def _assert_limited(responses):
+    *allowed, rejected = responses
+    assert all(r.status_code != 429 for r in allowed)
+    assert rejected.status_code == 429
+    assert 3000 <= int(rejected.headers['Retry-After']) <= 3600
+
+
+def _login(client, email, headers=None):
+    return client.post('/api/auth/login', json={'email': email, 'password': 'wrong'}, headers=headers or {})
+
+
+def test_login_is_limited_per_ip_and_per_email(client, limited):
+    limited('LOGIN_EMAIL')
+    _assert_limited([_login(client, 'ann@x.edu') for _ in range(3)])
+    assert _login(client, 'bob@x.edu').status_code == 401
+
+    limited('LOGIN_IP')
+    _assert_limited([_login(client, f'user{i}@x.edu') for i in range(3)])
+
+
+def test_login_email_buckets_are_per_college(app, client, limited):
+    with app.app_context():
+        db.session.add(Tenant(id=2, slug='north', name='North'))
+        db.session.commit()
+    limited('LOGIN_EMAIL')
+
+    _assert_limited([_login(client, 'ann@x.edu') for _ in range(3)])
+    assert _login(client, 'ann@x.edu', {'X-Tenant': 'north'}).status_code == 401
+
+
+def test_register_is_limited_per_ip(client, limited):
+    limited('REGISTER_IP')
+    _assert_limited([client.post('/api/auth/register', json={'email': f'u{i}@x.edu'}) for i in range(3)])
+
+
+def test_apply_is_limited_per_user(client, posting, limited):
+    limited('APPLY_USER')
+    url = f"/api/jobs/{posting['job_id']}/apply"
+    _assert_limited([client.post(url, json={}, headers=posting['student']) for _ in range(3)])
+
+
+def test_send_message_buckets_are_per_user_and_college(client, make_user, login, limited):
+    default_id = make_user('ann@x.edu')
+    big_id = make_user('ann@x.edu', tenant_id=3)
+    # College 3 has its own database, so its first user shares the id
+    assert default_id == big_id
+    with client.application.app_context():
+        db.session.add(Tenant(id=3, slug='big', name='Big'))
+        db.session.commit()
+    ann, big_ann = login('ann@x.edu'), login('ann@x.edu', headers={'X-Tenant': 'big'})
+    limited('SEND_MESSAGE_USER')
+
+    def send(headers):
+        return client.post('/api/chat/send', json={'receiver_id': default_id, 'content': 'hi'}, headers=headers)
+
+    _assert_limited([send(ann) for _ in range(3)])
+    assert send(big_ann).status_code != 429
+
+
+def test_sqlite_backend_refills(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'buckets.db'))
+    rate, burst = parse_limit('1/second;2')
+
+    assert [backend.take('k', rate, burst)[0] for _ in range(3)] == [True, True, False]
+    allowed, retry_after = backend.take('k', rate, burst)
+    assert not allowed and 0 < retry_after <= 1
+    assert backend.take('other', rate, burst)[0]
+
+
+def test_parse_limit():
+    assert parse_limit('10/minute') == (10 / 60, 10)
+    assert parse_limit('100/hour;20') == (100 / 3600, 20)
@@ -0,0 +1,112 @@
+"""Replica routing against two SQLite files: the test database and a copy of it"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from flask import g
+from sqlalchemy import text
+
+import replicas
+from app import create_app
+from config import Config
+from models import db, Job, ReplicaHeartbeat, User
+from replicas import PIN_HEADER
+
+JOB = {'title': 'Backend Dev', 'company': 'Acme', 'job_type': 'full-time', 'description': 'APIs'}
+
+
+@pytest.fixture
+def replica_app(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_REPLICA_URLS', ['sqlite:///' + str(tmp_path / 'replica.db')])
+    replica_app = create_app()
+    replica_app.config.update(TESTING=True, RATELIMIT_ENABLED=False, REPLICA_LAG_CHECK_INTERVAL=0)
+    replicas._lag.clear()
+    yield replica_app
+    with replica_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registered an (empty) metadata for the bind; the shared app has no such engine
+    db.metadatas.pop('replica_0', None)
+    replicas._lag.clear()
+
+
+def _snapshot(replica_app):
+    """Copy the primary (with a fresh heartbeat) over the replica file"""
+    with replica_app.app_context():
+        replicas.replica_lag()
+        db.session.remove()
+        primary, replica = db.engines[None].url.database, db.engines['replica_0'].url.database
+        db.engines['replica_0'].dispose()
+    source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+    source.backup(target)
+    source.close()
+    target.close()
+
+
+def _job_on_primary_only(replica_app, alumni_id):
+    with replica_app.app_context():
+        db.session.add(Job(alumni_id=alumni_id, **JOB))
+        db.session.commit()
+
+
+def _job_count(client, headers):
+    response = client.get('/api/jobs/', headers=headers)
+    assert response.status_code == 200
+    return len(response.get_json()['jobs'])
+
+
+@pytest.fixture
+def alum(replica_app, make_user):
+    alumni_id = make_user('alum@x.edu', 'alumni')
+    client = replica_app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'alum@x.edu', 'password': 'password123'}).get_json()
+    return client, {'Authorization': 'Bearer ' + token['access_token']}, alumni_id
+
+
+def test_reads_go_to_a_fresh_replica(replica_app, alum):
+    client, headers, alumni_id = alum
+    _snapshot(replica_app)
+    _job_on_primary_only(replica_app, alumni_id)
+
+    assert _job_count(client, headers) == 0
+
+
+def test_lagging_replica_falls_back_to_the_primary(replica_app, alum):
+    client, headers, alumni_id = alum
+    _snapshot(replica_app)
+    _job_on_primary_only(replica_app, alumni_id)
+    with replica_app.app_context():
+        stale = datetime.utcnow() - timedelta(seconds=replica_app.config['REPLICA_MAX_LAG_SECONDS'] + 60)
+        with db.engines['replica_0'].begin() as connection:
+            connection.execute(ReplicaHeartbeat.__table__.update().values(beat_at=stale))
+        assert replicas.replica_lag()['replica_0'] > replica_app.config['REPLICA_MAX_LAG_SECONDS']
+
+    assert _job_count(client, headers) == 1
+
+
+def test_writer_reads_its_writes_from_the_primary(replica_app, alum):
+    client, headers, _ = alum
+    _snapshot(replica_app)
+
+    response = client.post('/api/jobs/', json=JOB, headers=headers)
+    assert response.status_code == 201
+    pin = response.headers[PIN_HEADER]
+    assert _job_count(client, headers) == 1
+
+    # Another worker knows nothing of the pin unless the client echoes the header
+    replicas._pins.clear()
+    assert _job_count(client, headers) == 0
+    assert _job_count(client, {**headers, PIN_HEADER: pin}) == 1
+
+
+def test_session_stays_on_the_primary_after_a_write(replica_app, alum):
+    with replica_app.test_request_context():
+        g.replica_bind = 'replica_0'
+        primary, replica = db.engines[None], db.engines['replica_0']
+
+        assert db.session.get_bind(clause=db.select(User)) is replica
+        db.session.execute(text('SELECT 1'))
+        db.session.execute(db.update(User).values(bio='x').execution_options(synchronize_session=False))
+        assert db.session.get_bind(clause=db.select(User)) is primary
+        db.session.rollback()
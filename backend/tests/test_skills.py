@@ -0,0 +1,132 @@
+from sqlalchemy.exc import IntegrityError
+
+import migrate_skills
+import routes.auth
+import skills
+from models import db, Skill, SkillAlias, Tenant, User
+from skills import parse_skills, resolve_slugs, set_user_skills, slugify_skill
+from tenancy import tenant_context
+
+
+def test_slugify_collapses_case_and_whitespace():
+    assert slugify_skill('  Machine   Learning ') == 'machine learning'
+
+
+def test_parse_skills_accepts_lists_json_and_csv():
+    assert parse_skills(['Python', 'python ', None, 'Go']) == ['Python', 'Go']
+    assert parse_skills('["Python", "Go"]') == ['Python', 'Go']
+    assert parse_skills('Python, Go,,') == ['Python', 'Go']
+    assert parse_skills('') == []
+    assert parse_skills(42) == []
+
+
+def test_aliases_resolve_to_one_canonical_slug(app):
+    with app.app_context():
+        assert resolve_slugs(['K8s', 'kubernetes', 'Kubernetes ', 'JS']) == ['kubernetes', 'javascript']
+
+
+def test_stored_alias_overrides_builtin(app):
+    with app.app_context():
+        skill = Skill(name='Kubernetes Engine', slug='gke')
+        db.session.add(skill)
+        db.session.flush()
+        db.session.add(SkillAlias(alias='k8s', skill_id=skill.id))
+        db.session.commit()
+        assert resolve_slugs(['K8s']) == ['gke']
+
+
+def test_set_user_skills_stores_one_row_per_canonical_skill(app, make_user):
+    user_id = make_user('alum@x.edu', 'alumni')
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        set_user_skills(user, 'K8s, kubernetes, Python')
+        db.session.commit()
+        assert sorted(s.slug for s in user.skill_set) == ['kubernetes', 'python']
+        assert Skill.query.count() == 2
+
+
+def _alumni_with_skills(app, make_user, skills_by_email):
+    for email, skills in skills_by_email.items():
+        user_id = make_user(email, 'alumni')
+        with app.app_context():
+            set_user_skills(db.session.get(User, user_id), skills)
+            db.session.commit()
+
+
+def _alumni_emails(client, headers, query):
+    response = client.get('/api/users/alumni?' + query, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return sorted(a['email'] for a in response.get_json()['alumni'])
+
+
+def test_skill_filter_matches_all_by_default(app, client, make_user, login):
+    _alumni_with_skills(app, make_user, {
+        'both@x.edu': ['Python', 'Kubernetes'],
+        'python@x.edu': ['Python'],
+        'k8s@x.edu': ['k8s'],
+    })
+    make_user('student@x.edu')
+    headers = login('student@x.edu')
+
+    assert _alumni_emails(client, headers, 'skills=py,k8s') == ['both@x.edu']
+    assert _alumni_emails(client, headers, 'skills=py,k8s&skill_match=any') == [
+        'both@x.edu', 'k8s@x.edu', 'python@x.edu']
+
+
+def test_skill_filter_with_unknown_skill(app, client, make_user, login):
+    _alumni_with_skills(app, make_user, {'python@x.edu': ['Python']})
+    make_user('student@x.edu')
+    headers = login('student@x.edu')
+
+    assert _alumni_emails(client, headers, 'skills=python,cobol') == []
+    assert _alumni_emails(client, headers, 'skills=python,cobol&skill_match=any') == ['python@x.edu']
+
+
+REGISTRATION = {
+    'full_name': 'New', 'email': 'new@x.edu', 'password': 'password123', 'college_id': 'N1',
+    'college_email': 'new@college.edu', 'department': 'CS', 'user_type': 'alumni', 'skills': ['Rust'],
+}
+
+
+def test_register_reuses_a_skill_added_concurrently(app, client, monkeypatch):
+    with app.app_context():
+        db.session.add(Skill(name='Rust', slug='rust'))
+        db.session.commit()
+    # Another registration inserts the skill between our lookup and our insert
+    monkeypatch.setattr(skills, '_find_skills', lambda slugs: {})
+
+    response = client.post('/api/auth/register', json=REGISTRATION)
+
+    assert response.status_code == 201, response.get_json()
+    with app.app_context():
+        assert Skill.query.count() == 1
+        user = User.query.filter_by(email='new@x.edu').one()
+        assert [s.slug for s in user.skill_set] == ['rust']
+
+
+def test_register_only_reports_user_conflicts_as_existing(client, monkeypatch):
+    def conflict(user, value):
+        raise IntegrityError('INSERT INTO skills', {}, Exception('UNIQUE constraint failed: skills.slug'))
+    monkeypatch.setattr(routes.auth, 'set_user_skills', conflict)
+
+    response = client.post('/api/auth/register', json=REGISTRATION)
+
+    assert response.status_code == 500
+    assert response.get_json()['error'] != 'User already exists'
+
+
+def test_migrate_skills_covers_every_college(app, make_user, monkeypatch):
+    with app.app_context():
+        db.session.add(Tenant(id=3, slug='big', name='Big'))
+        db.session.commit()
+    default_id = make_user('ann@x.edu', 'alumni', skills='["Python"]')
+    big_id = make_user('bob@x.edu', 'alumni', tenant_id=3, skills='Go, k8s')
+    monkeypatch.setattr(migrate_skills, 'create_app', lambda: app)
+
+    migrate_skills.migrate_skills()
+
+    with app.app_context():
+        with tenant_context(1):
+            assert [s.slug for s in db.session.get(User, default_id).skill_set] == ['python']
+        with tenant_context(3):
+            assert sorted(s.slug for s in db.session.get(User, big_id).skill_set) == ['go', 'kubernetes']
@@ -0,0 +1,64 @@
+from models import db, StatsRollup
+from stats import _create_row, compute_stats, get_stats, reconcile_stats
+
+
+def test_schema_creates_reconciled_row(app):
+    with app.app_context():
+        row = StatsRollup.query.one()
+        assert row.reconciled_at is not None
+        assert row.total_users == 0
+
+
+def test_deltas_follow_user_changes(app, client, make_user, admin):
+    make_user('student@x.edu', is_verified=False)
+    with app.app_context():
+        assert get_stats()['pending_users'] == 1
+
+    student_id = make_user('other@x.edu', is_verified=False)
+    assert client.put(f'/api/admin/verify-user/{student_id}', headers=admin).status_code == 200
+
+    with app.app_context():
+        stats = get_stats()
+        assert stats == compute_stats()
+        assert stats['verified_students'] == 1
+        assert reconcile_stats() == {}
+
+
+def test_delta_with_missing_row_is_kept_and_reconciled(app, make_user):
+    make_user('first@x.edu')
+    with app.app_context():
+        StatsRollup.query.delete()
+        db.session.commit()
+
+    make_user('second@x.edu')
+
+    with app.app_context():
+        row = StatsRollup.query.one()
+        # Only the delta so far; reads count the users until the row is reconciled
+        assert (row.total_users, row.reconciled_at) == (1, None)
+        assert get_stats()['total_users'] == 2
+        assert StatsRollup.query.one().reconciled_at is None
+
+        assert reconcile_stats()['total_users'] == 1
+        assert StatsRollup.query.one().total_users == 2
+
+
+def test_stats_reads_never_write(app, client, make_user, login):
+    make_user('student@x.edu')
+    headers = login('student@x.edu')
+    with app.app_context():
+        StatsRollup.query.delete()
+        db.session.commit()
+
+    assert client.get('/api/users/stats', headers=headers).status_code == 200
+
+    with app.app_context():
+        assert StatsRollup.query.count() == 0
+
+
+def test_create_row_tolerates_existing_row(app):
+    with app.app_context():
+        _create_row()
+        _create_row()
+        db.session.commit()
+        assert StatsRollup.query.count() == 1
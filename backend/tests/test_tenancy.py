@@ -0,0 +1,129 @@
+import pytest
+from flask_jwt_extended import decode_token
+from sqlalchemy import text
+
+import stats
+from models import db, Tenant, TokenVersion, User
+from stats import get_stats
+from tasks import enqueue, run_pending_tasks, task
+from tenancy import current_tenant_id, tenant_context
+
+NORTH, BIG = 2, 3  # BIG has its own database (TENANT_DATABASE_URLS in conftest)
+JOB = {'title': 'Backend Dev', 'company': 'Acme', 'job_type': 'full-time', 'description': 'APIs'}
+
+seen_tenants = []
+
+
+@task('test_record_tenant')
+def record_tenant(payload):
+    seen_tenants.append((payload['queued_by'], current_tenant_id()))
+
+
+@pytest.fixture(autouse=True)
+def colleges(app):
+    with app.app_context():
+        db.session.add_all([Tenant(id=NORTH, slug='north', name='North'), Tenant(id=BIG, slug='big', name='Big')])
+        db.session.commit()
+    seen_tenants.clear()
+
+
+def test_same_email_in_two_colleges(app, make_user, login):
+    default_id = make_user('ann@x.edu')
+    north_id = make_user('ann@x.edu', tenant_id=NORTH, password='north-pass')
+
+    with app.app_context():
+        default = decode_token(login('ann@x.edu')['Authorization'][7:])
+        north = decode_token(login('ann@x.edu', 'north-pass', headers={'X-Tenant': 'north'})['Authorization'][7:])
+    assert (default['sub'], default['tid']) == (str(default_id), 1)
+    assert (north['sub'], north['tid']) == (str(north_id), NORTH)
+
+
+def test_unknown_college_is_refused(client):
+    response = client.post('/api/auth/login', json={'email': 'a@x.edu', 'password': 'x'}, headers={'X-Tenant': 'nowhere'})
+    assert response.status_code == 404
+
+
+def test_jobs_and_stats_stay_in_their_college(client, make_user, login, admin):
+    make_user('alum@x.edu', 'alumni')
+    make_user('student@x.edu', tenant_id=NORTH)
+    make_user('admin@college.edu', 'alumni', tenant_id=NORTH)
+    north_student = login('student@x.edu', headers={'X-Tenant': 'north'})
+    north_admin = login('admin@college.edu', headers={'X-Tenant': 'north'})
+
+    job_id = client.post('/api/jobs/', json=JOB, headers=login('alum@x.edu')).get_json()['job']['id']
+
+    assert client.get('/api/jobs/', headers=north_student).get_json()['jobs'] == []
+    assert client.get(f'/api/jobs/{job_id}', headers=north_student).status_code == 404
+    assert client.get('/api/admin/stats', headers=admin).get_json()['total_users'] == 2
+    assert client.get('/api/admin/stats', headers=north_admin).get_json()['total_users'] == 2
+    assert client.get('/api/admin/stats', headers=north_admin).get_json()['total_students'] == 1
+
+
+def test_bulk_actions_cannot_reach_another_college(app, client, make_user, admin):
+    north_id = make_user('student@x.edu', tenant_id=NORTH)
+
+    response = client.post('/api/admin/bulk/deactivate', json={'user_ids': [north_id]}, headers=admin)
+
+    assert response.get_json()['affected'] == 0
+    with app.app_context(), tenant_context(NORTH):
+        assert db.session.get(User, north_id).is_active
+
+
+def test_core_updates_are_limited_to_the_current_college(app, make_user):
+    make_user('ann@x.edu')
+    make_user('bob@x.edu', tenant_id=NORTH)
+
+    with app.app_context():
+        with tenant_context(1):
+            stats._apply({'total_users': 10})
+            db.session.commit()
+            assert get_stats()['total_users'] == 11
+        with tenant_context(NORTH):
+            assert get_stats()['total_users'] == 1
+
+
+def test_dedicated_college_uses_its_own_database(app, make_user, login, client):
+    user_id = make_user('ann@x.edu', tenant_id=BIG)
+
+    with app.app_context():
+        own = db.engines['tenant_3'].connect()
+        primary = db.engine.connect()
+        assert own.execute(text('SELECT email FROM users WHERE id = :id'), {'id': user_id}).scalar() == 'ann@x.edu'
+        assert primary.execute(text("SELECT COUNT(*) FROM users WHERE email = 'ann@x.edu'")).scalar() == 0
+        own.close()
+        primary.close()
+
+    me = client.get('/api/auth/me', headers=login('ann@x.edu', headers={'X-Tenant': 'big'}))
+    assert me.get_json()['email'] == 'ann@x.edu'
+
+
+def test_tasks_run_as_the_college_that_queued_them(app):
+    with app.app_context():
+        for tenant_id in (1, NORTH, BIG):
+            with tenant_context(tenant_id):
+                enqueue('test_record_tenant', {'queued_by': tenant_id})
+                db.session.commit()
+
+        run_pending_tasks()
+        assert sorted(seen_tenants) == [(1, 1), (NORTH, NORTH)]
+
+        # A dedicated college's queue lives in its own database and needs its own worker
+        with tenant_context(BIG):
+            run_pending_tasks()
+        assert (BIG, BIG) in seen_tenants
+
+
+def test_revocation_is_kept_per_college(app, client, make_user, login):
+    north_id = make_user('student@x.edu', tenant_id=NORTH)
+    make_user('admin@college.edu', 'alumni', tenant_id=NORTH)
+    token = login('student@x.edu', headers={'X-Tenant': 'north'})
+    north_admin = login('admin@college.edu', headers={'X-Tenant': 'north'})
+
+    assert client.put(f'/api/admin/deactivate-user/{north_id}', headers=north_admin).status_code == 200
+
+    assert client.get('/api/auth/me', headers=token).status_code == 401
+    with app.app_context():
+        with tenant_context(NORTH):
+            assert TokenVersion.query.filter_by(user_id=north_id).one().version == 1
+        with tenant_context(1):
+            assert TokenVersion.query.filter_by(user_id=north_id).first() is None
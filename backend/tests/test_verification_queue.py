@@ -0,0 +1,73 @@
+import pytest
+
+
+def _pending(make_user, count):
+    return [make_user(f'pending{i}@x.edu', is_verified=False) for i in range(count)]
+
+
+def _walk(client, headers, query=''):
+    ids, cursor = [], None
+    while True:
+        url = '/api/admin/pending-users?limit=2' + query + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=headers).get_json()
+        ids += [user['id'] for user in body['users']]
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids, body['total']
+
+
+def test_keyset_pages_cover_the_queue_once(client, make_user, admin):
+    user_ids = _pending(make_user, 5)
+
+    newest_first, total = _walk(client, admin)
+    oldest_first, _ = _walk(client, admin, '&order=asc')
+
+    assert total == 5
+    assert newest_first == user_ids[::-1]
+    assert oldest_first == user_ids
+
+
+def test_invalid_cursor_is_rejected(client, admin):
+    response = client.get('/api/admin/pending-users?cursor=nonsense', headers=admin)
+    assert response.status_code == 400
+
+
+def test_claims_split_the_queue_between_admins(app, client, make_user, login, admin, monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_EMAILS', ['admin@college.edu', 'second@college.edu'])
+    make_user('second@college.edu', 'alumni')
+    second = login('second@college.edu')
+    user_ids = _pending(make_user, 5)
+
+    first_claim = client.post('/api/admin/pending-users/claim', json={'count': 3}, headers=admin).get_json()
+    second_claim = client.post('/api/admin/pending-users/claim', json={'count': 3}, headers=second).get_json()
+
+    first_ids = {user['id'] for user in first_claim['users']}
+    second_ids = {user['id'] for user in second_claim['users']}
+    assert len(first_ids) == 3 and len(second_ids) == 2
+    assert first_ids.isdisjoint(second_ids)
+    assert first_ids | second_ids == set(user_ids)
+
+    unclaimed, _ = _walk(client, admin, '&unclaimed=true')
+    assert unclaimed == []
+
+    released = client.post('/api/admin/pending-users/release', json={'user_ids': sorted(first_ids)}, headers=admin)
+    assert released.get_json()['released'] == 3
+    unclaimed, _ = _walk(client, admin, '&unclaimed=true')
+    assert set(unclaimed) == first_ids
+
+
+@pytest.mark.parametrize('path', ['/api/admin/pending-users', '/api/admin/deletions', '/api/admin/tasks'])
+def test_limit_is_validated_and_clamped(client, make_user, admin, path):
+    _pending(make_user, 3)
+
+    assert client.get(f'{path}?limit=ten', headers=admin).status_code == 400
+    for limit, expected in (('0', 1), ('-1', 1)):
+        response = client.get(f'{path}?limit={limit}', headers=admin)
+        assert response.status_code == 200
+        assert response.get_json()['count'] <= expected
+
+
+def test_non_positive_limit_still_pages(client, make_user, admin):
+    _pending(make_user, 3)
+    page = client.get('/api/admin/pending-users?limit=-1', headers=admin).get_json()
+    assert page['count'] == 1 and page['next_cursor']
@@ -0,0 +1,120 @@
+"""
+Verification queue for pending users.
+
+Pages walk ix_users_verification_queue (is_verified, created_at, id) with a
+keyset cursor instead of OFFSET, so each page is an index range scan no
+matter how deep the queue is. Admins working the queue together claim the
+next N unclaimed users; a claim is a row in verification_claims keyed by
+user_id, so two admins can never hold the same user, and it expires after
+VERIFICATION_CLAIM_TTL seconds if the admin walks away.
+"""
+
+import base64
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db, User, VerificationClaim
+
+MAX_PAGE_SIZE = 200
+CLAIM_ATTEMPTS = 3
+
+
+def encode_cursor(user):
+    raw = f'{user.created_at.isoformat()}|{user.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def pending_query(user_type=None, department=None):
+    query = User.query.filter(User.is_verified.is_(False), User.deleted_at.is_(None))
+    if user_type:
+        query = query.filter(User.user_type == user_type)
+    if department:
+        query = query.filter(User.department == department)
+    return query
+
+
+def _active_claims():
+    return db.select(VerificationClaim.user_id).where(VerificationClaim.expires_at > datetime.utcnow())
+
+
+def get_page(query, limit, cursor=None, newest_first=True, unclaimed=False):
+    """Return (users, next_cursor) for one keyset page of the queue"""
+    if unclaimed:
+        query = query.filter(User.id.notin_(_active_claims()))
+
+    if cursor:
+        created_at, user_id = decode_cursor(cursor)
+        if newest_first:
+            query = query.filter(db.or_(
+                User.created_at < created_at,
+                db.and_(User.created_at == created_at, User.id < user_id)
+            ))
+        else:
+            query = query.filter(db.or_(
+                User.created_at > created_at,
+                db.and_(User.created_at == created_at, User.id > user_id)
+            ))
+
+    if newest_first:
+        query = query.order_by(User.created_at.desc(), User.id.desc())
+    else:
+        query = query.order_by(User.created_at.asc(), User.id.asc())
+
+    users = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(users[limit - 1]) if len(users) > limit else None
+    return users[:limit], next_cursor
+
+
+def claim_next(admin_id, count, user_type=None, department=None):
+    """Claim the oldest N unclaimed pending users for one admin; returns their dicts"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=current_app.config['VERIFICATION_CLAIM_TTL'])
+
+    for _ in range(CLAIM_ATTEMPTS):
+        db.session.query(VerificationClaim).filter(VerificationClaim.expires_at <= now).delete(
+            synchronize_session=False)
+
+        users = (
+            pending_query(user_type, department)
+            .filter(User.id.notin_(db.select(VerificationClaim.user_id)))
+            .order_by(User.created_at.asc(), User.id.asc())
+            .limit(count)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not users:
+            db.session.commit()
+            return [], expires_at
+
+        # Serialize before commit expires the loaded users
+        claimed = [user.to_dict() for user in users]
+        db.session.add_all([
+            VerificationClaim(user_id=user.id, admin_id=admin_id, claimed_at=now, expires_at=expires_at)
+            for user in users
+        ])
+        try:
+            db.session.commit()
+            return claimed, expires_at
+        except IntegrityError:
+            # Another admin claimed one of these first; pick again
+            db.session.rollback()
+
+    return [], expires_at
+
+
+def release_claims(user_ids, admin_id=None):
+    """Drop claims on the given users (optionally only those held by admin_id)"""
+    if not user_ids:
+        return 0
+    query = db.session.query(VerificationClaim).filter(VerificationClaim.user_id.in_(user_ids))
+    if admin_id is not None:
+        query = query.filter(VerificationClaim.admin_id == admin_id)
+    return query.delete(synchronize_session=False)
@@ -16,8 +16,7 @@ document.getElementById('adminName').textContent = currentUser.full_name;
 
 // Load initial data
 document.addEventListener('DOMContentLoaded', () => {
-    loadStats();
-    loadPendingUsers();
+    loadOverview();
     setupMenuNavigation();
     setupFilters();
 });
@@ -68,53 +67,103 @@ function switchSection(sectionName) {
     }
 }
 
+// Load stats and pending users together in one batch request
+async function loadOverview() {
+    try {
+        const [stats, pending] = await API.batch(['/admin/stats', '/admin/pending-users']);
+        if (stats.status === 200) {
+            renderStats(stats.body);
+        }
+        if (pending.status === 200) {
+            renderPendingUsers(pending.body);
+        } else {
+            loadPendingUsers();
+        }
+    } catch (error) {
+        console.error('Error loading overview:', error);
+        loadStats();
+        loadPendingUsers();
+    }
+}
+
 // Load Statistics
 async function loadStats() {
     try {
-        const stats = await API.admin.getStats();
-
-        // Update stat cards
-        document.getElementById('totalUsers').textContent = stats.total_users || 0;
-        document.getElementById('verifiedUsers').textContent = stats.verified_users || 0;
-        document.getElementById('pendingUsers').textContent = stats.pending_users || 0;
-        document.getElementById('alumniCount').textContent = stats.total_alumni || 0;
-
-        // Update badge
-        document.getElementById('pendingBadge').textContent = stats.pending_users || 0;
-
+        renderStats(await API.admin.getStats());
     } catch (error) {
         console.error('Error loading stats:', error);
     }
 }
 
+function renderStats(stats) {
+    // Update stat cards
+    document.getElementById('totalUsers').textContent = stats.total_users || 0;
+    document.getElementById('verifiedUsers').textContent = stats.verified_users || 0;
+    document.getElementById('pendingUsers').textContent = stats.pending_users || 0;
+    document.getElementById('alumniCount').textContent = stats.total_alumni || 0;
+
+    // Update badge
+    document.getElementById('pendingBadge').textContent = stats.pending_users || 0;
+}
+
+// Cursor for the next page of pending users (null when there is none)
+let pendingCursor = null;
+
 // Load Pending Users
 async function loadPendingUsers() {
     const grid = document.getElementById('pendingUsersGrid');
     grid.innerHTML = '<div class="loading"><i class="fas fa-spinner fa-spin"></i> Loading...</div>';
 
     try {
-        const response = await API.admin.getPendingUsers();
-        const users = response.users || [];
+        renderPendingUsers(await API.admin.getPendingUsers());
+    } catch (error) {
+        console.error('Error loading pending users:', error);
+        grid.innerHTML = `<div class="error">Error loading users: ${error.message}</div>`;
+    }
+}
 
-        // Update badge
-        document.getElementById('pendingBadge').textContent = users.length;
+// Append the next page of pending users
+async function loadMorePendingUsers() {
+    if (!pendingCursor) return;
+    const button = document.getElementById('pendingLoadMore');
+    button.disabled = true;
 
-        if (users.length === 0) {
-            grid.innerHTML = `
-                <div class="empty-state">
-                    <i class="fas fa-check-circle"></i>
-                    <p>No pending users to verify</p>
-                </div>
-            `;
-            return;
-        }
+    try {
+        renderPendingUsers(await API.admin.getPendingUsers({ cursor: pendingCursor }), true);
+    } catch (error) {
+        console.error('Error loading more pending users:', error);
+        showMessage('pendingMessage', `Error loading more users: ${error.message}`, 'error');
+    } finally {
+        button.disabled = false;
+    }
+}
 
-        grid.innerHTML = users.map(user => createUserCard(user, true)).join('');
+function renderPendingUsers(response, append = false) {
+    const grid = document.getElementById('pendingUsersGrid');
+    const users = response.users || [];
 
-    } catch (error) {
-        console.error('Error loading pending users:', error);
-        grid.innerHTML = `<div class="error">Error loading users: ${error.message}</div>`;
+    // Update badge (the endpoint pages, so use its total)
+    document.getElementById('pendingBadge').textContent = response.total ?? users.length;
+
+    pendingCursor = response.next_cursor || null;
+    document.getElementById('pendingLoadMore').style.display = pendingCursor ? 'flex' : 'none';
+
+    if (append) {
+        grid.insertAdjacentHTML('beforeend', users.map(user => createUserCard(user, true)).join(''));
+        return;
     }
+
+    if (users.length === 0) {
+        grid.innerHTML = `
+            <div class="empty-state">
+                <i class="fas fa-check-circle"></i>
+                <p>No pending users to verify</p>
+            </div>
+        `;
+        return;
+    }
+
+    grid.innerHTML = users.map(user => createUserCard(user, true)).join('');
 }
 
 // Create User Card
@@ -217,6 +266,20 @@ async function verifyUser(userId, userName) {
     }
 }
 
+// Verify every pending user with one bulk request
+async function verifyAllPending() {
+    if (!confirm('Verify all pending users?')) return;
+
+    try {
+        const response = await API.admin.bulkAction('verify', { filter: { is_verified: false } });
+        showMessage('pendingMessage', `${response.affected} users verified successfully!`, 'success');
+        loadPendingUsers();
+        loadStats();
+    } catch (error) {
+        showMessage('pendingMessage', `Error verifying users: ${error.message}`, 'error');
+    }
+}
+
 // Reject User
 async function rejectUser(userId, userName) {
     if (!confirm(`Reject and delete ${userName}? This action cannot be undone.`)) return;
@@ -34,21 +34,39 @@ const API = {
 
     // Helper to make authenticated requests
     async request(endpoint, options = {}) {
+        const { idempotent, ...fetchOptions } = options;
         const token = this.getToken();
         const headers = {
             'Content-Type': 'application/json',
             ...options.headers,
         };
 
+        // One key per logical request, reused by every retry, so the server
+        // replays the first response instead of creating a duplicate
+        if (idempotent) {
+            headers['Idempotency-Key'] = crypto.randomUUID();
+        }
+
         if (token) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
+        // Keep reading from the primary database right after our own writes
+        const readPrimaryUntil = localStorage.getItem('read_primary_until');
+        if (readPrimaryUntil && parseFloat(readPrimaryUntil) > Date.now() / 1000) {
+            headers['X-Read-Primary-Until'] = readPrimaryUntil;
+        }
+
         try {
-            const response = await fetch(`${API_BASE_URL}${endpoint}`, {
-                ...options,
+            const response = await this.fetchWithRetry(`${API_BASE_URL}${endpoint}`, {
+                ...fetchOptions,
                 headers,
-            });
+            }, idempotent ? 2 : 0);
+
+            const pin = response.headers.get('X-Read-Primary-Until');
+            if (pin) {
+                localStorage.setItem('read_primary_until', pin);
+            }
 
             const data = await response.json();
 
@@ -63,12 +81,43 @@ const API = {
         }
     },
 
+    // Retry dropped connections and still-running duplicates (409); only
+    // safe for requests carrying an Idempotency-Key
+    async fetchWithRetry(url, options, retries) {
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const response = await fetch(url, options);
+                if (response.status !== 409 || attempt >= retries) {
+                    return response;
+                }
+                const retryAfter = parseFloat(response.headers.get('Retry-After')) || 1;
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+            } catch (error) {
+                if (attempt >= retries) {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+            }
+        }
+    },
+
+    // Run several GET requests in one round trip; resolves to one
+    // { status, body } per endpoint, in order
+    async batch(endpoints) {
+        const data = await this.request('/batch', {
+            method: 'POST',
+            body: JSON.stringify({ requests: endpoints.map(endpoint => ({ path: `/api${endpoint}` })) }),
+        });
+        return data.responses;
+    },
+
     // Authentication endpoints
     auth: {
         async register(userData) {
             return await API.request('/auth/register', {
                 method: 'POST',
                 body: JSON.stringify(userData),
+                idempotent: true,
             });
         },
 
@@ -139,6 +188,7 @@ const API = {
             return await API.request('/jobs/', {
                 method: 'POST',
                 body: JSON.stringify(jobData),
+                idempotent: true,
             });
         },
 
@@ -159,6 +209,7 @@ const API = {
             return await API.request(`/jobs/${jobId}/apply`, {
                 method: 'POST',
                 body: JSON.stringify(applicationData),
+                idempotent: true,
             });
         },
 
@@ -185,6 +236,7 @@ const API = {
             return await API.request('/chat/send', {
                 method: 'POST',
                 body: JSON.stringify({ receiver_id: receiverId, content }),
+                idempotent: true,
             });
         },
 
@@ -193,10 +245,35 @@ const API = {
         },
     },
 
+    // Notification feed endpoints
+    notifications: {
+        // Pass the previous page's next_cursor to get older notifications
+        async getFeed({ cursor = null, limit = 20 } = {}) {
+            const params = new URLSearchParams({ limit });
+            if (cursor) params.set('cursor', cursor);
+            return await API.request(`/notifications/?${params}`);
+        },
+
+        async getUnreadCount() {
+            return await API.request('/notifications/unread-count');
+        },
+
+        // Without upToId everything currently in the feed is marked read
+        async markRead(upToId = null) {
+            return await API.request('/notifications/read', {
+                method: 'POST',
+                body: JSON.stringify(upToId ? { up_to: upToId } : {}),
+            });
+        },
+    },
+
     // Admin endpoints
     admin: {
-        async getPendingUsers() {
-            return await API.request('/admin/pending-users');
+        // Pass the previous page's next_cursor to get the next page
+        async getPendingUsers({ cursor = null, limit = 50 } = {}) {
+            const params = new URLSearchParams({ limit });
+            if (cursor) params.set('cursor', cursor);
+            return await API.request(`/admin/pending-users?${params}`);
         },
 
         async verifyUser(userId) {
@@ -214,6 +291,15 @@ const API = {
         async getStats() {
             return await API.request('/admin/stats');
         },
+
+        // Apply verify/activate/deactivate/reject to many users in one request
+        async bulkAction(action, { userIds = null, filter = null } = {}) {
+            const body = userIds ? { user_ids: userIds } : { filter: filter || {} };
+            return await API.request(`/admin/bulk/${action}`, {
+                method: 'POST',
+                body: JSON.stringify(body),
+            });
+        },
     },
 };
 